@@ -0,0 +1,141 @@
+"""Admin endpoints for bulk session export and import."""
+
+import json
+from typing import Annotated, AsyncIterator
+
+import structlog
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from fastapi.responses import StreamingResponse
+
+from app.core.dependencies import get_admin_user
+from app.core.exceptions import ExecutorSaturatedError, FirestoreError, ValidationError
+from app.core.principal import Principal
+from app.models.message import DeletionJobResponse, SessionImportResponse
+from app.services.session_deletion import session_deleter
+from app.services.session_transfer import SessionExporter, SessionImporter
+
+logger = structlog.get_logger()
+
+router = APIRouter(prefix="/admin", tags=["admin"])
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+
+@router.get("/users/{user_id}/sessions/export")
+async def export_user_sessions(
+    user_id: str,
+    current_user: Annotated[Principal, Depends(get_admin_user)],
+) -> StreamingResponse:
+    """
+    Stream every session and message of a user as NDJSON.
+
+    Args:
+        user_id: User whose sessions are exported
+        current_user: Admin user
+
+    Returns:
+        NDJSON stream of session and message records
+    """
+    logger.info("Session export started", user_id=user_id, admin=current_user.uid)
+    return StreamingResponse(
+        _stream_export(SessionExporter(), user_id),
+        media_type=NDJSON_MEDIA_TYPE,
+        headers={"Content-Disposition": f'attachment; filename="sessions-{user_id}.ndjson"'},
+    )
+
+
+async def _stream_export(exporter: SessionExporter, user_id: str) -> AsyncIterator[str]:
+    """Relay an export, reporting a failure in-band once headers are sent."""
+    try:
+        async for chunk in exporter.export_user(user_id):
+            yield chunk
+    except FirestoreError as e:
+        # Headers are already sent; report the failure in-band
+        yield json.dumps({"type": "error", "data": {"message": str(e)}}) + "\n"
+
+
+@router.delete(
+    "/users/{user_id}/sessions",
+    response_model=DeletionJobResponse,
+    status_code=status.HTTP_202_ACCEPTED,
+)
+async def purge_user_sessions(
+    user_id: str,
+    current_user: Annotated[Principal, Depends(get_admin_user)],
+) -> DeletionJobResponse:
+    """
+    Delete every session and message of a user in the background.
+
+    Poll ``GET /chat/deletions/{id}`` with the returned job ID for progress.
+
+    Args:
+        user_id: User whose sessions are deleted
+        current_user: Admin user
+
+    Returns:
+        Deletion job
+    """
+    try:
+        job = await session_deleter.purge_user(user_id, requested_by=current_user.uid)
+        logger.info("Session purge requested", user_id=user_id, admin=current_user.uid)
+        return DeletionJobResponse(**job)
+    except Exception as e:
+        logger.error("Failed to start session purge", error=str(e), user_id=user_id)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to start session purge",
+        ) from e
+
+
+@router.post("/sessions/import", response_model=SessionImportResponse)
+async def import_sessions(
+    request: Request,
+    current_user: Annotated[Principal, Depends(get_admin_user)],
+    import_id: str = Query(..., min_length=1, max_length=128, pattern=r"^[A-Za-z0-9_-]+$"),
+) -> SessionImportResponse:
+    """
+    Import an NDJSON session export.
+
+    Re-sending the same body with the same import_id resumes after the last
+    checkpoint instead of starting over.
+
+    Args:
+        request: Request whose body is the NDJSON export
+        current_user: Admin user
+        import_id: Checkpoint name for this import
+
+    Returns:
+        Import checkpoint
+    """
+    try:
+        checkpoint = await SessionImporter().import_lines(import_id, _request_lines(request))
+        logger.info("Session import finished", import_id=import_id, admin=current_user.uid)
+        return SessionImportResponse(import_id=import_id, **checkpoint)
+
+    except ValidationError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e),
+        ) from e
+    except ExecutorSaturatedError as e:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Too many imports in progress",
+        ) from e
+    except FirestoreError as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to import sessions",
+        ) from e
+
+
+async def _request_lines(request: Request) -> AsyncIterator[bytes]:
+    """Split a streamed request body into lines."""
+    pending = b""
+    async for chunk in request.stream():
+        pending += chunk
+        *lines, pending = pending.split(b"\n")
+        for line in lines:
+            yield line
+    if pending:
+        yield pending
@@ -1,25 +1,33 @@
 """Agent CRUD API endpoints."""
 
-from typing import Annotated, Optional
+import asyncio
+from typing import Annotated, Optional, Union
 
 from typing import Annotated
 
 from fastapi import APIRouter, Depends, HTTPException, status, Query, Request
-from firebase_admin import auth
 from slowapi import Limiter, _rate_limit_exceeded_handler
 from slowapi.util import get_remote_address
 import structlog
 
 from app.core.dependencies import get_current_user
+from app.core.principal import Principal
 from app.models.agent import (
     AgentCreate,
     AgentUpdate,
     AgentResponse,
     AgentListResponse,
     AgentStatus,
+    AgentSummaryListResponse,
+    AgentView,
 )
 from app.services.agent_service import AgentService
-from app.core.exceptions import AgentNotFoundError, FirestoreError
+from app.core.exceptions import (
+    AgentConflictError,
+    AgentNotFoundError,
+    FirestoreError,
+    InvalidCursorError,
+)
 
 logger = structlog.get_logger()
 
@@ -39,7 +47,7 @@ def set_limiter(limiter_instance: Limiter) -> None:
 async def create_agent(
     request: Request,
     agent_data: AgentCreate,
-    current_user: Annotated[auth.UserRecord, Depends(get_current_user)],
+    current_user: Annotated[Principal, Depends(get_current_user)],
 ) -> AgentResponse:
     """
     Create a new agent.
@@ -67,7 +75,7 @@ async def create_agent(
 @router.get("/{agent_id}", response_model=AgentResponse)
 async def get_agent(
     agent_id: str,
-    current_user: Annotated[auth.UserRecord, Depends(get_current_user)],
+    current_user: Annotated[Principal, Depends(get_current_user)],
 ) -> AgentResponse:
     """
     Get agent by ID.
@@ -101,13 +109,15 @@ async def get_agent(
         ) from e
 
 
-@router.get("", response_model=AgentListResponse)
+@router.get("", response_model=Union[AgentListResponse, AgentSummaryListResponse])
 async def list_agents(
-    current_user: Annotated[auth.UserRecord, Depends(get_current_user)],
+    current_user: Annotated[Principal, Depends(get_current_user)],
     status_filter: Optional[AgentStatus] = Query(None, alias="status"),
     limit: int = Query(50, ge=1, le=100),
-    offset: int = Query(0, ge=0),
-) -> AgentListResponse:
+    offset: int = Query(0, ge=0, deprecated=True),
+    cursor: Optional[str] = Query(None, max_length=512),
+    view: AgentView = Query(AgentView.FULL),
+) -> AgentListResponse | AgentSummaryListResponse:
     """
     List agents with optional filtering.
 
@@ -115,26 +125,51 @@ async def list_agents(
         current_user: Current authenticated user
         status_filter: Optional status filter
         limit: Maximum number of results
-        offset: Offset for pagination
+        offset: Offset for pagination (deprecated, use cursor)
+        cursor: next_cursor from the previous page
+        view: "summary" returns only id, name, status and timestamps
 
     Returns:
-        Agent list response
+        Agent list response (or summary list response)
+
+    Raises:
+        HTTPException: If the cursor is invalid
     """
     try:
         service = AgentService()
-        agents = await service.list_agents(
-            user_id=current_user.uid,
-            status=status_filter,
-            limit=limit,
-            offset=offset,
+        user_id = current_user.uid
+        page = 1 if cursor else offset // limit + 1
+        if view == AgentView.SUMMARY:
+            (summaries, next_cursor), total = await asyncio.gather(
+                service.list_agent_summaries(user_id, status_filter, limit, offset, cursor),
+                service.count_agents(user_id, status_filter),
+            )
+            logger.info("Agents listed", count=len(summaries), user_id=user_id)
+            return AgentSummaryListResponse(
+                agents=summaries,
+                total=total,
+                page=page,
+                page_size=limit,
+                next_cursor=next_cursor,
+            )
+
+        (agents, next_cursor), total = await asyncio.gather(
+            service.list_agents(user_id, status_filter, limit, offset, cursor),
+            service.count_agents(user_id, status_filter),
         )
-        logger.info("Agents listed", count=len(agents), user_id=current_user.uid)
+        logger.info("Agents listed", count=len(agents), user_id=user_id)
         return AgentListResponse(
             agents=agents,
-            total=len(agents),
-            page=offset // limit + 1,
+            total=total,
+            page=page,
             page_size=limit,
+            next_cursor=next_cursor,
         )
+    except InvalidCursorError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e),
+        ) from e
     except FirestoreError as e:
         logger.error("Failed to list agents", error=str(e))
         raise HTTPException(
@@ -147,7 +182,7 @@ async def list_agents(
 async def update_agent(
     agent_id: str,
     agent_data: AgentUpdate,
-    current_user: Annotated[auth.UserRecord, Depends(get_current_user)],
+    current_user: Annotated[Principal, Depends(get_current_user)],
 ) -> AgentResponse:
     """
     Update an agent.
@@ -161,7 +196,7 @@ async def update_agent(
         Updated agent response
 
     Raises:
-        HTTPException: If agent not found
+        HTTPException: If agent not found or concurrently modified
     """
     try:
         service = AgentService()
@@ -174,6 +209,12 @@ async def update_agent(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=str(e),
         ) from e
+    except AgentConflictError as e:
+        logger.warning("Agent update conflict", agent_id=agent_id)
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=str(e),
+        ) from e
     except FirestoreError as e:
         logger.error("Failed to update agent", error=str(e))
         raise HTTPException(
@@ -185,7 +226,7 @@ async def update_agent(
 @router.delete("/{agent_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_agent(
     agent_id: str,
-    current_user: Annotated[auth.UserRecord, Depends(get_current_user)],
+    current_user: Annotated[Principal, Depends(get_current_user)],
 ) -> None:
     """
     Delete an agent.
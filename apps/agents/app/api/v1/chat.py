@@ -1,31 +1,51 @@
 """Chat/conversation API endpoints with streaming support."""
 
-from typing import Annotated, Optional
-import uuid
-from datetime import datetime
+import json
+from contextlib import aclosing
+from typing import Annotated, AsyncIterator, List, Optional
 
-from fastapi import APIRouter, Depends, HTTPException, status, Request
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, status, Request
 from fastapi.responses import StreamingResponse
-from firebase_admin import auth
 from slowapi import Limiter
 from slowapi.util import get_remote_address
 import structlog
 
 from app.core.dependencies import get_current_user, get_optional_user
+from app.core.principal import Principal
+from app.core.sse import (
+    DONE_FRAME,
+    SSE_MEDIA_TYPE,
+    TRUNCATED_FRAME,
+    coalesce,
+    content_frame,
+    error_frame,
+)
 from app.models.message import (
     ChatRequest,
     ChatResponse,
-    ChatStreamChunk,
+    ChatRunCancelResponse,
+    DeletionJobResponse,
     MessageCreate,
-    MessageResponse,
     MessageListResponse,
     SessionCreate,
     SessionResponse,
 )
 from app.services.adk_service import ADKService
 from app.services.agent_service import AgentService
-from app.core.firebase_admin import get_firestore_client
-from app.core.exceptions import SessionNotFoundError, FirestoreError
+from app.services.chat_runs import ChatRun, chat_runs, parse_event_id
+from app.services.chat_service import ChatService, MessagePage
+from app.services.session_deletion import session_deleter
+from app.core.config import settings
+from app.core.exceptions import (
+    ChatRunNotFoundError,
+    DeletionJobNotFoundError,
+    InvalidCursorError,
+    SessionAccessDeniedError,
+    SessionNotFoundError,
+    FirestoreError,
+    ReplayUnavailableError,
+    ValidationError,
+)
 
 logger = structlog.get_logger()
 
@@ -45,7 +65,7 @@ def set_limiter(limiter_instance: Limiter) -> None:
 async def create_session(
     request: Request,
     session_data: SessionCreate,
-    current_user: Annotated[auth.UserRecord, Depends(get_current_user)],
+    current_user: Annotated[Principal, Depends(get_current_user)],
 ) -> SessionResponse:
     """
     Create a new chat session.
@@ -58,31 +78,19 @@ async def create_session(
         Created session response
     """
     try:
-        db = get_firestore_client()
-        session_id = str(uuid.uuid4())
-        now = datetime.utcnow()
-
-        session_doc = {
-            "id": session_id,
-            "user_id": current_user.uid,
-            "agent_id": session_data.agent_id,
-            "metadata": session_data.metadata,
-            "created_at": now,
-            "last_message_at": now,
-        }
-
-        doc_ref = db.collection("agents-sessions").document(session_id)
-        doc_ref.set(session_doc)
-
-        logger.info("Session created", session_id=session_id, user_id=current_user.uid)
-
-        return SessionResponse(
-            id=session_id,
+        session = await ChatService().create_session(
             user_id=current_user.uid,
             agent_id=session_data.agent_id,
             metadata=session_data.metadata,
-            created_at=now,
-            last_message_at=now,
+        )
+
+        return SessionResponse(
+            id=session.id,
+            user_id=session.user_id,
+            agent_id=session.agent_id,
+            metadata=session.metadata,
+            created_at=session.created_at,
+            last_message_at=session.last_message_at,
         )
 
     except Exception as e:
@@ -96,7 +104,7 @@ async def create_session(
 @router.get("/sessions/{session_id}", response_model=SessionResponse)
 async def get_session(
     session_id: str,
-    current_user: Annotated[auth.UserRecord, Depends(get_current_user)],
+    current_user: Annotated[Principal, Depends(get_current_user)],
 ) -> SessionResponse:
     """
     Get session by ID.
@@ -112,30 +120,15 @@ async def get_session(
         HTTPException: If session not found
     """
     try:
-        db = get_firestore_client()
-        doc_ref = db.collection("agents-sessions").document(session_id)
-        doc = doc_ref.get()
-
-        if not doc.exists:
-            raise SessionNotFoundError(f"Session {session_id} not found")
-
-        data = doc.to_dict()
-        assert data is not None
-
-        # Verify user owns the session
-        if data["user_id"] != current_user.uid:
-            raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail="Access denied",
-            )
+        session = await ChatService().authorize_session(session_id, current_user.uid)
 
         return SessionResponse(
-            id=data["id"],
-            user_id=data["user_id"],
-            agent_id=data.get("agent_id"),
-            metadata=data.get("metadata", {}),
-            created_at=data["created_at"],
-            last_message_at=data["last_message_at"],
+            id=session.id,
+            user_id=session.user_id,
+            agent_id=session.agent_id,
+            metadata=session.metadata,
+            created_at=session.created_at,
+            last_message_at=session.last_message_at,
         )
 
     except SessionNotFoundError as e:
@@ -143,8 +136,11 @@ async def get_session(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=str(e),
         ) from e
-    except HTTPException:
-        raise
+    except SessionAccessDeniedError as e:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Access denied",
+        ) from e
     except Exception as e:
         logger.error("Failed to get session", error=str(e))
         raise HTTPException(
@@ -153,11 +149,114 @@ async def get_session(
         ) from e
 
 
+@router.delete(
+    "/sessions/{session_id}",
+    response_model=DeletionJobResponse,
+    status_code=status.HTTP_202_ACCEPTED,
+)
+async def delete_session(
+    session_id: str,
+    current_user: Annotated[Principal, Depends(get_current_user)],
+) -> DeletionJobResponse:
+    """
+    Delete a session and all of its messages in the background.
+
+    Poll ``GET /chat/deletions/{id}`` with the returned job ID for progress.
+
+    Args:
+        session_id: Session ID
+        current_user: Current authenticated user
+
+    Returns:
+        Deletion job
+    """
+    try:
+        await ChatService().authorize_session(session_id, current_user.uid)
+        job = await session_deleter.delete_session(session_id, requested_by=current_user.uid)
+        return DeletionJobResponse(**job)
+
+    except SessionNotFoundError as e:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=str(e),
+        ) from e
+    except SessionAccessDeniedError as e:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Access denied",
+        ) from e
+    except Exception as e:
+        logger.error("Failed to delete session", error=str(e))
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to delete session",
+        ) from e
+
+
+@router.get("/deletions/{job_id}", response_model=DeletionJobResponse)
+async def get_deletion_job(
+    job_id: str,
+    current_user: Annotated[Principal, Depends(get_current_user)],
+) -> DeletionJobResponse:
+    """
+    Get the progress of a deletion job.
+
+    Args:
+        job_id: Job ID
+        current_user: Current authenticated user (the requester or an admin)
+
+    Returns:
+        Deletion job
+    """
+    try:
+        job = await session_deleter.get_job(job_id)
+    except DeletionJobNotFoundError as e:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=str(e),
+        ) from e
+
+    if job.get("requested_by") != current_user.uid and not current_user.is_admin:
+        # Indistinguishable from a missing job
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Deletion job {job_id} not found",
+        )
+    return DeletionJobResponse(**job)
+
+
+@router.post(
+    "/runs/{run_id}/cancel",
+    response_model=ChatRunCancelResponse,
+    status_code=status.HTTP_202_ACCEPTED,
+)
+async def cancel_run(
+    run_id: str,
+    current_user: Annotated[Principal, Depends(get_current_user)],
+) -> ChatRunCancelResponse:
+    """
+    Stop a streaming answer, whichever instance is serving it.
+
+    The stream ends with a ``truncated`` final event and the partial answer
+    is saved with ``truncated`` metadata. Unknown runs and runs of other
+    users are ignored.
+
+    Args:
+        run_id: Run ID from the stream's ``X-Run-Id`` header
+        current_user: Current authenticated user
+
+    Returns:
+        Accepted cancel request
+    """
+    await chat_runs.cancel(run_id, current_user.uid)
+    return ChatRunCancelResponse(run_id=run_id)
+
+
 @router.post("", response_model=ChatResponse)
 async def chat(
     request: Request,
     chat_request: ChatRequest,
-    current_user: Annotated[auth.UserRecord, Depends(get_current_user)],
+    current_user: Annotated[Principal, Depends(get_current_user)],
 ) -> ChatResponse:
     """
     Send a chat message and get response.
@@ -170,60 +269,38 @@ async def chat(
         Chat response
     """
     try:
-        db = get_firestore_client()
         adk_service = ADKService()
+        chat_service = ChatService()
 
-        # Get or create session
-        session_id = chat_request.session_id
-        if not session_id:
-            # Create new session
-            session_doc = {
-                "id": str(uuid.uuid4()),
-                "user_id": current_user.uid,
-                "created_at": datetime.utcnow(),
-                "last_message_at": datetime.utcnow(),
-            }
-            session_id = session_doc["id"]
-            db.collection("agents-sessions").document(session_id).set(session_doc)
-
-        # Save user message
-        message_id = str(uuid.uuid4())
-        user_message = {
-            "id": message_id,
-            "session_id": session_id,
-            "content": chat_request.message,
-            "role": "user",
-            "created_at": datetime.utcnow(),
-            "metadata": chat_request.context,
-        }
-        db.collection("agents-sessions").document(session_id).collection("messages").document(
-            message_id
-        ).set(user_message)
+        # Verify ownership before writing into a caller-supplied session
+        session = None
+        if chat_request.session_id:
+            session = await chat_service.authorize_session(
+                chat_request.session_id, current_user.uid
+            )
+
+        # Stage the turn; nothing is written until the agent has answered
+        turn = chat_service.start_turn(
+            user_id=current_user.uid,
+            message=chat_request.message,
+            session=session,
+            metadata=chat_request.context,
+        )
+        session_id = turn.session_id
 
         # Get agent response
         response_data = await adk_service.run_agent(
             message=chat_request.message,
             session_id=session_id,
             context=chat_request.context,
+            history=turn.context.to_prompt(chat_request.message),
         )
 
-        # Save assistant message
-        assistant_message_id = str(uuid.uuid4())
-        assistant_message = {
-            "id": assistant_message_id,
-            "session_id": session_id,
-            "content": response_data["response"],
-            "role": "assistant",
-            "created_at": datetime.utcnow(),
-            "metadata": response_data.get("metadata", {}),
-        }
-        db.collection("agents-sessions").document(session_id).collection("messages").document(
-            assistant_message_id
-        ).set(assistant_message)
-
-        # Update session last_message_at
-        db.collection("agents-sessions").document(session_id).update(
-            {"last_message_at": datetime.utcnow()}
+        # Persist session, user and assistant messages in one batch commit
+        assistant_message_id = await chat_service.commit_turn(
+            turn,
+            response=response_data["response"],
+            metadata=response_data.get("metadata", {}),
         )
 
         logger.info("Chat completed", session_id=session_id, user_id=current_user.uid)
@@ -235,6 +312,16 @@ async def chat(
             metadata=response_data.get("metadata", {}),
         )
 
+    except SessionNotFoundError as e:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=str(e),
+        ) from e
+    except SessionAccessDeniedError as e:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Access denied",
+        ) from e
     except Exception as e:
         logger.error("Chat failed", error=str(e), exc_info=True)
         raise HTTPException(
@@ -247,103 +334,101 @@ async def chat(
 async def chat_stream(
     request: Request,
     chat_request: ChatRequest,
-    current_user: Annotated[auth.UserRecord, Depends(get_current_user)],
+    current_user: Annotated[Principal, Depends(get_current_user)],
+    last_event_id: Annotated[Optional[str], Header()] = None,
 ) -> StreamingResponse:
     """
     Send a chat message and get streaming response (SSE).
 
+    Every event carries an ``id``. Re-sending the request with a
+    ``Last-Event-ID`` header resumes that run after the given event instead
+    of starting a new turn; generation keeps going while the client is away
+    (for up to ``STREAM_RESUME_GRACE_SECONDS``). The run ID in the
+    ``X-Run-Id`` header can be passed to ``POST /chat/runs/{run_id}/cancel``.
+    A stopped run saves its partial answer as truncated.
+
     Args:
         chat_request: Chat request data
         current_user: Current authenticated user
+        last_event_id: Last event received before a reconnect
 
     Returns:
         Streaming response with Server-Sent Events
     """
+    if last_event_id:
+        return await _resume_run(request, current_user, last_event_id, run_id=None)
+
     try:
-        db = get_firestore_client()
         adk_service = ADKService()
+        chat_service = ChatService()
 
-        # Get or create session
-        session_id = chat_request.session_id
-        if not session_id:
-            session_doc = {
-                "id": str(uuid.uuid4()),
-                "user_id": current_user.uid,
-                "created_at": datetime.utcnow(),
-                "last_message_at": datetime.utcnow(),
-            }
-            session_id = session_doc["id"]
-            db.collection("agents-sessions").document(session_id).set(session_doc)
-
-        # Save user message
-        message_id = str(uuid.uuid4())
-        user_message = {
-            "id": message_id,
-            "session_id": session_id,
-            "content": chat_request.message,
-            "role": "user",
-            "created_at": datetime.utcnow(),
-        }
-        db.collection("agents-sessions").document(session_id).collection("messages").document(
-            message_id
-        ).set(user_message)
+        # Verify ownership before writing into a caller-supplied session
+        session = None
+        if chat_request.session_id:
+            session = await chat_service.authorize_session(
+                chat_request.session_id, current_user.uid
+            )
 
-        async def generate_stream():
-            """Generate SSE stream."""
-            full_response = ""
-            try:
-                async for chunk in adk_service.stream_agent_response(
-                    message=chat_request.message,
-                    session_id=session_id,
-                    context=chat_request.context,
-                ):
-                    full_response += chunk
-                    chunk_data = ChatStreamChunk(
-                        content=chunk,
-                        done=False,
-                    )
-                    yield f"data: {chunk_data.model_dump_json()}\n\n"
-
-                # Save complete assistant message
-                assistant_message_id = str(uuid.uuid4())
-                assistant_message = {
-                    "id": assistant_message_id,
-                    "session_id": session_id,
-                    "content": full_response,
-                    "role": "assistant",
-                    "created_at": datetime.utcnow(),
-                }
-                db.collection("agents-sessions").document(session_id).collection("messages").document(
-                    assistant_message_id
-                ).set(assistant_message)
-
-                # Update session
-                db.collection("agents-sessions").document(session_id).update(
-                    {"last_message_at": datetime.utcnow()}
+        # Stage the turn; nothing is written until the stream completes
+        turn = chat_service.start_turn(
+            user_id=current_user.uid,
+            message=chat_request.message,
+            session=session,
+            metadata=chat_request.context,
+        )
+        session_id = turn.session_id
+        run = ChatRun(current_user.uid, session_id)
+
+        async def generate() -> None:
+            """Run the agent, publishing SSE frames to the run."""
+            # Joined once at the end; += on a str is quadratic in the answer length
+            parts: List[str] = []
+            chunks = adk_service.stream_agent_response(
+                message=chat_request.message,
+                session_id=session_id,
+                context=chat_request.context,
+                history=turn.context.to_prompt(chat_request.message),
+            )
+            if chat_request.coalesce and settings.STREAM_COALESCE_MAX_LATENCY_MS > 0:
+                chunks = coalesce(
+                    chunks,
+                    max_bytes=settings.STREAM_COALESCE_BYTES,
+                    max_latency=settings.STREAM_COALESCE_MAX_LATENCY_MS / 1000,
                 )
+            try:
+                async with aclosing(run.guard(chunks)) as guarded:
+                    async for chunk in guarded:
+                        parts.append(chunk)
+                        await chat_runs.publish(run, content_frame(chunk))
+                truncated = run.truncated
+                metadata = {"truncated": True, "cancel_reason": run.reason} if truncated else None
+
+                # Persist session, user and assistant messages in one batch commit
+                await chat_service.commit_turn(turn, response="".join(parts), metadata=metadata)
 
                 # Send final chunk
-                final_chunk = ChatStreamChunk(content="", done=True)
-                yield f"data: {final_chunk.model_dump_json()}\n\n"
+                final = TRUNCATED_FRAME if truncated else DONE_FRAME
+                await chat_runs.publish(run, final, last=True)
 
             except Exception as e:
                 logger.error("Streaming error", error=str(e))
-                error_chunk = ChatStreamChunk(
-                    content=f"Error: {str(e)}",
-                    done=True,
-                    metadata={"error": True},
-                )
-                yield f"data: {error_chunk.model_dump_json()}\n\n"
-
-        return StreamingResponse(
-            generate_stream(),
-            media_type="text/event-stream",
-            headers={
-                "Cache-Control": "no-cache",
-                "Connection": "keep-alive",
-            },
-        )
+                await chat_runs.publish(run, error_frame(str(e)), last=True)
+
+        # Generation is detached from this response, so it survives a reconnect
+        chat_runs.start(run, generate())
+        frames = await chat_runs.follow(run.id, current_user.uid, 0, request)
+        return _sse_response(run.id, frames)
 
+    except SessionNotFoundError as e:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=str(e),
+        ) from e
+    except SessionAccessDeniedError as e:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Access denied",
+        ) from e
     except Exception as e:
         logger.error("Chat stream failed", error=str(e), exc_info=True)
         raise HTTPException(
@@ -352,67 +437,150 @@ async def chat_stream(
         ) from e
 
 
+@router.get("/runs/{run_id}/events")
+async def follow_run(
+    run_id: str,
+    request: Request,
+    current_user: Annotated[Principal, Depends(get_current_user)],
+    last_event_id: Annotated[Optional[str], Header()] = None,
+) -> StreamingResponse:
+    """
+    Follow a run's events (SSE), e.g. from an ``EventSource``.
+
+    Without ``Last-Event-ID`` every buffered event is replayed.
+
+    Args:
+        run_id: Run ID from the stream's ``X-Run-Id`` header
+        current_user: Current authenticated user
+        last_event_id: Last event received before a reconnect
+
+    Returns:
+        Streaming response with Server-Sent Events
+    """
+    return await _resume_run(request, current_user, last_event_id, run_id=run_id)
+
+
+async def _resume_run(
+    request: Request,
+    current_user: Principal,
+    last_event_id: Optional[str],
+    run_id: Optional[str],
+) -> StreamingResponse:
+    """Stream a run from the event after ``last_event_id``."""
+    try:
+        after = 0
+        if last_event_id:
+            event_run_id, after = parse_event_id(last_event_id)
+            if run_id is not None and event_run_id != run_id:
+                raise ValidationError("Last-Event-ID belongs to another run")
+            run_id = event_run_id
+        if run_id is None:
+            raise ValidationError("A run ID or Last-Event-ID is required")
+        frames = await chat_runs.follow(run_id, current_user.uid, after, request)
+        return _sse_response(run_id, frames)
+
+    except ValidationError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e),
+        ) from e
+    except ChatRunNotFoundError as e:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=str(e),
+        ) from e
+    except ReplayUnavailableError as e:
+        raise HTTPException(
+            status_code=status.HTTP_410_GONE,
+            detail=str(e),
+        ) from e
+
+
+def _sse_response(run_id: str, frames: AsyncIterator[bytes]) -> StreamingResponse:
+    async def stream() -> AsyncIterator[bytes]:
+        try:
+            async for frame in frames:
+                yield frame
+        except ReplayUnavailableError as e:
+            # The client fell behind the buffer; it can still read the saved answer
+            yield error_frame(str(e))
+
+    return StreamingResponse(
+        stream(),
+        media_type=SSE_MEDIA_TYPE,
+        headers={
+            "Cache-Control": "no-cache",
+            "Connection": "keep-alive",
+            "X-Run-Id": run_id,
+        },
+    )
+
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+
 @router.get("/sessions/{session_id}/messages", response_model=MessageListResponse)
 async def get_messages(
+    request: Request,
     session_id: str,
-    current_user: Annotated[auth.UserRecord, Depends(get_current_user)],
-    limit: int = 50,
-) -> MessageListResponse:
+    current_user: Annotated[Principal, Depends(get_current_user)],
+    limit: int = Query(50, ge=1),
+    before: Optional[str] = Query(None, max_length=512),
+    after: Optional[str] = Query(None, max_length=512),
+) -> MessageListResponse | StreamingResponse:
     """
     Get messages for a session.
 
+    Without cursors the newest messages are returned; pass ``before_cursor``
+    as ``before`` to page back through history, or ``after_cursor`` as
+    ``after`` to fetch newer messages. With ``Accept: application/x-ndjson``
+    messages are streamed one per line in query order (newest first unless
+    ``after`` is given), followed by a final line holding the session total
+    and the page cursors.
+
     Args:
         session_id: Session ID
         current_user: Current authenticated user
         limit: Maximum number of messages
+        before: Cursor of the oldest message already seen
+        after: Cursor of the newest message already seen
 
     Returns:
-        Message list response
+        Message list response, or an NDJSON stream
     """
-    try:
-        db = get_firestore_client()
-
-        # Verify session exists and user owns it
-        session_ref = db.collection("agents-sessions").document(session_id)
-        session_doc = session_ref.get()
+    stream = NDJSON_MEDIA_TYPE in request.headers.get("accept", "")
+    max_limit = settings.MESSAGE_STREAM_MAX_LIMIT if stream else settings.MESSAGE_PAGE_MAX_LIMIT
+    if limit > max_limit:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"limit must not exceed {max_limit}",
+        )
 
-        if not session_doc.exists:
-            raise SessionNotFoundError(f"Session {session_id} not found")
+    try:
+        chat_service = ChatService()
+
+        # Verify session exists and user owns it (served from the session cache)
+        session = await chat_service.authorize_session(session_id, current_user.uid)
+        page = chat_service.message_page(
+            session_id,
+            before=before,
+            after=after,
+            message_count=session.message_count,
+            archive=session.archive,
+        )
+        total = await chat_service.count_messages(session)
 
-        session_data = session_doc.to_dict()
-        if session_data and session_data.get("user_id") != current_user.uid:
-            raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail="Access denied",
+        if stream:
+            return StreamingResponse(
+                _stream_messages(chat_service, page, limit, total),
+                media_type=NDJSON_MEDIA_TYPE,
+                headers={"X-Message-Order": "asc" if page.ascending else "desc"},
             )
 
-        # Get messages
-        messages_ref = (
-            session_ref.collection("messages")
-            .order_by("created_at", direction="desc")
-            .limit(limit)
-        )
-        messages_docs = messages_ref.stream()
-
-        messages = []
-        for doc in messages_docs:
-            data = doc.to_dict()
-            if data:
-                from app.models.message import MessageRole
-
-                messages.append(
-                    MessageResponse(
-                        id=data["id"],
-                        session_id=data["session_id"],
-                        content=data["content"],
-                        role=MessageRole(data["role"]),
-                        metadata=data.get("metadata", {}),
-                        created_at=data["created_at"],
-                    )
-                )
-
-        # Reverse to get chronological order
-        messages.reverse()
+        messages = [m async for m in chat_service.iter_messages(page, limit)]
+        if not page.ascending:
+            # Return pages in chronological order
+            messages.reverse()
 
         logger.info(
             "Messages retrieved",
@@ -423,8 +591,10 @@ async def get_messages(
 
         return MessageListResponse(
             messages=messages,
-            total=len(messages),
+            total=total,
             session_id=session_id,
+            before_cursor=page.before_cursor,
+            after_cursor=page.after_cursor,
         )
 
     except SessionNotFoundError as e:
@@ -432,6 +602,16 @@ async def get_messages(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=str(e),
         ) from e
+    except SessionAccessDeniedError as e:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Access denied",
+        ) from e
+    except InvalidCursorError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e),
+        ) from e
     except HTTPException:
         raise
     except Exception as e:
@@ -441,3 +621,27 @@ async def get_messages(
             detail=str(e),
         ) from e
 
+
+async def _stream_messages(
+    chat_service: ChatService, page: MessagePage, limit: int, total: int
+) -> AsyncIterator[str]:
+    """Write a message page as NDJSON without holding it in memory."""
+    count = 0
+    try:
+        async for message in chat_service.iter_messages(page, limit):
+            count += 1
+            yield message.model_dump_json() + "\n"
+    except Exception as e:
+        # Headers are already sent; report the failure in-band
+        logger.error("Message stream failed", error=str(e), session_id=page.session_id)
+        yield json.dumps({"error": str(e)}) + "\n"
+        return
+
+    yield json.dumps(
+        {
+            "total": total,
+            "before_cursor": page.before_cursor,
+            "after_cursor": page.after_cursor,
+        }
+    ) + "\n"
+    logger.info("Messages streamed", session_id=page.session_id, count=count)
@@ -3,21 +3,42 @@
 import os
 import platform
 from datetime import datetime
+from typing import Any
 
 import psutil
-from fastapi import APIRouter
+from fastapi import APIRouter, status
+from fastapi.responses import JSONResponse
 
+from app.core.blocking import blocking_executor
+from app.core.clients import clients
 from app.core.config import settings
+from app.services.conversation_buffer import conversation_buffer
+from app.services.write_behind import write_behind
 
 router = APIRouter()
 
 
+def _system_snapshot() -> tuple[Any, float]:
+    """Sample memory and CPU usage (blocks for the CPU sampling interval)."""
+    return psutil.virtual_memory(), psutil.cpu_percent(interval=0.1)
+
+
+@router.get("/health/ready")
+async def health_ready() -> JSONResponse:
+    """Readiness probe: fails until backend clients are created and warmed."""
+    if not clients.ready:
+        return JSONResponse(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            content={"status": "warming_up"},
+        )
+    return JSONResponse(content={"status": "ready"})
+
+
 @router.get("/health/detailed")
 async def health_detailed():
     """Detailed health check for M4 Max monitoring."""
     try:
-        memory = psutil.virtual_memory()
-        cpu_percent = psutil.cpu_percent(interval=0.1)
+        memory, cpu_percent = await blocking_executor.run("system", _system_snapshot)
         
         return {
             "status": "healthy",
@@ -45,6 +66,9 @@ async def health_detailed():
                 "auth": os.environ.get("FIREBASE_AUTH_EMULATOR_HOST", "not connected"),
                 "storage": os.environ.get("FIREBASE_STORAGE_EMULATOR_HOST", "not connected"),
             },
+            "blocking_io": blocking_executor.metrics(),
+            "write_behind": await write_behind.metrics() if write_behind.running else None,
+            "conversation_buffer": conversation_buffer.metrics(),
         }
     except Exception as e:
         return {
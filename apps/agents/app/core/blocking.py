@@ -0,0 +1,174 @@
+"""Bounded thread-pool executor for synchronous SDK calls."""
+
+import asyncio
+import functools
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import asdict, dataclass
+from typing import Any, Callable, TypeVar
+
+import structlog
+
+from app.core.config import settings
+from app.core.exceptions import ExecutorSaturatedError
+
+logger = structlog.get_logger()
+
+T = TypeVar("T")
+
+
+@dataclass
+class CategoryStats:
+    """Counters and timings for one executor category."""
+
+    submitted: int = 0
+    rejected: int = 0
+    completed: int = 0
+    failed: int = 0
+    in_flight: int = 0
+    queued: int = 0
+    wait_seconds_total: float = 0.0
+    run_seconds_total: float = 0.0
+    run_seconds_max: float = 0.0
+
+
+class _Category:
+    """Concurrency cap and queue limit for one kind of blocking call."""
+
+    def __init__(self, name: str, concurrency: int, max_queue: int) -> None:
+        self.name = name
+        self.concurrency = concurrency
+        self.max_queue = max_queue
+        self.semaphore = asyncio.Semaphore(concurrency)
+        self.stats = CategoryStats()
+
+
+class BlockingExecutor:
+    """Runs blocking SDK calls off the event loop with per-category limits.
+
+    Each category (e.g. ``auth``, ``storage``, ``system``) gets its own
+    concurrency cap so one slow dependency cannot starve the others, and a
+    queue-depth limit beyond which calls are rejected immediately with
+    ``ExecutorSaturatedError`` instead of piling up behind the cap.
+    """
+
+    def __init__(self, limits: dict[str, tuple[int, int]]) -> None:
+        """
+        Initialize executor.
+
+        Args:
+            limits: Mapping of category name to (concurrency, max_queue)
+        """
+        self._categories = {
+            name: _Category(name, concurrency, max_queue)
+            for name, (concurrency, max_queue) in limits.items()
+        }
+        # One thread per concurrency slot, so a category always has its share.
+        self._pool = ThreadPoolExecutor(
+            max_workers=sum(c for c, _ in limits.values()),
+            thread_name_prefix="blocking-io",
+        )
+
+    @classmethod
+    def from_settings(cls) -> "BlockingExecutor":
+        """Build an executor sized from application settings."""
+        return cls(
+            {
+                "auth": (settings.BLOCKING_IO_AUTH_CONCURRENCY, settings.BLOCKING_IO_AUTH_QUEUE),
+                "storage": (
+                    settings.BLOCKING_IO_STORAGE_CONCURRENCY,
+                    settings.BLOCKING_IO_STORAGE_QUEUE,
+                ),
+                "system": (
+                    settings.BLOCKING_IO_SYSTEM_CONCURRENCY,
+                    settings.BLOCKING_IO_SYSTEM_QUEUE,
+                ),
+                "bulk": (settings.BLOCKING_IO_BULK_CONCURRENCY, settings.BLOCKING_IO_BULK_QUEUE),
+                "spool": (1, settings.BLOCKING_IO_SPOOL_QUEUE),
+            }
+        )
+
+    async def run(self, category: str, fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        """
+        Run a blocking callable in the category's thread budget.
+
+        Args:
+            category: Executor category name
+            fn: Blocking callable
+            *args: Positional arguments for fn
+            **kwargs: Keyword arguments for fn
+
+        Returns:
+            The callable's return value
+
+        Raises:
+            ExecutorSaturatedError: If the category's queue is full
+        """
+        cat = self._categories[category]
+        stats = cat.stats
+
+        if cat.semaphore.locked() and stats.queued >= cat.max_queue:
+            stats.rejected += 1
+            logger.warning("Blocking executor saturated", category=category, queued=stats.queued)
+            raise ExecutorSaturatedError(f"Too many pending {category} calls")
+
+        stats.submitted += 1
+        stats.queued += 1
+        queued_at = time.perf_counter()
+        try:
+            await cat.semaphore.acquire()
+        finally:
+            stats.queued -= 1
+
+        started_at = time.perf_counter()
+        stats.wait_seconds_total += started_at - queued_at
+        stats.in_flight += 1
+        loop = asyncio.get_running_loop()
+
+        def finished(future: "Future[T]") -> None:
+            # Runs when the worker is really done (or never started), not when
+            # the awaiting task is cancelled, so the cap holds for running threads
+            elapsed = time.perf_counter() - started_at
+            stats.in_flight -= 1
+            stats.run_seconds_total += elapsed
+            stats.run_seconds_max = max(stats.run_seconds_max, elapsed)
+            if future.cancelled() or future.exception() is not None:
+                stats.failed += 1
+            else:
+                stats.completed += 1
+            cat.semaphore.release()
+
+        try:
+            future = self._pool.submit(functools.partial(fn, *args, **kwargs))
+        except BaseException:
+            stats.in_flight -= 1
+            stats.failed += 1
+            cat.semaphore.release()
+            raise
+
+        def on_done(future: "Future[T]") -> None:
+            # Called on the worker thread
+            if not loop.is_closed():
+                loop.call_soon_threadsafe(finished, future)
+
+        future.add_done_callback(on_done)
+        return await asyncio.wrap_future(future)
+
+    def metrics(self) -> dict[str, dict[str, Any]]:
+        """Snapshot of per-category limits and counters."""
+        return {
+            name: {
+                "concurrency": cat.concurrency,
+                "max_queue": cat.max_queue,
+                **asdict(cat.stats),
+            }
+            for name, cat in self._categories.items()
+        }
+
+    def shutdown(self) -> None:
+        """Stop accepting work and release pool threads."""
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+
+# Global executor instance
+blocking_executor = BlockingExecutor.from_settings()
@@ -0,0 +1,152 @@
+"""In-process caching primitives."""
+
+import asyncio
+import time
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Awaitable, Callable, Generic, Hashable, Optional, TypeVar
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+
+class TTLCache(Generic[K, V]):
+    """Bounded LRU cache with per-entry expiry.
+
+    Entries are evicted least-recently-used first once ``maxsize`` is reached,
+    and are dropped lazily on access once their expiry has passed.
+    """
+
+    def __init__(
+        self,
+        maxsize: int,
+        ttl: Optional[float] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        """
+        Initialize cache.
+
+        Args:
+            maxsize: Maximum number of entries kept
+            ttl: Default time-to-live in seconds (None means no expiry)
+            clock: Time source used for expiry checks
+        """
+        if maxsize < 1:
+            raise ValueError("maxsize must be at least 1")
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._clock = clock
+        self._data: OrderedDict[K, tuple[V, Optional[float]]] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def get(self, key: K) -> Optional[V]:
+        """Return the cached value for key, or None if missing or expired."""
+        item = self._data.get(key)
+        if item is None:
+            return None
+
+        value, expires_at = item
+        if expires_at is not None and expires_at <= self._clock():
+            del self._data[key]
+            return None
+
+        self._data.move_to_end(key)
+        return value
+
+    def set(
+        self,
+        key: K,
+        value: V,
+        ttl: Optional[float] = None,
+        expires_at: Optional[float] = None,
+    ) -> None:
+        """
+        Store a value.
+
+        Args:
+            key: Cache key
+            value: Value to store
+            ttl: Time-to-live in seconds, overriding the cache default
+            expires_at: Absolute expiry on the cache clock, overriding ttl
+        """
+        if expires_at is None:
+            ttl = self.ttl if ttl is None else ttl
+            expires_at = None if ttl is None else self._clock() + ttl
+
+        if expires_at is not None and expires_at <= self._clock():
+            self._data.pop(key, None)
+            return
+
+        self._data[key] = (value, expires_at)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def pop(self, key: K) -> Optional[V]:
+        """Remove key and return its value if present."""
+        item = self._data.pop(key, None)
+        return item[0] if item is not None else None
+
+    def clear(self) -> None:
+        """Remove all entries."""
+        self._data.clear()
+
+
+class SingleFlight(Generic[K, V]):
+    """Collapse concurrent calls for the same key into one in-flight call.
+
+    The loader runs in its own task, so a caller being cancelled does not
+    abort the work other callers are waiting on.
+    """
+
+    def __init__(self) -> None:
+        """Initialize single-flight group."""
+        self._inflight: dict[K, asyncio.Task[V]] = {}
+
+    def __len__(self) -> int:
+        return len(self._inflight)
+
+    async def do(self, key: K, loader: Callable[[], Awaitable[V]]) -> V:
+        """
+        Run loader for key, or join the call already in flight.
+
+        Args:
+            key: Deduplication key
+            loader: Coroutine factory producing the value
+
+        Returns:
+            Loader result (shared by every concurrent caller)
+        """
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(loader())
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        return await asyncio.shield(task)
+
+
+class KeyedLock(Generic[K]):
+    """Per-key asyncio locks, dropped once nobody holds or waits for them."""
+
+    def __init__(self) -> None:
+        """Initialize keyed lock."""
+        self._locks: dict[K, asyncio.Lock] = {}
+        self._users: dict[K, int] = {}
+
+    def __len__(self) -> int:
+        return len(self._locks)
+
+    @asynccontextmanager
+    async def hold(self, key: K) -> AsyncIterator[None]:
+        """Hold the lock for key for the duration of the block."""
+        lock = self._locks.setdefault(key, asyncio.Lock())
+        self._users[key] = self._users.get(key, 0) + 1
+        try:
+            async with lock:
+                yield
+        finally:
+            self._users[key] -= 1
+            if not self._users[key]:
+                del self._users[key], self._locks[key]
@@ -0,0 +1,151 @@
+"""Lifecycle management for Firestore and Storage clients."""
+
+import asyncio
+import itertools
+from typing import Iterator, Optional
+
+import firebase_admin
+import structlog
+from google.cloud.firestore import AsyncClient, Client
+from google.cloud.storage import Client as StorageClient
+from google.cloud.firestore_v1.base_client import DEFAULT_DATABASE
+
+from app.core.blocking import blocking_executor
+from app.core.config import settings
+from app.core.firebase_admin import (
+    get_async_firestore_client,
+    get_firestore_client,
+    get_storage_client,
+    initialize_firebase_admin,
+)
+
+logger = structlog.get_logger()
+
+
+class ClientManager:
+    """Creates backend clients once at startup and warms their connections.
+
+    Started from the application lifespan: Firebase Admin is initialized, a
+    pool of ``FIRESTORE_CHANNEL_POOL_SIZE`` async Firestore clients (one gRPC
+    channel each) is created, and every channel is warmed with a cheap RPC so
+    the first real request does not pay for channel setup and credential
+    fetching. If warmup does not finish within the startup timeout it keeps
+    retrying in the background; ``ready`` stays False until it succeeds.
+    The pooled clients belong to the manager and are closed by ``stop``.
+    """
+
+    def __init__(self) -> None:
+        """Initialize client manager."""
+        self.ready = False
+        self._firestore_pool: list[AsyncClient] = []
+        self._firestore_cycle: Optional[Iterator[AsyncClient]] = None
+        self._storage: Optional[StorageClient] = None
+        self._warmup_task: Optional[asyncio.Task[None]] = None
+
+    @property
+    def firestore(self) -> AsyncClient:
+        """Async Firestore client for request code (round-robin over the pool)."""
+        if self._firestore_cycle is None:
+            # Not started (scripts, tests): fall back to the lazily created client
+            return get_async_firestore_client()
+        return next(self._firestore_cycle)
+
+    @property
+    def firestore_sync(self) -> Client:
+        """Blocking Firestore client, only for work run on the blocking executor."""
+        return get_firestore_client()
+
+    @property
+    def storage(self) -> Optional[StorageClient]:
+        """Cloud Storage client, if one is configured."""
+        if self._storage is None:
+            self._storage = get_storage_client()
+        return self._storage
+
+    async def start(self) -> None:
+        """Create clients and warm them, waiting up to the startup timeout."""
+        self._warmup_task = asyncio.create_task(self._warmup_until_ready())
+        try:
+            await asyncio.wait_for(
+                asyncio.shield(self._warmup_task), settings.CLIENT_WARMUP_TIMEOUT_SECONDS
+            )
+        except asyncio.TimeoutError:
+            logger.warning("Client warmup still running after startup timeout")
+
+    async def stop(self) -> None:
+        """Stop background warmup and close the clients."""
+        if self._warmup_task is not None and not self._warmup_task.done():
+            self._warmup_task.cancel()
+            try:
+                await self._warmup_task
+            except asyncio.CancelledError:
+                pass
+        self.ready = False
+        pool, self._firestore_pool = self._firestore_pool, []
+        self._firestore_cycle = None
+        for client in pool:
+            await self._close_firestore(client)
+        if self._storage is not None:
+            self._storage.close()
+            self._storage = None
+
+    async def _warmup_until_ready(self) -> None:
+        while True:
+            try:
+                await self._create_clients()
+                await self._warmup()
+                self.ready = True
+                logger.info("Backend clients ready", firestore_channels=len(self._firestore_pool))
+                return
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning("Client warmup failed, retrying", error=str(e))
+                await asyncio.sleep(settings.CLIENT_WARMUP_RETRY_SECONDS)
+
+    async def _create_clients(self) -> None:
+        if self._firestore_pool:
+            return
+
+        await blocking_executor.run("system", initialize_firebase_admin)
+        # Each client opens its own gRPC channel, spreading concurrent
+        # streams over several HTTP/2 connections.
+        self._firestore_pool = [
+            self._new_firestore_client() for _ in range(settings.FIRESTORE_CHANNEL_POOL_SIZE)
+        ]
+        self._firestore_cycle = itertools.cycle(self._firestore_pool)
+        self._storage = get_storage_client()
+
+    def _new_firestore_client(self) -> AsyncClient:
+        # Same credentials and project as firebase_admin's own client
+        app = firebase_admin.get_app()
+        return AsyncClient(
+            project=app.project_id,
+            credentials=app.credential.get_credential(),
+            database=DEFAULT_DATABASE,
+        )
+
+    async def _close_firestore(self, client: AsyncClient) -> None:
+        # The client exposes no handle on its gRPC channel; close() releases
+        # what it does own, and the channel goes with the process
+        try:
+            client.close()
+        except Exception as e:
+            logger.warning("Failed to close Firestore client", error=str(e))
+
+    async def _warmup(self) -> None:
+        # A point read of a missing document is the cheapest authenticated RPC
+        await asyncio.gather(
+            *(
+                client.collection("_warmup").document("ping").get()
+                for client in self._firestore_pool
+            )
+        )
+        if self._storage is not None and settings.STORAGE_BUCKET:
+            await blocking_executor.run(
+                "storage", self._storage.lookup_bucket, settings.STORAGE_BUCKET
+            )
+
+
+# Global client manager instance
+clients = ClientManager()
@@ -25,6 +25,118 @@ class Settings(BaseSettings):
     # Firebase
     GOOGLE_CLOUD_PROJECT: str = ""
     GOOGLE_APPLICATION_CREDENTIALS: str = ""
+    STORAGE_BUCKET: str = ""
+
+    # Client lifecycle
+    FIRESTORE_CHANNEL_POOL_SIZE: int = 1
+    CLIENT_WARMUP_TIMEOUT_SECONDS: float = 10.0
+    CLIENT_WARMUP_RETRY_SECONDS: float = 5.0
+
+    # Auth
+    AUTH_TOKEN_CACHE_ENABLED: bool = True
+    AUTH_TOKEN_CACHE_SIZE: int = 10000
+    AUTH_USER_RECORD_CACHE_SIZE: int = 10000
+    AUTH_USER_RECORD_CACHE_TTL_SECONDS: int = 300
+    AUTH_LOCAL_VERIFICATION: bool = True
+    AUTH_CHECK_REVOKED: bool = False
+    AUTH_CERTS_URL: str = (
+        "https://www.googleapis.com/robot/v1/metadata/x509/"
+        "securetoken@system.gserviceaccount.com"
+    )
+    AUTH_KEY_REFRESH_MIN_SECONDS: int = 60
+    AUTH_KEY_REFRESH_RETRY_SECONDS: int = 10
+
+    # Blocking I/O executor (concurrency cap, max queued calls) per category
+    BLOCKING_IO_AUTH_CONCURRENCY: int = 8
+    BLOCKING_IO_AUTH_QUEUE: int = 64
+    BLOCKING_IO_STORAGE_CONCURRENCY: int = 16
+    BLOCKING_IO_STORAGE_QUEUE: int = 128
+    BLOCKING_IO_SYSTEM_CONCURRENCY: int = 2
+    BLOCKING_IO_SYSTEM_QUEUE: int = 8
+    BLOCKING_IO_BULK_CONCURRENCY: int = 2
+    BLOCKING_IO_BULK_QUEUE: int = 4
+    # The write-behind spool is one SQLite connection, so it runs one call at a time
+    BLOCKING_IO_SPOOL_QUEUE: int = 256
+
+    # Redis (optional, shared caches across instances)
+    REDIS_URL: str = ""
+    REDIS_SOCKET_TIMEOUT_SECONDS: float = 0.25
+
+    # Cross-instance event bus (Redis pub/sub when REDIS_URL is set)
+    EVENT_BUS_CHANNEL_PREFIX: str = "aip-agents:"
+
+    # Agent config cache
+    AGENT_CACHE_SIZE: int = 1000
+    AGENT_CACHE_TTL_SECONDS: int = 60
+
+    # Optimistic agent updates
+    AGENT_UPDATE_MAX_ATTEMPTS: int = 5
+
+    # Pagination cursors (HMAC key shared by all instances)
+    CURSOR_SIGNING_KEY: str = ""
+
+    # Message history page limits (JSON body, NDJSON stream)
+    MESSAGE_PAGE_MAX_LIMIT: int = 500
+    MESSAGE_STREAM_MAX_LIMIT: int = 10000
+
+    # count() aggregation cache for list totals
+    COUNT_CACHE_SIZE: int = 10000
+    COUNT_CACHE_TTL_SECONDS: int = 15
+
+    # Session metadata cache
+    SESSION_CACHE_SIZE: int = 10000
+    SESSION_CACHE_TTL_SECONDS: int = 300
+
+    # Chat persistence
+    CHAT_WRITE_BEHIND: bool = False
+    WRITE_BEHIND_SPOOL_PATH: str = "/tmp/aip-agents/write-behind.db"
+    WRITE_BEHIND_BATCH_SIZE: int = 100
+    WRITE_BEHIND_FLUSH_INTERVAL_SECONDS: float = 0.5
+    WRITE_BEHIND_MAX_BACKOFF_SECONDS: float = 30.0
+    WRITE_BEHIND_MAX_ATTEMPTS: int = 5
+    WRITE_BEHIND_SHUTDOWN_TIMEOUT_SECONDS: float = 8.0
+
+    # Hot conversation buffer (per instance)
+    CONVERSATION_BUFFER_MAX_BYTES: int = 64 * 1024 * 1024
+    CONVERSATION_BUFFER_MESSAGES_PER_SESSION: int = 100
+
+    # Admin session export/import
+    EXPORT_CONCURRENCY: int = 16
+    EXPORT_PARTITIONS: int = 8
+    EXPORT_PARTITION_THRESHOLD_MESSAGES: int = 2000
+    IMPORT_CHUNK_SIZE: int = 2000
+    IMPORT_MAX_OPS_PER_SECOND: int = 2000
+
+    # Session deletion jobs
+    DELETE_JOB_CONCURRENCY: int = 1
+    DELETE_JOB_PROGRESS_SECONDS: float = 2.0
+    DELETE_MAX_OPS_PER_SECOND: int = 5000
+
+    # Cold message archival to Cloud Storage
+    ARCHIVE_BUCKET: str = ""  # defaults to STORAGE_BUCKET
+    ARCHIVE_LOCAL_DIR: str = ""  # filesystem stand-in for GCS (development, tests)
+    ARCHIVE_PREFIX: str = "message-archive"
+    ARCHIVE_MIN_AGE_DAYS: int = 30
+    ARCHIVE_MIN_MESSAGES: int = 200
+    ARCHIVE_SEGMENT_MESSAGES: int = 400  # one batch commit, so at most 499
+    ARCHIVE_SEGMENT_CACHE_SIZE: int = 32
+
+    # Conversation context (rolling summary + recent turns)
+    CONTEXT_WINDOW_TURNS: int = 6
+    # Verbatim turns kept while the summarizer fails; older ones are dropped
+    CONTEXT_MAX_RECENT_TURNS: int = 12
+    CONTEXT_SUMMARY_MAX_CHARS: int = 2000
+    CONTEXT_UPDATE_MAX_ATTEMPTS: int = 5
+
+    # Chat stream token coalescing (0 disables; requests can opt out)
+    STREAM_COALESCE_BYTES: int = 256
+    STREAM_COALESCE_MAX_LATENCY_MS: int = 30
+
+    # Resumable chat streams (Last-Event-ID replay; Redis-backed when REDIS_URL is set)
+    STREAM_REPLAY_MAX_FRAMES: int = 1000
+    STREAM_REPLAY_MAX_RUNS: int = 1000  # finished runs kept in process for replay
+    STREAM_REPLAY_TTL_SECONDS: int = 120
+    STREAM_RESUME_GRACE_SECONDS: float = 10.0  # generation continues without a client
 
     # ADK
     ADK_API_KEY: str = ""
@@ -0,0 +1,93 @@
+"""Opaque, signed pagination cursors."""
+
+import base64
+import binascii
+import hashlib
+import hmac
+import json
+import secrets
+from datetime import datetime
+from typing import Tuple
+
+import structlog
+
+from app.core.config import settings
+from app.core.exceptions import InvalidCursorError
+
+logger = structlog.get_logger()
+
+
+def _signing_key(configured: str, environment: str) -> bytes:
+    if configured:
+        return configured.encode()
+    # Without a shared key cursors only validate on the instance that issued
+    # them, so page 2 fails whenever it lands on another instance
+    if environment != "development":
+        raise RuntimeError("CURSOR_SIGNING_KEY must be set outside development")
+    logger.warning("CURSOR_SIGNING_KEY not set, using a per-process key")
+    return secrets.token_bytes(32)
+
+
+_key = _signing_key(settings.CURSOR_SIGNING_KEY, settings.ENVIRONMENT)
+
+
+def _b64encode(raw: bytes) -> str:
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode()
+
+
+def _b64decode(text: str) -> bytes:
+    return base64.urlsafe_b64decode(text + "=" * (-len(text) % 4))
+
+
+def _sign(body: bytes) -> bytes:
+    return hmac.new(_key, body, hashlib.sha256).digest()[:16]
+
+
+def encode_cursor(scope: str, created_at: datetime, doc_id: str) -> str:
+    """
+    Encode a (created_at, id) position as an opaque cursor.
+
+    Args:
+        scope: Query shape the cursor is valid for (filters, owner)
+        created_at: created_at of the last document returned
+        doc_id: ID of the last document returned
+
+    Returns:
+        URL-safe cursor token
+    """
+    body = json.dumps(
+        {"s": scope, "t": created_at.isoformat(), "i": doc_id},
+        separators=(",", ":"),
+    ).encode()
+    return f"{_b64encode(body)}.{_b64encode(_sign(body))}"
+
+
+def decode_cursor(token: str, scope: str) -> Tuple[datetime, str]:
+    """
+    Decode and verify a cursor issued by encode_cursor.
+
+    Args:
+        token: Cursor token from a previous page
+        scope: Query shape of the current request
+
+    Returns:
+        (created_at, id) position to start after
+
+    Raises:
+        InvalidCursorError: If the token is malformed, tampered with, or was
+            issued for a different query
+    """
+    try:
+        body_part, sig_part = token.split(".", 1)
+        body = _b64decode(body_part)
+        signature = _b64decode(sig_part)
+    except (ValueError, binascii.Error) as e:
+        raise InvalidCursorError("Malformed cursor") from e
+
+    if not hmac.compare_digest(signature, _sign(body)):
+        raise InvalidCursorError("Invalid cursor signature")
+
+    data = json.loads(body)
+    if data.get("s") != scope:
+        raise InvalidCursorError("Cursor does not match this query")
+    return datetime.fromisoformat(data["t"]), data["i"]
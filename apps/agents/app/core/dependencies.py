@@ -1,48 +1,92 @@
 """FastAPI dependency injection."""
 
-from typing import Annotated
+import hashlib
+import time
+from typing import Annotated, Any
 
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from firebase_admin import auth
 import structlog
 
-from app.core.firebase_admin import initialize_firebase_admin
+from app.core.cache import SingleFlight, TTLCache
+from app.core.config import settings
+from app.core.exceptions import ExecutorSaturatedError
+from app.core.principal import Principal
+from app.core.token_verifier import token_verifier
 
 logger = structlog.get_logger()
 
 security = HTTPBearer()
 
+# Verified token claims keyed by token hash, held until the token's exp
+_token_cache: TTLCache[str, dict[str, Any]] = TTLCache(
+    maxsize=settings.AUTH_TOKEN_CACHE_SIZE, clock=time.time
+)
+_token_flight: SingleFlight[str, dict[str, Any]] = SingleFlight()
+
+
+def _token_cache_key(token: str) -> str:
+    """Hash a bearer token so raw credentials are never kept in memory as keys."""
+    return hashlib.sha256(token.encode("utf-8")).hexdigest()
+
+
+async def verify_token(token: str) -> dict[str, Any]:
+    """
+    Verify a Firebase ID token, serving repeat tokens from cache.
+
+    Concurrent requests carrying the same token share a single verification.
+
+    Args:
+        token: Raw Firebase ID token
+
+    Returns:
+        Decoded token claims
+    """
+    if not settings.AUTH_TOKEN_CACHE_ENABLED:
+        return await token_verifier.verify(token)
+
+    key = _token_cache_key(token)
+    claims = _token_cache.get(key)
+    if claims is not None:
+        return claims
+
+    async def load() -> dict[str, Any]:
+        decoded = await token_verifier.verify(token)
+        _token_cache.set(key, decoded, expires_at=float(decoded["exp"]))
+        return decoded
+
+    return await _token_flight.do(key, load)
+
 
 async def get_current_user(
     credentials: Annotated[HTTPAuthorizationCredentials, Depends(security)]
-) -> auth.UserRecord:
+) -> Principal:
     """
     Dependency to get current authenticated user from Firebase token.
 
+    Only the token is verified; the full user record is loaded on demand via
+    ``Principal.get_user_record``.
+
     Args:
         credentials: HTTP Bearer token credentials
 
     Returns:
-        Firebase user record
+        Authenticated principal
 
     Raises:
         HTTPException: If authentication fails
     """
     try:
-        # Initialize Firebase Admin if not already done
-        initialize_firebase_admin()
-
         # Verify the Firebase ID token
         token = credentials.credentials
-        decoded_token = auth.verify_id_token(token)
-        uid = decoded_token["uid"]
-
-        # Get user record
-        user = auth.get_user(uid)
-        logger.info("User authenticated", uid=uid)
-        return user
-
+        decoded_token = await verify_token(token)
+        principal = Principal.from_claims(decoded_token)
+        logger.info("User authenticated", uid=principal.uid)
+        return principal
+
+    except ExecutorSaturatedError:
+        # Overload, not bad credentials: surfaced as 503 by the app handler
+        raise
     except Exception as e:
         logger.error("Authentication failed", error=str(e))
         raise HTTPException(
@@ -52,9 +96,32 @@ async def get_current_user(
         )
 
 
+async def get_admin_user(
+    principal: Annotated[Principal, Depends(get_current_user)]
+) -> Principal:
+    """
+    Dependency requiring an authenticated user with the ``admin`` claim.
+
+    Args:
+        principal: Authenticated principal
+
+    Returns:
+        Admin principal
+
+    Raises:
+        HTTPException: If the user is not an admin
+    """
+    if not principal.is_admin:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Admin privileges required",
+        )
+    return principal
+
+
 async def get_optional_user(
     credentials: Annotated[HTTPAuthorizationCredentials | None, Depends(security)]
-) -> auth.UserRecord | None:
+) -> Principal | None:
     """
     Dependency to optionally get current user (for endpoints that work with or without auth).
 
@@ -62,7 +129,7 @@ async def get_optional_user(
         credentials: Optional HTTP Bearer token credentials
 
     Returns:
-        Firebase user record or None
+        Authenticated principal or None
     """
     if credentials is None:
         return None
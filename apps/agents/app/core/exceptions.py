@@ -13,12 +13,24 @@ class AgentNotFoundError(AgentException):
     pass
 
 
+class AgentConflictError(AgentException):
+    """Raised when an agent update keeps losing to concurrent writers."""
+
+    pass
+
+
 class SessionNotFoundError(AgentException):
     """Raised when a session is not found."""
 
     pass
 
 
+class SessionAccessDeniedError(AgentException):
+    """Raised when a user accesses a session they do not own."""
+
+    pass
+
+
 class MessageNotFoundError(AgentException):
     """Raised when a message is not found."""
 
@@ -37,8 +49,50 @@ class FirestoreError(AgentException):
     pass
 
 
+class DeletionJobNotFoundError(AgentException):
+    """Raised when a deletion job is not found."""
+
+    pass
+
+
+class ChatRunNotFoundError(AgentException):
+    """Raised when a chat run is not found or has expired."""
+
+    pass
+
+
+class ReplayUnavailableError(AgentException):
+    """Raised when frames needed to resume a stream are no longer buffered."""
+
+    pass
+
+
+class ArchiveError(AgentException):
+    """Raised when message archive storage operations fail."""
+
+    pass
+
+
 class ValidationError(AgentException):
     """Raised when validation fails."""
 
     pass
 
+
+
+class InvalidCursorError(ValidationError):
+    """Raised when a pagination cursor is malformed or fails verification."""
+
+    pass
+
+
+class TokenVerificationError(AgentException):
+    """Raised when an ID token cannot be verified."""
+
+    pass
+
+
+class ExecutorSaturatedError(AgentException):
+    """Raised when a blocking-call executor has no queue capacity left."""
+
+    pass
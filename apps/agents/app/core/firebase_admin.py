@@ -5,16 +5,18 @@ import platform
 from typing import Optional
 
 import firebase_admin
-from firebase_admin import credentials, firestore
-from google.cloud import storage as gcs_storage
+from firebase_admin import credentials, firestore, firestore_async
+from google.cloud.firestore import AsyncClient, Client
+from google.cloud.storage import Client as StorageClient
 import structlog
 
 from app.core.config import settings
 
 logger = structlog.get_logger()
 
-_firestore_client: Optional[firestore.Client] = None
-_storage_client: Optional[gcs_storage.Client] = None
+_firestore_client: Optional[Client] = None
+_async_firestore_client: Optional[AsyncClient] = None
+_storage_client: Optional[StorageClient] = None
 
 
 def get_emulator_host() -> str:
@@ -34,10 +36,10 @@ def get_emulator_host() -> str:
 
 def initialize_firebase_admin() -> None:
     """Initialize Firebase Admin SDK."""
-    global _firestore_client, _storage_client
+    global _firestore_client, _async_firestore_client, _storage_client
 
     if firebase_admin._apps:  # type: ignore
-        logger.info("Firebase Admin already initialized")
+        logger.debug("Firebase Admin already initialized")
         return
 
     try:
@@ -112,6 +114,7 @@ def initialize_firebase_admin() -> None:
         # Even if credentials fail, emulator should work
         try:
             _firestore_client = firestore.client()
+            _async_firestore_client = firestore_async.client()
             logger.info("Firestore client initialized", emulator=is_emulator)
         except Exception as e:
             if is_emulator:
@@ -125,12 +128,14 @@ def initialize_firebase_admin() -> None:
                 # Try to create client anyway - emulator may still work
                 try:
                     _firestore_client = firestore.client()
+                    _async_firestore_client = firestore_async.client()
                     logger.info("Firestore client created for emulator (credentials ignored)")
                 except Exception:
                     # If it still fails, log but don't crash - emulator operations may still work
                     logger.warning("Firestore client creation had issues, but emulator may still function")
                     # Set a None client - operations will fail but app won't crash on startup
                     _firestore_client = None
+                    _async_firestore_client = None
             else:
                 logger.error("Failed to initialize Firestore client", error=str(e), exc_info=True)
                 raise
@@ -142,7 +147,7 @@ def initialize_firebase_admin() -> None:
             # For emulator, Storage client initialization is optional
             # Skip it if credentials are not available
             try:
-                _storage_client = gcs_storage.Client(project=project_id)
+                _storage_client = StorageClient(project=project_id)
                 logger.info("Storage client initialized for emulator")
             except Exception as storage_error:
                 logger.warning(
@@ -151,7 +156,7 @@ def initialize_firebase_admin() -> None:
                 )
                 _storage_client = None
         else:
-            _storage_client = gcs_storage.Client()
+            _storage_client = StorageClient()
             logger.info("Storage client initialized")
 
     except Exception as e:
@@ -159,7 +164,7 @@ def initialize_firebase_admin() -> None:
         raise
 
 
-def get_firestore_client() -> firestore.Client:
+def get_firestore_client() -> Client:
     """Get Firestore client instance."""
     if _firestore_client is None:
         initialize_firebase_admin()
@@ -167,7 +172,15 @@ def get_firestore_client() -> firestore.Client:
     return _firestore_client
 
 
-def get_storage_client() -> Optional[gcs_storage.Client]:
+def get_async_firestore_client() -> AsyncClient:
+    """Get async Firestore client instance (use from request handlers and services)."""
+    if _async_firestore_client is None:
+        initialize_firebase_admin()
+    assert _async_firestore_client is not None
+    return _async_firestore_client
+
+
+def get_storage_client() -> Optional[StorageClient]:
     """Get Storage client instance."""
     if _storage_client is None:
         initialize_firebase_admin()
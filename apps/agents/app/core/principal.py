@@ -0,0 +1,101 @@
+"""Authenticated principal built from verified token claims."""
+
+from dataclasses import dataclass, field
+from typing import Any, Optional
+
+from firebase_admin import auth
+
+from app.core.blocking import blocking_executor
+from app.core.cache import SingleFlight, TTLCache
+from app.core.config import settings
+
+# Claims set by Firebase Auth itself; everything else is a custom claim.
+_RESERVED_CLAIMS = frozenset(
+    {
+        "acr",
+        "amr",
+        "at_hash",
+        "aud",
+        "auth_time",
+        "azp",
+        "cnf",
+        "c_hash",
+        "email",
+        "email_verified",
+        "exp",
+        "firebase",
+        "iat",
+        "iss",
+        "jti",
+        "name",
+        "nbf",
+        "nonce",
+        "phone_number",
+        "picture",
+        "sub",
+        "uid",
+        "user_id",
+    }
+)
+
+_user_record_cache: TTLCache[str, auth.UserRecord] = TTLCache(
+    maxsize=settings.AUTH_USER_RECORD_CACHE_SIZE,
+    ttl=settings.AUTH_USER_RECORD_CACHE_TTL_SECONDS,
+)
+_user_record_flight: SingleFlight[str, auth.UserRecord] = SingleFlight()
+
+
+@dataclass(frozen=True, slots=True)
+class Principal:
+    """Authenticated caller, derived from ID token claims without an Admin API call."""
+
+    uid: str
+    email: Optional[str] = None
+    email_verified: bool = False
+    claims: dict[str, Any] = field(default_factory=dict)
+    expires_at: float = 0.0
+
+    @classmethod
+    def from_claims(cls, decoded_token: dict[str, Any]) -> "Principal":
+        """
+        Build a principal from verified token claims.
+
+        Args:
+            decoded_token: Verified Firebase ID token claims
+
+        Returns:
+            Principal for the token's subject
+        """
+        return cls(
+            uid=decoded_token["uid"],
+            email=decoded_token.get("email"),
+            email_verified=bool(decoded_token.get("email_verified", False)),
+            claims={k: v for k, v in decoded_token.items() if k not in _RESERVED_CLAIMS},
+            expires_at=float(decoded_token.get("exp", 0)),
+        )
+
+    @property
+    def is_admin(self) -> bool:
+        """Whether the caller has the ``admin`` custom claim."""
+        return self.claims.get("admin") is True
+
+    async def get_user_record(self) -> auth.UserRecord:
+        """
+        Load the full Firebase user record.
+
+        Records are served from a short-lived cache; only handlers that need
+        profile data beyond the token claims should call this.
+
+        Returns:
+            Firebase user record
+        """
+        record = _user_record_cache.get(self.uid)
+        if record is not None:
+            return record
+
+        async def load() -> auth.UserRecord:
+            user = await blocking_executor.run("auth", auth.get_user, self.uid)
+            _user_record_cache.set(self.uid, user)
+            return user
+
+        return await _user_record_flight.do(self.uid, load)
@@ -0,0 +1,168 @@
+"""Cross-instance event bus (Redis pub/sub, with an in-process fallback)."""
+
+import asyncio
+import inspect
+import json
+import uuid
+from collections import defaultdict
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Union
+
+import structlog
+from redis.asyncio import Redis
+
+from app.core.config import settings
+from app.core.redis_client import get_redis, get_subscriber_redis
+
+logger = structlog.get_logger()
+
+Handler = Callable[[Dict[str, Any]], Union[Awaitable[None], None]]
+
+
+class EventBus:
+    """In-process event bus.
+
+    Handlers subscribe to a topic and receive JSON-compatible payloads. This
+    base implementation only reaches handlers in the current process; it is
+    used when Redis is not configured and as the local leg of RedisEventBus.
+    """
+
+    def __init__(self) -> None:
+        """Initialize event bus."""
+        self.instance_id = uuid.uuid4().hex
+        self._handlers: Dict[str, List[Handler]] = defaultdict(list)
+
+    def subscribe(self, topic: str, handler: Handler) -> None:
+        """Register a handler for a topic."""
+        self._handlers[topic].append(handler)
+
+    async def publish(self, topic: str, payload: Dict[str, Any]) -> None:
+        """Deliver a payload to every handler of topic."""
+        await self._dispatch(topic, payload)
+
+    async def start(self) -> None:
+        """Start receiving remote events (no-op in process)."""
+
+    async def stop(self) -> None:
+        """Stop receiving remote events (no-op in process)."""
+
+    async def _dispatch(self, topic: str, payload: Dict[str, Any]) -> None:
+        for handler in self._handlers.get(topic, []):
+            try:
+                result = handler(payload)
+                if inspect.isawaitable(result):
+                    await result
+            except Exception as e:
+                logger.error("Event handler failed", topic=topic, error=str(e), exc_info=True)
+
+
+class RedisEventBus(EventBus):
+    """Event bus fanned out to every instance over Redis pub/sub.
+
+    Events are dispatched to local handlers immediately and published on a
+    per-topic channel; a listener task delivers events from other instances.
+    Delivery is best-effort (Redis pub/sub does not buffer for disconnected
+    subscribers), so handlers should only be used for things like cache
+    invalidation that also have a TTL backstop.
+    """
+
+    def __init__(
+        self,
+        redis: Redis,
+        subscriber: Optional[Redis] = None,
+        prefix: str = settings.EVENT_BUS_CHANNEL_PREFIX,
+        reconnect_delay: float = 1.0,
+    ) -> None:
+        """
+        Initialize Redis event bus.
+
+        Args:
+            redis: Redis client for publishing
+            subscriber: Redis client for the listener, without a socket
+                timeout (defaults to redis)
+            prefix: Channel name prefix
+            reconnect_delay: Delay before resubscribing after a listener error
+        """
+        super().__init__()
+        self.redis = redis
+        self.subscriber = subscriber if subscriber is not None else redis
+        self.prefix = prefix
+        self.reconnect_delay = reconnect_delay
+        self._task: Optional[asyncio.Task[None]] = None
+        self._subscribed = asyncio.Event()
+
+    async def publish(self, topic: str, payload: Dict[str, Any]) -> None:
+        """Dispatch locally, then broadcast to other instances."""
+        await self._dispatch(topic, payload)
+        envelope = json.dumps({"origin": self.instance_id, "payload": payload})
+        try:
+            await self.redis.publish(self.prefix + topic, envelope)
+        except Exception as e:
+            logger.warning("Event publish failed", topic=topic, error=str(e))
+
+    async def start(self) -> None:
+        """Start the listener task and wait until it is subscribed."""
+        if self._task is not None:
+            return
+        self._task = asyncio.create_task(self._listen())
+        try:
+            await asyncio.wait_for(self._subscribed.wait(), timeout=5.0)
+        except asyncio.TimeoutError:
+            logger.warning("Event bus subscription not confirmed yet")
+
+    async def stop(self) -> None:
+        """Stop the listener task."""
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+        self._subscribed.clear()
+
+    async def _listen(self) -> None:
+        while True:
+            pubsub = self.subscriber.pubsub()
+            try:
+                await pubsub.psubscribe(self.prefix + "*")
+                self._subscribed.set()
+                logger.info("Event bus subscribed", pattern=self.prefix + "*")
+                async for message in pubsub.listen():
+                    if message.get("type") != "pmessage":
+                        continue
+                    await self._handle(message["channel"], message["data"])
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning("Event bus listener error, reconnecting", error=str(e))
+                await asyncio.sleep(self.reconnect_delay)
+            finally:
+                try:
+                    await pubsub.aclose()
+                except Exception:
+                    pass
+
+    async def _handle(self, channel: Union[str, bytes], data: Union[str, bytes]) -> None:
+        if isinstance(channel, bytes):
+            channel = channel.decode()
+        try:
+            envelope = json.loads(data)
+        except (TypeError, ValueError):
+            logger.warning("Malformed event ignored", channel=channel)
+            return
+        if envelope.get("origin") == self.instance_id:
+            return
+        await self._dispatch(channel[len(self.prefix):], envelope.get("payload") or {})
+
+
+def create_event_bus() -> EventBus:
+    """Create a Redis-backed bus when Redis is configured, else an in-process one."""
+    redis = get_redis()
+    if redis is None:
+        return EventBus()
+    return RedisEventBus(redis, subscriber=get_subscriber_redis())
+
+
+# Global event bus instance
+event_bus = create_event_bus()
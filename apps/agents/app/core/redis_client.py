@@ -0,0 +1,65 @@
+"""Optional shared Redis connection."""
+
+from typing import Optional
+
+import structlog
+from redis.asyncio import Redis
+
+from app.core.config import settings
+
+logger = structlog.get_logger()
+
+_redis: Optional[Redis] = None
+_subscriber: Optional[Redis] = None
+
+
+def get_redis() -> Optional[Redis]:
+    """
+    Get the shared Redis client.
+
+    Returns:
+        Redis client, or None when REDIS_URL is not configured
+    """
+    global _redis
+    if _redis is None and settings.REDIS_URL:
+        _redis = Redis.from_url(
+            settings.REDIS_URL,
+            socket_timeout=settings.REDIS_SOCKET_TIMEOUT_SECONDS,
+            socket_connect_timeout=settings.REDIS_SOCKET_TIMEOUT_SECONDS,
+        )
+        logger.info("Redis client initialized")
+    return _redis
+
+
+def get_subscriber_redis() -> Optional[Redis]:
+    """
+    Get the Redis client for pub/sub subscriptions.
+
+    A subscriber blocks on its read until a message arrives, so the shared
+    client's socket timeout would end every idle read (and drop messages
+    published while resubscribing). This client has none; TCP keepalive
+    finds dead connections instead.
+
+    Returns:
+        Redis client, or None when REDIS_URL is not configured
+    """
+    global _subscriber
+    if _subscriber is None and settings.REDIS_URL:
+        _subscriber = Redis.from_url(
+            settings.REDIS_URL,
+            socket_timeout=None,
+            socket_connect_timeout=settings.REDIS_SOCKET_TIMEOUT_SECONDS,
+            socket_keepalive=True,
+        )
+    return _subscriber
+
+
+async def close_redis() -> None:
+    """Close the shared Redis clients."""
+    global _redis, _subscriber
+    if _redis is not None:
+        await _redis.aclose()
+        _redis = None
+    if _subscriber is not None:
+        await _subscriber.aclose()
+        _subscriber = None
@@ -0,0 +1,235 @@
+"""Declared Firestore query shapes and the index file generated from them.
+
+Every query the service issues is built from a QueryShape declared here, so
+field names live in one place and ``firestore.indexes.json`` can be
+generated from the same declarations:
+
+    python -m app.core.repository            # rewrite firestore.indexes.json
+    python -m app.core.repository --check    # fail if it is out of date
+"""
+
+import argparse
+import json
+import sys
+from dataclasses import dataclass, replace
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from google.cloud import firestore
+from google.cloud.firestore_v1.field_path import FieldPath
+
+# Collection names
+AGENTS = "agents"
+AGENT_COUNTERS = "agents-counters"
+IMPORTS = "agents-imports"
+JOBS = "agents-jobs"
+SESSIONS = "agents-sessions"
+MESSAGES = "messages"
+
+ASCENDING = firestore.Query.ASCENDING
+DESCENDING = firestore.Query.DESCENDING
+DOCUMENT_ID = FieldPath.document_id()
+
+INDEXES_FILE = Path(__file__).resolve().parents[4] / "firestore.indexes.json"
+
+# Collection groups whose index entries are generated here. The index file is
+# deployed for the whole repository, so entries for other groups are kept.
+OWNED_COLLECTION_GROUPS = frozenset({AGENTS, AGENT_COUNTERS, IMPORTS, JOBS, SESSIONS, MESSAGES})
+
+
+@dataclass(frozen=True, slots=True)
+class QueryShape:
+    """A query's equality filters, sort order and projection."""
+
+    name: str
+    collection_group: str
+    equality: Tuple[str, ...] = ()
+    order_by: Tuple[Tuple[str, str], ...] = ()
+    projection: Tuple[str, ...] = ()
+
+    def build(self, source: Any, **values: Any) -> Any:
+        """
+        Apply the shape to a collection reference or query.
+
+        Args:
+            source: Collection reference (or query) to build on
+            values: One value per equality field
+
+        Returns:
+            Query with filters, ordering and projection applied
+        """
+        if set(values) != set(self.equality):
+            raise ValueError(f"Query {self.name} filters on {self.equality}, got {tuple(values)}")
+        query = source
+        for field_path in self.equality:
+            query = query.where(field_path, "==", values[field_path])
+        for field_path, direction in self.order_by:
+            query = query.order_by(field_path, direction=direction)
+        if self.projection:
+            query = query.select(list(self.projection))
+        return query
+
+    def project(self, *fields: str) -> "QueryShape":
+        """Same query, reading only the given fields."""
+        return replace(self, projection=fields)
+
+    def composite_index(self) -> Optional[Dict[str, Any]]:
+        """Composite index serving this shape, or None if single-field indexes do."""
+        fields = [(f, ASCENDING) for f in self.equality]
+        fields += [(f, d) for f, d in self.order_by if f != DOCUMENT_ID]
+        # Equality-only queries are served by merging single-field indexes
+        if len(fields) < 2 or not self.order_by:
+            return None
+        return {
+            "collectionGroup": self.collection_group,
+            "queryScope": "COLLECTION",
+            "fields": [{"fieldPath": f, "order": d} for f, d in fields],
+        }
+
+
+def _agents_list(name: str, *equality: str) -> QueryShape:
+    return QueryShape(
+        name=name,
+        collection_group=AGENTS,
+        equality=equality,
+        order_by=(("created_at", DESCENDING), (DOCUMENT_ID, DESCENDING)),
+    )
+
+
+def _agents_count(name: str, *equality: str) -> QueryShape:
+    return QueryShape(name=name, collection_group=AGENTS, equality=equality)
+
+
+# Agent list pages, keyed by (filter by owner, filter by status)
+AGENTS_LIST = {
+    (False, False): _agents_list("agents_newest_first"),
+    (True, False): _agents_list("agents_by_owner", "created_by"),
+    (False, True): _agents_list("agents_by_status", "status"),
+    (True, True): _agents_list("agents_by_owner_status", "created_by", "status"),
+}
+
+# Agent totals, keyed like AGENTS_LIST
+AGENTS_COUNT = {
+    (False, False): _agents_count("agents_count"),
+    (True, False): _agents_count("agents_count_by_owner", "created_by"),
+    (False, True): _agents_count("agents_count_by_status", "status"),
+    (True, True): _agents_count("agents_count_by_owner_status", "created_by", "status"),
+}
+
+# Fields read for the summary list view
+AGENT_SUMMARY_FIELDS = ("id", "config.name", "status", "created_at", "updated_at")
+
+AGENT_OWNERS = QueryShape(name="agent_owners", collection_group=AGENTS, projection=("created_by",))
+
+MESSAGES_OLDEST_FIRST = QueryShape(
+    name="messages_oldest_first",
+    collection_group=MESSAGES,
+    order_by=(("created_at", ASCENDING), (DOCUMENT_ID, ASCENDING)),
+)
+MESSAGES_NEWEST_FIRST = QueryShape(
+    name="messages_newest_first",
+    collection_group=MESSAGES,
+    order_by=(("created_at", DESCENDING), (DOCUMENT_ID, DESCENDING)),
+)
+MESSAGES_COUNT = QueryShape(name="messages_count", collection_group=MESSAGES)
+# Document-ID order, so exports can split a session into ID ranges
+MESSAGES_BY_ID = QueryShape(
+    name="messages_by_id",
+    collection_group=MESSAGES,
+    order_by=((DOCUMENT_ID, ASCENDING),),
+)
+
+SESSIONS_BY_USER = QueryShape(
+    name="sessions_by_user", collection_group=SESSIONS, equality=("user_id",)
+)
+# Every document below a collection, IDs only (run on collection.recursive())
+SESSION_DESCENDANTS = QueryShape(
+    name="session_descendants", collection_group=MESSAGES, projection=(DOCUMENT_ID,)
+)
+
+# Fields the archival job needs to pick candidate sessions
+SESSIONS_ARCHIVE_SCAN = QueryShape(
+    name="sessions_archive_scan",
+    collection_group=SESSIONS,
+    projection=("created_at", "last_message_at", "message_count", "archived_count"),
+)
+
+QUERY_SHAPES: List[QueryShape] = [
+    *AGENTS_LIST.values(),
+    *AGENTS_COUNT.values(),
+    AGENT_OWNERS,
+    MESSAGES_OLDEST_FIRST,
+    MESSAGES_NEWEST_FIRST,
+    MESSAGES_COUNT,
+    MESSAGES_BY_ID,
+    SESSIONS_BY_USER,
+    SESSIONS_ARCHIVE_SCAN,
+    SESSION_DESCENDANTS,
+]
+
+# Large or free-form fields that are never filtered or sorted on. Exempting
+# them from single-field indexing saves an index write per field per update.
+UNINDEXED_FIELDS: List[Tuple[str, str]] = [
+    (AGENTS, "config.system_prompt"),
+    (AGENTS, "config.metadata"),
+    (SESSIONS, "metadata"),
+    (SESSIONS, "context"),
+    (SESSIONS, "archive"),
+    (MESSAGES, "content"),
+    (MESSAGES, "metadata"),
+]
+
+
+def render_indexes(existing: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """
+    Build the contents of firestore.indexes.json from the declarations.
+
+    Args:
+        existing: Current file contents; their entries for collection groups
+            this service does not own are carried over unchanged
+
+    Returns:
+        Index file contents
+    """
+    existing = existing or {}
+    indexes: List[Dict[str, Any]] = []
+    for shape in QUERY_SHAPES:
+        index = shape.composite_index()
+        if index is not None and index not in indexes:
+            indexes.append(index)
+    field_overrides = [
+        {"collectionGroup": group, "fieldPath": field_path, "indexes": []}
+        for group, field_path in UNINDEXED_FIELDS
+    ]
+    return {
+        "indexes": indexes + _foreign(existing.get("indexes", [])),
+        "fieldOverrides": field_overrides + _foreign(existing.get("fieldOverrides", [])),
+    }
+
+
+def _foreign(entries: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    return [e for e in entries if e.get("collectionGroup") not in OWNED_COLLECTION_GROUPS]
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Write firestore.indexes.json, or check that it is up to date."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--output", type=Path, default=INDEXES_FILE)
+    parser.add_argument("--check", action="store_true", help="fail if the file is stale")
+    args = parser.parse_args(argv)
+
+    current = args.output.read_text() if args.output.exists() else ""
+    rendered = json.dumps(render_indexes(json.loads(current or "{}")), indent=2) + "\n"
+    if args.check:
+        if current != rendered:
+            print(f"{args.output} is out of date; run python -m app.core.repository")
+            return 1
+        return 0
+
+    args.output.write_text(rendered)
+    print(f"Wrote {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,224 @@
+"""Local Firebase ID token verification with background key refresh."""
+
+import asyncio
+import os
+import re
+import time
+from typing import Any, Callable, Optional
+
+import httpx
+import structlog
+from firebase_admin import auth
+from jose import jwt
+from jose.exceptions import JOSEError
+
+from app.core.blocking import blocking_executor
+from app.core.cache import SingleFlight
+from app.core.config import settings
+from app.core.exceptions import TokenVerificationError
+
+logger = structlog.get_logger()
+
+_MAX_AGE_RE = re.compile(r"max-age=(\d+)")
+_ISSUER_PREFIX = "https://securetoken.google.com/"
+
+
+def parse_max_age(cache_control: str | None, default: float) -> float:
+    """Extract max-age seconds from a Cache-Control header."""
+    if cache_control:
+        match = _MAX_AGE_RE.search(cache_control)
+        if match:
+            return float(match.group(1))
+    return default
+
+
+class FirebaseTokenVerifier:
+    """Verifies Firebase ID tokens locally against cached Google signing keys.
+
+    Signing certificates are kept in memory and refreshed by a background task
+    on the schedule advertised in the certificate endpoint's Cache-Control
+    header. Verification itself never performs network I/O unless a token
+    references an unknown key id, in which case a single refresh is shared by
+    all waiting requests. The firebase_admin SDK is only used for revocation
+    checks, and as a fallback when local verification is not possible.
+    """
+
+    def __init__(
+        self,
+        project_id: str,
+        certs_url: str = settings.AUTH_CERTS_URL,
+        http_client: Optional[httpx.AsyncClient] = None,
+        min_refresh_interval: float = settings.AUTH_KEY_REFRESH_MIN_SECONDS,
+        retry_interval: float = settings.AUTH_KEY_REFRESH_RETRY_SECONDS,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        """
+        Initialize verifier.
+
+        Args:
+            project_id: Firebase project ID tokens must be issued for
+            certs_url: URL serving the x509 signing certificates
+            http_client: Optional HTTP client (injected in tests)
+            min_refresh_interval: Lower bound between scheduled refreshes
+            retry_interval: Delay before retrying a failed refresh
+            clock: Wall-clock time source
+        """
+        self.project_id = project_id
+        self.certs_url = certs_url
+        self.min_refresh_interval = min_refresh_interval
+        self.retry_interval = retry_interval
+        self._clock = clock
+        self._http = http_client
+        self._owns_http = http_client is None
+        self._keys: dict[str, str] = {}
+        self._keys_expire_at = 0.0
+        self._refresh_flight: SingleFlight[str, float] = SingleFlight()
+        self._refresh_task: Optional[asyncio.Task[None]] = None
+
+    @property
+    def enabled(self) -> bool:
+        """Whether tokens can be verified locally in this environment."""
+        return (
+            settings.AUTH_LOCAL_VERIFICATION
+            and bool(self.project_id)
+            # Auth emulator tokens are unsigned; leave them to the SDK.
+            and not os.getenv("FIREBASE_AUTH_EMULATOR_HOST")
+        )
+
+    async def start(self) -> None:
+        """Load signing keys and start the background refresh task."""
+        if not self.enabled or self._refresh_task is not None:
+            return
+        self._refresh_task = asyncio.create_task(self._refresh_loop())
+        logger.info("Token verifier started", project_id=self.project_id)
+
+    async def stop(self) -> None:
+        """Stop the background refresh task and release the HTTP client."""
+        if self._refresh_task is not None:
+            self._refresh_task.cancel()
+            try:
+                await self._refresh_task
+            except asyncio.CancelledError:
+                pass
+            self._refresh_task = None
+        if self._owns_http and self._http is not None:
+            await self._http.aclose()
+            self._http = None
+
+    async def refresh_keys(self) -> float:
+        """
+        Fetch the current signing certificates.
+
+        Concurrent callers share one fetch.
+
+        Returns:
+            Seconds the fetched keys may be cached for
+        """
+        return await self._refresh_flight.do("keys", self._fetch_keys)
+
+    async def _fetch_keys(self) -> float:
+        if self._http is None:
+            self._http = httpx.AsyncClient(timeout=10.0)
+
+        response = await self._http.get(self.certs_url)
+        response.raise_for_status()
+        keys = response.json()
+        if not isinstance(keys, dict) or not keys:
+            raise TokenVerificationError("Signing key response was empty")
+
+        max_age = parse_max_age(
+            response.headers.get("cache-control"), default=self.min_refresh_interval
+        )
+        self._keys = keys
+        self._keys_expire_at = self._clock() + max_age
+        logger.info("Token signing keys refreshed", key_count=len(keys), max_age=max_age)
+        return max_age
+
+    async def _refresh_loop(self) -> None:
+        while True:
+            try:
+                max_age = await self.refresh_keys()
+                # Refresh slightly ahead of expiry so keys never go stale.
+                delay = max(self.min_refresh_interval, max_age * 0.9)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning("Token signing key refresh failed", error=str(e))
+                delay = self.retry_interval
+            await asyncio.sleep(delay)
+
+    async def _get_key(self, kid: str) -> str:
+        key = self._keys.get(kid)
+        if key is None:
+            # Unknown kid usually means Google rotated keys ahead of our schedule.
+            await self.refresh_keys()
+            key = self._keys.get(kid)
+        elif self._keys_expire_at <= self._clock():
+            # Keys outlived their cache window (refresh task stalled); keep
+            # serving the known key if the endpoint is unreachable.
+            try:
+                await self.refresh_keys()
+                key = self._keys.get(kid)
+            except Exception as e:
+                logger.warning("Using stale token signing keys", error=str(e))
+        if key is None:
+            raise TokenVerificationError("Token signed with unknown key")
+        return key
+
+    async def verify(
+        self, token: str, check_revoked: bool = settings.AUTH_CHECK_REVOKED
+    ) -> dict[str, Any]:
+        """
+        Verify a Firebase ID token.
+
+        Args:
+            token: Raw Firebase ID token
+            check_revoked: Also check revocation through the Admin SDK
+
+        Returns:
+            Decoded token claims, including ``uid``
+
+        Raises:
+            TokenVerificationError: If the token is invalid
+        """
+        if not self.enabled:
+            return await blocking_executor.run(
+                "auth", auth.verify_id_token, token, check_revoked=check_revoked
+            )
+
+        try:
+            header = jwt.get_unverified_header(token)
+        except JOSEError as e:
+            raise TokenVerificationError(f"Malformed token: {e}") from e
+
+        if header.get("alg") != "RS256" or not header.get("kid"):
+            raise TokenVerificationError("Token has an unexpected signing algorithm or key id")
+
+        key = await self._get_key(header["kid"])
+        try:
+            claims: dict[str, Any] = jwt.decode(
+                token,
+                key,
+                algorithms=["RS256"],
+                audience=self.project_id,
+                issuer=_ISSUER_PREFIX + self.project_id,
+                options={"verify_at_hash": False},
+            )
+        except JOSEError as e:
+            raise TokenVerificationError(f"Invalid token: {e}") from e
+
+        subject = claims.get("sub")
+        if not isinstance(subject, str) or not subject or len(subject) > 128:
+            raise TokenVerificationError("Token has an invalid subject")
+        if claims.get("auth_time", 0) > self._clock() + 300:
+            raise TokenVerificationError("Token auth_time is in the future")
+        claims["uid"] = subject
+
+        if check_revoked:
+            await blocking_executor.run("auth", auth.verify_id_token, token, check_revoked=True)
+
+        return claims
+
+
+# Global verifier instance
+token_verifier = FirebaseTokenVerifier(project_id=settings.GOOGLE_CLOUD_PROJECT)
@@ -2,6 +2,7 @@
 
 import os
 from contextlib import asynccontextmanager
+from typing import AsyncIterator
 
 import structlog
 from fastapi import FastAPI, Request
@@ -15,13 +16,21 @@ from slowapi.errors import RateLimitExceeded
 
 from app.core.config import settings
 from app.core.logger import configure_logging
-from app.core.firebase_admin import initialize_firebase_admin
+from app.core.clients import clients
+from app.core.blocking import blocking_executor
+from app.core.pubsub import event_bus
+from app.core.redis_client import close_redis
 from app.core.middleware import RequestLoggingMiddleware, ErrorHandlingMiddleware
-from app.api.v1 import agents, chat, health
+from app.core.token_verifier import token_verifier
+from app.api.v1 import admin, agents, chat, health
+from app.services.chat_runs import chat_runs
+from app.services.session_deletion import session_deleter
+from app.services.write_behind import write_behind
 from app.core.exceptions import (
     AgentNotFoundError,
     SessionNotFoundError,
     ADKError,
+    ExecutorSaturatedError,
     FirestoreError,
 )
 
@@ -43,20 +52,34 @@ limiter = Limiter(key_func=get_remote_address)
 
 
 @asynccontextmanager
-async def lifespan(app: FastAPI):
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
     """Application lifespan events."""
     logger.info("Starting application")
 
-    # Initialize Firebase Admin
-    try:
-        initialize_firebase_admin()
-        logger.info("Firebase Admin initialized")
-    except Exception as e:
-        logger.error("Failed to initialize Firebase Admin", error=str(e))
-        # Don't fail startup, but log the error
+    # Initialize Firebase Admin and warm backend clients; readiness reports
+    # not-ready until warmup succeeds (it keeps retrying in the background)
+    await clients.start()
+
+    # Load token signing keys and keep them fresh in the background
+    await token_verifier.start()
+
+    # Receive cache invalidations from other instances
+    await event_bus.start()
+
+    # Replay and drain spooled chat writes
+    if settings.CHAT_WRITE_BEHIND:
+        await write_behind.start()
 
     yield
     logger.info("Shutting down application")
+    await session_deleter.shutdown()
+    await chat_runs.shutdown()
+    await write_behind.stop()
+    await token_verifier.stop()
+    await clients.stop()
+    await event_bus.stop()
+    await close_redis()
+    blocking_executor.shutdown()
 
 
 app = FastAPI(
@@ -79,6 +102,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Run-Id"],
 )
 
 # Add custom middleware
@@ -93,6 +117,7 @@ chat.set_limiter(limiter)
 app.include_router(agents.router, prefix="/api/v1")
 app.include_router(chat.router, prefix="/api/v1")
 app.include_router(health.router, prefix="/api/v1")
+app.include_router(admin.router, prefix="/api/v1")
 
 # Exception handlers
 @app.exception_handler(AgentNotFoundError)
@@ -135,6 +160,17 @@ async def firestore_error_handler(request: Request, exc: FirestoreError):
     )
 
 
+@app.exception_handler(ExecutorSaturatedError)
+async def executor_saturated_handler(request: Request, exc: ExecutorSaturatedError):
+    """Handle blocking executor overload."""
+    logger.warning("Blocking executor saturated", error=str(exc), path=request.url.path)
+    return JSONResponse(
+        status_code=503,
+        content={"detail": "Service temporarily overloaded"},
+        headers={"Retry-After": "1"},
+    )
+
+
 @app.get("/")
 async def root():
     """Root endpoint."""
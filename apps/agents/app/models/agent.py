@@ -57,6 +57,23 @@ class AgentResponse(BaseModel):
         from_attributes = True
 
 
+class AgentView(str, Enum):
+    """Agent list view enum."""
+
+    FULL = "full"
+    SUMMARY = "summary"
+
+
+class AgentSummary(BaseModel):
+    """Agent summary model (list view without the full config)."""
+
+    id: str
+    name: str
+    status: AgentStatus
+    created_at: datetime
+    updated_at: datetime
+
+
 class AgentListResponse(BaseModel):
     """Agent list response model."""
 
@@ -64,4 +81,15 @@ class AgentListResponse(BaseModel):
     total: int
     page: int
     page_size: int
+    next_cursor: Optional[str] = None
+
+
 
+class AgentSummaryListResponse(BaseModel):
+    """Agent summary list response model."""
+
+    agents: List[AgentSummary]
+    total: int
+    page: int
+    page_size: int
+    next_cursor: Optional[str] = None
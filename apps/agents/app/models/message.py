@@ -48,6 +48,8 @@ class ChatRequest(BaseModel):
     session_id: Optional[str] = None
     context: Dict[str, Any] = Field(default_factory=dict)
     stream: bool = False
+    # Stream every model chunk as its own event (lowest latency, more frames)
+    coalesce: bool = True
 
 
 class ChatResponse(BaseModel):
@@ -97,4 +99,47 @@ class MessageListResponse(BaseModel):
     messages: List[MessageResponse]
     total: int
     session_id: str
+    before_cursor: Optional[str] = None
+    after_cursor: Optional[str] = None
 
+
+
+class SessionImportResponse(BaseModel):
+    """Session import checkpoint model."""
+
+    import_id: str
+    committed_lines: int
+    sessions: int
+    messages: int
+    done: bool = False
+
+
+class ChatRunCancelResponse(BaseModel):
+    """Accepted cancel request for a streaming run."""
+
+    run_id: str
+
+
+class DeletionJobStatus(str, Enum):
+    """Deletion job status enumeration."""
+
+    PENDING = "pending"
+    RUNNING = "running"
+    DONE = "done"
+    FAILED = "failed"
+    INTERRUPTED = "interrupted"
+
+
+class DeletionJobResponse(BaseModel):
+    """Session deletion job model."""
+
+    id: str
+    kind: str
+    target: str
+    status: DeletionJobStatus
+    sessions: Optional[int] = None
+    sessions_deleted: int = 0
+    documents_deleted: int = 0
+    error: Optional[str] = None
+    created_at: datetime
+    updated_at: datetime
@@ -1,6 +1,6 @@
 """Google ADK service integration."""
 
-from typing import Dict, Any, Optional, AsyncIterator
+from typing import Dict, Any, List, Optional, AsyncIterator
 import structlog
 
 from app.core.config import settings
@@ -23,6 +23,7 @@ class ADKService:
         message: str,
         session_id: Optional[str] = None,
         context: Optional[Dict[str, Any]] = None,
+        history: Optional[List[Dict[str, str]]] = None,
     ) -> Dict[str, Any]:
         """
         Run agent with given message.
@@ -31,6 +32,7 @@ class ADKService:
             message: User message
             session_id: Optional session ID
             context: Optional context dictionary
+            history: Prompt messages from ConversationContext.to_prompt
 
         Returns:
             Agent response dictionary
@@ -43,6 +45,7 @@ class ADKService:
                 "Running agent",
                 message=message[:100],
                 session_id=session_id,
+                history_messages=len(history or []),
             )
 
             # TODO: Integrate with actual Google ADK
@@ -65,6 +68,7 @@ class ADKService:
         message: str,
         session_id: Optional[str] = None,
         context: Optional[Dict[str, Any]] = None,
+        history: Optional[List[Dict[str, str]]] = None,
     ) -> AsyncIterator[str]:
         """
         Stream agent response.
@@ -73,6 +77,7 @@ class ADKService:
             message: User message
             session_id: Optional session ID
             context: Optional context dictionary
+            history: Prompt messages from ConversationContext.to_prompt
 
         Yields:
             Response chunks as strings
@@ -85,6 +90,7 @@ class ADKService:
                 "Streaming agent response",
                 message=message[:100],
                 session_id=session_id,
+                history_messages=len(history or []),
             )
 
             # TODO: Integrate with actual Google ADK streaming
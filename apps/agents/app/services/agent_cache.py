@@ -0,0 +1,111 @@
+"""Read-through agent cache with cross-instance invalidation."""
+
+import math
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+import structlog
+
+from app.core.cache import SingleFlight, TTLCache
+from app.core.config import settings
+from app.core.pubsub import EventBus, event_bus
+from app.models.agent import AgentResponse
+
+logger = structlog.get_logger()
+
+INVALIDATION_TOPIC = "agents.invalidate"
+
+
+def agent_version(updated_at: datetime) -> float:
+    """Version number of an agent document (its updated_at as epoch seconds)."""
+    return updated_at.timestamp()
+
+
+class AgentCache:
+    """Per-instance agent cache, invalidated across instances via the event bus.
+
+    Reads go through ``get_or_load``: concurrent misses for one agent share a
+    single Firestore read. Invalidations carry the writer's version and leave
+    a tombstone, so a read that was already in flight when the write landed
+    cannot put the stale document back into the cache.
+    """
+
+    def __init__(
+        self,
+        bus: EventBus,
+        maxsize: int = settings.AGENT_CACHE_SIZE,
+        ttl: float = settings.AGENT_CACHE_TTL_SECONDS,
+    ) -> None:
+        """
+        Initialize agent cache.
+
+        Args:
+            bus: Event bus used to broadcast and receive invalidations
+            maxsize: Maximum agents kept in process
+            ttl: Entry time-to-live in seconds
+        """
+        self.bus = bus
+        self._entries: TTLCache[str, AgentResponse] = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._tombstones: TTLCache[str, float] = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._flight: SingleFlight[str, AgentResponse] = SingleFlight()
+        bus.subscribe(INVALIDATION_TOPIC, self._on_invalidation)
+
+    async def get_or_load(
+        self, agent_id: str, loader: Callable[[], Awaitable[AgentResponse]]
+    ) -> AgentResponse:
+        """
+        Return the cached agent, loading it once on a miss.
+
+        Args:
+            agent_id: Agent ID
+            loader: Coroutine factory reading the agent from Firestore
+
+        Returns:
+            Agent response
+        """
+        agent = self._entries.get(agent_id)
+        if agent is not None:
+            return agent
+
+        async def load() -> AgentResponse:
+            loaded = await loader()
+            self._store(loaded)
+            return loaded
+
+        return await self._flight.do(agent_id, load)
+
+    def _store(self, agent: AgentResponse) -> None:
+        tombstone = self._tombstones.get(agent.id)
+        if tombstone is not None and agent_version(agent.updated_at) < tombstone:
+            logger.debug("Skipped caching stale agent", agent_id=agent.id)
+            return
+        self._entries.set(agent.id, agent)
+
+    def _drop(self, agent_id: str, version: float) -> None:
+        self._entries.pop(agent_id)
+        previous = self._tombstones.get(agent_id)
+        self._tombstones.set(agent_id, version if previous is None else max(previous, version))
+
+    async def invalidate(self, agent_id: str, updated_at: Optional[datetime] = None) -> None:
+        """
+        Drop an agent here and on every other instance.
+
+        Args:
+            agent_id: Agent ID
+            updated_at: Version written by the update, or None for a delete
+        """
+        # Deletes carry no version: they invalidate every cached copy
+        payload: Dict[str, Any] = {"id": agent_id}
+        if updated_at is not None:
+            payload["version"] = agent_version(updated_at)
+        await self.bus.publish(INVALIDATION_TOPIC, payload)
+
+    def _on_invalidation(self, payload: Dict[str, Any]) -> None:
+        agent_id = payload.get("id")
+        if not agent_id:
+            return
+        self._drop(agent_id, float(payload.get("version", math.inf)))
+
+
+# Global agent cache instance
+agent_cache = AgentCache(event_bus)
@@ -1,26 +1,86 @@
 """Agent service for business logic."""
 
-from datetime import datetime
-from typing import Optional, List
+from datetime import datetime, timezone
+from typing import Callable, Optional, List, Tuple, TypeVar
 import uuid
 
+from google.api_core.exceptions import FailedPrecondition, NotFound
 from google.cloud import firestore
 import structlog
 
-from app.core.firebase_admin import get_firestore_client
-from app.models.agent import AgentCreate, AgentUpdate, AgentResponse, AgentStatus
-from app.core.exceptions import AgentNotFoundError, FirestoreError
+from app.core.clients import clients
+from app.core.config import settings
+from app.core.cursors import decode_cursor, encode_cursor
+from app.core.repository import (
+    AGENT_SUMMARY_FIELDS,
+    AGENTS,
+    AGENTS_COUNT,
+    AGENTS_LIST,
+    QueryShape,
+)
+from app.models.agent import (
+    AgentConfig,
+    AgentCreate,
+    AgentUpdate,
+    AgentResponse,
+    AgentStatus,
+    AgentSummary,
+)
+from app.core.exceptions import AgentConflictError, AgentNotFoundError, FirestoreError
+from app.services.agent_cache import agent_cache
+from app.services.counters import (
+    agent_counter_ref,
+    count_cache,
+    read_agent_counter,
+    seed_agent_counter,
+)
 
 logger = structlog.get_logger()
 
+# Item type of an agent list page
+_Item = TypeVar("_Item", AgentResponse, AgentSummary)
+
 
 class AgentService:
     """Service for agent operations."""
 
     def __init__(self) -> None:
         """Initialize agent service."""
-        self.db = get_firestore_client()
-        self.collection = "agents"
+        self.db = clients.firestore
+        self.collection = AGENTS
+
+    @staticmethod
+    def _to_response(data: dict) -> AgentResponse:
+        """Build an agent response from a Firestore document."""
+        return AgentResponse(
+            id=data["id"],
+            config=AgentConfig(**data["config"]),
+            status=AgentStatus(data["status"]),
+            created_at=data["created_at"],
+            updated_at=data["updated_at"],
+            created_by=data["created_by"],
+        )
+
+    @staticmethod
+    def _filters(user_id: Optional[str], status: Optional[AgentStatus]) -> dict:
+        """Equality filter values for the agent list and count shapes."""
+        filters: dict = {}
+        if user_id:
+            filters["created_by"] = user_id
+        if status:
+            filters["status"] = status.value
+        return filters
+
+    @staticmethod
+    def _to_summary(data: dict) -> AgentSummary:
+        """Build an agent summary from a projected Firestore document."""
+        return AgentSummary(
+            id=data["id"],
+            name=data["config"]["name"],
+            status=AgentStatus(data["status"]),
+            created_at=data["created_at"],
+            updated_at=data["updated_at"],
+        )
 
     async def create_agent(
         self, agent_data: AgentCreate, user_id: str
@@ -37,7 +97,7 @@ class AgentService:
         """
         try:
             agent_id = str(uuid.uuid4())
-            now = datetime.utcnow()
+            now = datetime.now(timezone.utc)
 
             agent_doc = {
                 "id": agent_id,
@@ -48,8 +108,15 @@ class AgentService:
                 "created_by": user_id,
             }
 
-            doc_ref = self.db.collection(self.collection).document(agent_id)
-            doc_ref.set(agent_doc)
+            # The agent and its owner's counter land together
+            batch = self.db.batch()
+            batch.set(self.db.collection(self.collection).document(agent_id), agent_doc)
+            batch.set(
+                agent_counter_ref(self.db, user_id),
+                {"agents": firestore.Increment(1)},
+                merge=True,
+            )
+            await batch.commit()
 
             logger.info("Agent created", agent_id=agent_id, user_id=user_id)
 
@@ -68,7 +135,7 @@ class AgentService:
 
     async def get_agent(self, agent_id: str) -> AgentResponse:
         """
-        Get agent by ID.
+        Get agent by ID (read-through cached).
 
         Args:
             agent_id: Agent ID
@@ -79,26 +146,20 @@ class AgentService:
         Raises:
             AgentNotFoundError: If agent not found
         """
+        return await agent_cache.get_or_load(agent_id, lambda: self._load_agent(agent_id))
+
+    async def _load_agent(self, agent_id: str) -> AgentResponse:
+        """Read an agent from Firestore, bypassing the cache."""
         try:
             doc_ref = self.db.collection(self.collection).document(agent_id)
-            doc = doc_ref.get()
+            doc = await doc_ref.get()
 
             if not doc.exists:
                 raise AgentNotFoundError(f"Agent {agent_id} not found")
 
             data = doc.to_dict()
             assert data is not None
-
-            from app.models.agent import AgentConfig
-
-            return AgentResponse(
-                id=data["id"],
-                config=AgentConfig(**data["config"]),
-                status=AgentStatus(data["status"]),
-                created_at=data["created_at"],
-                updated_at=data["updated_at"],
-                created_by=data["created_by"],
-            )
+            return self._to_response(data)
 
         except AgentNotFoundError:
             raise
@@ -112,57 +173,146 @@ class AgentService:
         status: Optional[AgentStatus] = None,
         limit: int = 50,
         offset: int = 0,
-    ) -> List[AgentResponse]:
+        cursor: Optional[str] = None,
+    ) -> Tuple[List[AgentResponse], Optional[str]]:
         """
         List agents with optional filtering.
 
+        Pages are ordered by (created_at, id) descending. Passing the
+        returned cursor back resumes with start_after, so each page reads
+        only limit + 1 documents however deep it is.
+
         Args:
             user_id: Filter by user ID
             status: Filter by status
             limit: Maximum number of results
-            offset: Offset for pagination
+            offset: Offset for pagination (deprecated, ignored with cursor)
+            cursor: Cursor returned by the previous page
 
         Returns:
-            List of agent responses
+            Agents on this page and the cursor for the next one (None on the
+            last page)
+
+        Raises:
+            InvalidCursorError: If the cursor is invalid for this query
         """
-        try:
-            query: firestore.Query = self.db.collection(self.collection)
+        shape = AGENTS_LIST[(bool(user_id), bool(status))]
+        return await self._list_page(
+            shape, self._to_response, user_id, status, limit, offset, cursor
+        )
+
+    async def list_agent_summaries(
+        self,
+        user_id: Optional[str] = None,
+        status: Optional[AgentStatus] = None,
+        limit: int = 50,
+        offset: int = 0,
+        cursor: Optional[str] = None,
+    ) -> Tuple[List[AgentSummary], Optional[str]]:
+        """
+        List agents like list_agents, fetching only the fields of AgentSummary.
 
-            if user_id:
-                query = query.where("created_by", "==", user_id)
+        System prompts and config metadata stay on the server. Cursors are
+        interchangeable with those of list_agents.
 
-            if status:
-                query = query.where("status", "==", status.value)
+        Args:
+            user_id: Filter by user ID
+            status: Filter by status
+            limit: Maximum number of results
+            offset: Offset for pagination (deprecated, ignored with cursor)
+            cursor: Cursor returned by the previous page
 
-            query = query.order_by("created_at", direction=firestore.Query.DESCENDING)
-            query = query.limit(limit).offset(offset)
+        Returns:
+            Agent summaries on this page and the cursor for the next one
 
-            docs = query.stream()
+        Raises:
+            InvalidCursorError: If the cursor is invalid for this query
+        """
+        shape = AGENTS_LIST[(bool(user_id), bool(status))].project(*AGENT_SUMMARY_FIELDS)
+        return await self._list_page(
+            shape, self._to_summary, user_id, status, limit, offset, cursor
+        )
 
-            agents = []
-            for doc in docs:
+    async def _list_page(
+        self,
+        shape: QueryShape,
+        to_item: Callable[[dict], _Item],
+        user_id: Optional[str],
+        status: Optional[AgentStatus],
+        limit: int,
+        offset: int,
+        cursor: Optional[str],
+    ) -> Tuple[List[_Item], Optional[str]]:
+        """Read one page of an agent list shape."""
+        scope = f"agents:{user_id or ''}:{status.value if status else ''}"
+        position = decode_cursor(cursor, scope) if cursor else None
+
+        try:
+            query = shape.build(
+                self.db.collection(self.collection), **self._filters(user_id, status)
+            )
+            if position:
+                created_at, agent_id = position
+                query = query.start_after({"created_at": created_at, "__name__": agent_id})
+            elif offset:
+                query = query.offset(offset)
+            # One extra document tells us whether there is a next page
+            query = query.limit(limit + 1)
+
+            agents: List[_Item] = []
+            async for doc in query.stream():
                 data = doc.to_dict()
                 if data:
-                    from app.models.agent import AgentConfig
-
-                    agents.append(
-                        AgentResponse(
-                            id=data["id"],
-                            config=AgentConfig(**data["config"]),
-                            status=AgentStatus(data["status"]),
-                            created_at=data["created_at"],
-                            updated_at=data["updated_at"],
-                            created_by=data["created_by"],
-                        )
-                    )
+                    agents.append(to_item(data))
+
+            next_cursor = None
+            if len(agents) > limit:
+                agents = agents[:limit]
+                last = agents[-1]
+                next_cursor = encode_cursor(scope, last.created_at, last.id)
 
             logger.info("Agents listed", count=len(agents), user_id=user_id)
-            return agents
+            return agents, next_cursor
 
         except Exception as e:
             logger.error("Failed to list agents", error=str(e))
             raise FirestoreError(f"Failed to list agents: {str(e)}") from e
 
+    async def count_agents(
+        self, user_id: Optional[str] = None, status: Optional[AgentStatus] = None
+    ) -> int:
+        """
+        Count agents matching the list filters.
+
+        A user's unfiltered total comes from the counter maintained by the
+        create and delete paths, seeded with a real count the first time it
+        is needed; other filters use a cached count() aggregation.
+
+        Args:
+            user_id: Filter by user ID
+            status: Filter by status
+
+        Returns:
+            Number of matching agents
+        """
+        try:
+            if user_id and not status:
+                total = await read_agent_counter(self.db, user_id)
+                if total is None:
+                    total = await seed_agent_counter(self.db, user_id)
+                if total is not None:
+                    return total
+
+            query = AGENTS_COUNT[(bool(user_id), bool(status))].build(
+                self.db.collection(self.collection), **self._filters(user_id, status)
+            )
+            key = ("agents", user_id, status.value if status else None)
+            return await count_cache.count(key, query)
+
+        except Exception as e:
+            logger.error("Failed to count agents", error=str(e))
+            raise FirestoreError(f"Failed to count agents: {str(e)}") from e
+
     async def update_agent(
         self, agent_id: str, agent_data: AgentUpdate, user_id: str
     ) -> AgentResponse:
@@ -179,29 +329,46 @@ class AgentService:
 
         Raises:
             AgentNotFoundError: If agent not found
+            AgentConflictError: If concurrent writers win every attempt
         """
+        update_data: dict = {}
+        if agent_data.config:
+            update_data["config"] = agent_data.config.model_dump()
+        if agent_data.status:
+            update_data["status"] = agent_data.status.value
+
         try:
             doc_ref = self.db.collection(self.collection).document(agent_id)
-            doc = doc_ref.get()
-
-            if not doc.exists:
-                raise AgentNotFoundError(f"Agent {agent_id} not found")
-
-            update_data: dict = {"updated_at": datetime.utcnow()}
 
-            if agent_data.config:
-                update_data["config"] = agent_data.config.model_dump()
+            for attempt in range(1, settings.AGENT_UPDATE_MAX_ATTEMPTS + 1):
+                doc = await doc_ref.get()
+                if not doc.exists:
+                    raise AgentNotFoundError(f"Agent {agent_id} not found")
 
-            if agent_data.status:
-                update_data["status"] = agent_data.status.value
-
-            doc_ref.update(update_data)
+                data = doc.to_dict()
+                assert data is not None
+                changes = {**update_data, "updated_at": datetime.now(timezone.utc)}
+
+                try:
+                    # Only commit on top of the version we read; a concurrent
+                    # writer fails the precondition and we re-read and retry
+                    await doc_ref.update(
+                        changes,
+                        option=self.db.write_option(last_update_time=doc.update_time),
+                    )
+                except FailedPrecondition:
+                    logger.info("Agent update conflict", agent_id=agent_id, attempt=attempt)
+                    continue
+                except NotFound as e:
+                    raise AgentNotFoundError(f"Agent {agent_id} not found") from e
 
-            logger.info("Agent updated", agent_id=agent_id, user_id=user_id)
+                await agent_cache.invalidate(agent_id, changes["updated_at"])
+                logger.info("Agent updated", agent_id=agent_id, user_id=user_id)
+                return self._to_response({**data, **changes})
 
-            return await self.get_agent(agent_id)
+            raise AgentConflictError(f"Agent {agent_id} was modified concurrently")
 
-        except AgentNotFoundError:
+        except (AgentNotFoundError, AgentConflictError):
             raise
         except Exception as e:
             logger.error("Failed to update agent", error=str(e), agent_id=agent_id)
@@ -209,23 +376,38 @@ class AgentService:
 
     async def delete_agent(self, agent_id: str, user_id: str) -> None:
         """
-        Delete an agent.
+        Delete an agent owned by the caller.
+
+        The agent is read to check its owner; ``created_by`` never changes,
+        so the delete only needs the agent to still exist, and the owner's
+        counter is decremented in the same batch.
 
         Args:
             agent_id: Agent ID
             user_id: User ID deleting the agent
 
         Raises:
-            AgentNotFoundError: If agent not found
+            AgentNotFoundError: If agent not found or owned by another user
         """
         try:
             doc_ref = self.db.collection(self.collection).document(agent_id)
-            doc = doc_ref.get()
-
-            if not doc.exists:
+            doc = await doc_ref.get()
+            # Other users' agents look missing, as they do in their listings
+            if not doc.exists or (doc.to_dict() or {}).get("created_by") != user_id:
                 raise AgentNotFoundError(f"Agent {agent_id} not found")
 
-            doc_ref.delete()
+            batch = self.db.batch()
+            batch.delete(doc_ref, option=self.db.write_option(exists=True))
+            batch.set(
+                agent_counter_ref(self.db, user_id),
+                {"agents": firestore.Increment(-1)},
+                merge=True,
+            )
+            try:
+                await batch.commit()
+            except NotFound as e:
+                raise AgentNotFoundError(f"Agent {agent_id} not found") from e
+            await agent_cache.invalidate(agent_id)
 
             logger.info("Agent deleted", agent_id=agent_id, user_id=user_id)
 
@@ -0,0 +1,396 @@
+"""In-flight chat stream runs: replay, resume and cancellation.
+
+Every ``/chat/stream`` request is a run with its own ID (returned in the
+``X-Run-Id`` header). The answer is generated by a background task that
+numbers each SSE frame (``id: {run_id}:{seq}``) and keeps the latest ones in
+a bounded replay buffer, copied to Redis when it is configured. HTTP
+responses only follow that buffer, so a client that reconnects with
+``Last-Event-ID`` picks up at the next frame while generation carries on,
+without starting a new turn.
+
+A run stops early when nobody has followed it for
+``STREAM_RESUME_GRACE_SECONDS`` or when ``POST /chat/runs/{id}/cancel`` is
+called on any instance: cancel requests go out on the event bus, and the
+instance generating the run stops pulling from the model, so abandoned
+answers stop costing model time.
+"""
+
+import asyncio
+import uuid
+from collections import deque
+from itertools import islice
+from typing import (
+    Any,
+    AsyncGenerator,
+    AsyncIterator,
+    Coroutine,
+    Deque,
+    Dict,
+    List,
+    Optional,
+    Set,
+    Tuple,
+)
+
+import structlog
+from fastapi import Request
+
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.core.exceptions import ChatRunNotFoundError, ReplayUnavailableError, ValidationError
+from app.core.pubsub import EventBus, event_bus
+from app.core.sse import with_id
+from app.services.replay_log import RedisReplayLog
+
+logger = structlog.get_logger()
+
+CANCEL_TOPIC = "chat.runs.cancel"
+# Followers on other instances keep a run from being abandoned
+FOLLOW_TOPIC = "chat.runs.follow"
+
+
+def parse_event_id(event_id: str) -> Tuple[str, int]:
+    """
+    Split a ``Last-Event-ID`` into run ID and frame number.
+
+    Raises:
+        ValidationError: If the ID was not issued by a chat stream
+    """
+    run_id, _, seq = event_id.strip().rpartition(":")
+    if not run_id or not seq.isdigit():
+        raise ValidationError(f"Invalid Last-Event-ID: {event_id!r}")
+    return run_id, int(seq)
+
+
+async def _wait_for_disconnect(request: Request) -> None:
+    """
+    Return once the client has gone away.
+
+    The body is already read, so the next ASGI message is the disconnect.
+    This waits for it rather than polling ``request.is_disconnected()``,
+    which never sees it through BaseHTTPMiddleware (its receive always
+    suspends, and ``is_disconnected`` only takes an immediate answer).
+    """
+    while (await request.receive())["type"] != "http.disconnect":
+        pass
+
+
+class ChatRun:
+    """One streamed answer and its latest frames."""
+
+    def __init__(
+        self,
+        user_id: str,
+        session_id: str,
+        max_frames: int = settings.STREAM_REPLAY_MAX_FRAMES,
+    ) -> None:
+        self.id = str(uuid.uuid4())
+        self.user_id = user_id
+        self.session_id = session_id
+        self.reason: Optional[str] = None
+        self.seq = 0
+        self.finished = False
+        # Set when guard stopped the model before its last chunk
+        self.truncated = False
+        # Copy frames to the replay log until a write fails
+        self.replicated = True
+        self._frames: Deque[bytes] = deque(maxlen=max_frames)
+        self._appended = asyncio.Event()
+        self._stopped = asyncio.Event()
+        self._followers = 0
+        self._abandon: Optional[asyncio.TimerHandle] = None
+
+    @property
+    def cancelled(self) -> bool:
+        """Whether the run was asked to stop."""
+        return self._stopped.is_set()
+
+    def cancel(self, reason: str) -> None:
+        """Stop the run; the first reason wins."""
+        if not self._stopped.is_set():
+            self.reason = reason
+            self._stopped.set()
+
+    def append(self, frame: bytes) -> bytes:
+        """
+        Number a frame and add it to the replay buffer.
+
+        Returns:
+            The frame with its ``id:`` line
+        """
+        self.seq += 1
+        framed = with_id(f"{self.id}:{self.seq}", frame)
+        self._frames.append(framed)
+        self._notify()
+        return framed
+
+    def finish(self) -> None:
+        """Mark the run complete; followers end after the last frame."""
+        self.finished = True
+        self._call_off_abandon()
+        self._notify()
+
+    def frames_after(self, after: int) -> List[bytes]:
+        """
+        Return buffered frames numbered above ``after``.
+
+        Raises:
+            ReplayUnavailableError: If some of them were already evicted
+        """
+        first = self.seq - len(self._frames) + 1
+        if after + 1 < first:
+            raise ReplayUnavailableError(f"Frames after {after} are no longer buffered")
+        return list(islice(self._frames, max(0, after + 1 - first), None))
+
+    def attach(self) -> None:
+        """Count a follower; a pending abandonment is called off."""
+        self._followers += 1
+        self._call_off_abandon()
+
+    def detach(self, grace: float) -> None:
+        """Drop a follower; the last one leaving starts the grace period."""
+        self._followers = max(0, self._followers - 1)
+        if self._followers == 0:
+            self.await_follower(grace)
+
+    def await_follower(self, grace: float) -> None:
+        """Cancel the run unless a follower attaches within ``grace`` seconds."""
+        self._call_off_abandon()
+        if not self.finished:
+            self._abandon = asyncio.get_running_loop().call_later(
+                grace, self.cancel, "disconnected"
+            )
+
+    async def follow(self, after: int, request: Request, grace: float) -> AsyncIterator[bytes]:
+        """
+        Yield frames after ``after``, then new ones as they are appended.
+
+        Ends after the last frame or when the client disconnects.
+
+        Raises:
+            ReplayUnavailableError: If the client fell behind the buffer
+        """
+        self.attach()
+        disconnected = asyncio.ensure_future(_wait_for_disconnect(request))
+        try:
+            while True:
+                if after < self.seq:
+                    frames = self.frames_after(after)
+                    after = self.seq
+                    for frame in frames:
+                        yield frame
+                    continue
+                if self.finished:
+                    return
+                appended = asyncio.ensure_future(self._appended.wait())
+                await asyncio.wait({appended, disconnected}, return_when=asyncio.FIRST_COMPLETED)
+                appended.cancel()
+                if disconnected.done():
+                    return
+        finally:
+            disconnected.cancel()
+            self.detach(grace)
+
+    async def guard(self, chunks: AsyncIterator[str]) -> AsyncGenerator[str, None]:
+        """
+        Pass chunks through until the run is cancelled.
+
+        A cancel interrupts a read that is waiting on the model, and the
+        source is closed, so the upstream request is abandoned right away.
+        ``truncated`` is set only if the model had not finished; a cancel
+        arriving after the last chunk leaves the answer complete.
+
+        Args:
+            chunks: Model output
+
+        Yields:
+            Chunks received before the cancel
+        """
+        iterator = chunks.__aiter__()
+        stopped = asyncio.ensure_future(self._stopped.wait())
+        read: Optional[asyncio.Future] = None
+        try:
+            while not self._stopped.is_set():
+                read = asyncio.ensure_future(iterator.__anext__())
+                await asyncio.wait({read, stopped}, return_when=asyncio.FIRST_COMPLETED)
+                if not read.done():
+                    break
+                try:
+                    chunk = read.result()
+                except StopAsyncIteration:
+                    return
+                finally:
+                    read = None
+                yield chunk
+            self.truncated = True
+        finally:
+            stopped.cancel()
+            if read is not None:
+                read.cancel()
+                await asyncio.wait({read})
+                if not read.cancelled():
+                    read.exception()
+            aclose = getattr(iterator, "aclose", None)
+            if aclose is not None:
+                await aclose()
+
+    def _call_off_abandon(self) -> None:
+        if self._abandon is not None:
+            self._abandon.cancel()
+            self._abandon = None
+
+    def _notify(self) -> None:
+        self._appended.set()
+        self._appended = asyncio.Event()
+
+
+class ChatRunRegistry:
+    """Runs generated on this instance, followable and cancellable from any instance."""
+
+    def __init__(
+        self,
+        bus: EventBus,
+        log: RedisReplayLog,
+        grace: float = settings.STREAM_RESUME_GRACE_SECONDS,
+        max_finished: int = settings.STREAM_REPLAY_MAX_RUNS,
+        ttl: float = settings.STREAM_REPLAY_TTL_SECONDS,
+    ) -> None:
+        """
+        Initialize registry.
+
+        Args:
+            bus: Event bus carrying cancel and follow notices between instances
+            log: Replay log copying frames for other instances
+            grace: Seconds a run keeps generating with no follower
+            max_finished: Finished runs kept for replay
+            ttl: Seconds a finished run stays replayable
+        """
+        self.bus = bus
+        self.log = log
+        self.grace = grace
+        self._runs: Dict[str, ChatRun] = {}
+        self._finished: TTLCache[str, ChatRun] = TTLCache(maxsize=max_finished, ttl=ttl)
+        self._tasks: Set[asyncio.Task] = set()
+        bus.subscribe(CANCEL_TOPIC, self._on_cancel)
+        bus.subscribe(FOLLOW_TOPIC, self._on_follow)
+
+    def start(self, run: ChatRun, work: Coroutine[Any, Any, None]) -> None:
+        """
+        Generate a run in the background.
+
+        The task is detached from the request, so it outlives disconnects.
+        The grace period starts right away, so a run whose response is
+        never read is still abandoned.
+
+        Args:
+            run: Run to register
+            work: Coroutine publishing the run's frames
+        """
+        self._runs[run.id] = run
+        run.await_follower(self.grace)
+        task = asyncio.create_task(self._produce(run, work))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def publish(self, run: ChatRun, frame: bytes, last: bool = False) -> None:
+        """Append a frame to a run (and to the replay log)."""
+        framed = run.append(frame)
+        if run.replicated:
+            run.replicated = await self.log.append(run.id, run.user_id, run.seq, framed, last)
+
+    async def follow(
+        self, run_id: str, user_id: str, after: int, request: Request
+    ) -> AsyncIterator[bytes]:
+        """
+        Follow a run from the frame after ``after``.
+
+        Args:
+            run_id: Run ID
+            user_id: UID of the caller
+            after: Last frame number the client received (0 for all)
+            request: Request whose disconnect ends the stream
+
+        Returns:
+            Frames, ending after the run's last frame or on disconnect
+
+        Raises:
+            ChatRunNotFoundError: If the run is unknown, expired or not the caller's
+            ReplayUnavailableError: If frames after ``after`` were already evicted
+        """
+        run = self._runs.get(run_id) or self._finished.get(run_id)
+        if run is not None:
+            if run.user_id != user_id:
+                raise ChatRunNotFoundError(f"Chat run {run_id} not found")
+            run.frames_after(after)
+            return run.follow(after, request, self.grace)
+
+        if await self.log.owner(run_id) != user_id:
+            raise ChatRunNotFoundError(f"Chat run {run_id} not found")
+        await self.log.check(run_id, after)
+        return self._follow_remote(run_id, after, request)
+
+    async def cancel(self, run_id: str, user_id: str) -> None:
+        """
+        Ask whichever instance generates a run to stop it.
+
+        Runs of other users and unknown runs are ignored, so callers learn
+        nothing about runs they do not own.
+
+        Args:
+            run_id: Run ID
+            user_id: UID of the caller
+        """
+        await self.bus.publish(CANCEL_TOPIC, {"run_id": run_id, "user_id": user_id})
+
+    async def shutdown(self) -> None:
+        """Stop generating; partial answers are saved as truncated."""
+        for run in self._runs.values():
+            run.cancel("shutdown")
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    async def _produce(self, run: ChatRun, work: Coroutine[Any, Any, None]) -> None:
+        try:
+            await work
+        except Exception as e:
+            logger.error("Chat run failed", run_id=run.id, error=str(e), exc_info=True)
+        finally:
+            run.finish()
+            self._runs.pop(run.id, None)
+            self._finished.set(run.id, run)
+            if run.cancelled:
+                logger.info("Chat run cancelled", run_id=run.id, reason=run.reason)
+
+    async def _follow_remote(
+        self, run_id: str, after: int, request: Request
+    ) -> AsyncIterator[bytes]:
+        await self.bus.publish(FOLLOW_TOPIC, {"run_id": run_id, "attached": True})
+        disconnected = asyncio.ensure_future(_wait_for_disconnect(request))
+        try:
+            async for frame in self.log.follow(run_id, after, disconnected):
+                yield frame
+        finally:
+            disconnected.cancel()
+            # Not awaited here: the response task may be torn down by now
+            task = asyncio.create_task(
+                self.bus.publish(FOLLOW_TOPIC, {"run_id": run_id, "attached": False})
+            )
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    def _on_cancel(self, payload: Dict[str, Any]) -> None:
+        run = self._runs.get(payload.get("run_id") or "")
+        if run is not None and run.user_id == payload.get("user_id"):
+            run.cancel("cancelled")
+
+    def _on_follow(self, payload: Dict[str, Any]) -> None:
+        run = self._runs.get(payload.get("run_id") or "")
+        if run is None:
+            return
+        if payload.get("attached"):
+            run.attach()
+        else:
+            run.detach(self.grace)
+
+
+# Global chat run registry instance
+chat_runs = ChatRunRegistry(event_bus, RedisReplayLog())
@@ -0,0 +1,607 @@
+"""Chat service for conversation persistence."""
+
+from contextlib import aclosing
+from dataclasses import dataclass, field, replace
+from datetime import datetime, timezone
+import time
+from typing import Any, AsyncGenerator, AsyncIterator, Dict, List, Optional, Tuple
+import uuid
+
+from google.api_core.exceptions import FailedPrecondition, NotFound
+from google.cloud import firestore
+import structlog
+
+from app.core.cache import KeyedLock
+from app.core.clients import clients
+from app.core.config import settings
+from app.core.cursors import decode_cursor, encode_cursor
+from app.core.repository import (
+    MESSAGES,
+    MESSAGES_COUNT,
+    MESSAGES_NEWEST_FIRST,
+    MESSAGES_OLDEST_FIRST,
+    SESSIONS,
+)
+from app.core.exceptions import (
+    FirestoreError,
+    InvalidCursorError,
+    SessionAccessDeniedError,
+    SessionNotFoundError,
+)
+from app.models.message import MessageResponse, MessageRole
+from app.services.conversation_buffer import conversation_buffer
+from app.services.context_builder import ConversationContext, context_builder
+from app.services.counters import count_cache
+from app.services.message_archive import message_archive
+from app.services.session_cache import SessionMeta, session_cache
+from app.services.write_behind import WriteOp, write_behind
+
+logger = structlog.get_logger()
+
+# Messages written per chat turn (user + assistant)
+TURN_MESSAGES = 2
+
+# Turns of one session commit one at a time on this instance
+_turn_locks: KeyedLock[str] = KeyedLock()
+
+
+@dataclass
+class ChatTurn:
+    """A chat turn whose writes are staged until the agent has answered."""
+
+    session_id: str
+    user_id: str
+    is_new_session: bool
+    user_message: Dict[str, Any]
+    started_at: datetime = field(default_factory=lambda: datetime.now(timezone.utc))
+    session: Optional[SessionMeta] = None
+    context: ConversationContext = field(default_factory=ConversationContext)
+
+    @property
+    def agent_id(self) -> Optional[str]:
+        """Agent bound to the session, if any."""
+        return self.session.agent_id if self.session else None
+
+
+@dataclass
+class MessagePage:
+    """Edge cursors of a message page, filled in while it is streamed."""
+
+    session_id: str
+    ascending: bool
+    position: Optional[Tuple[datetime, str]] = None
+    message_count: Optional[int] = None
+    has_more: bool = False
+    first: Optional[MessageResponse] = None
+    last: Optional[MessageResponse] = None
+    after: Optional[str] = None
+    # Session's archived segments, read once live messages run out
+    archive: List[Dict[str, Any]] = field(default_factory=list)
+
+    def _cursor(self, message: Optional[MessageResponse]) -> Optional[str]:
+        if message is None:
+            return None
+        return encode_cursor(message_scope(self.session_id), message.created_at, message.id)
+
+    @property
+    def before_cursor(self) -> Optional[str]:
+        """Cursor for older messages, or None when there are none."""
+        if self.ascending:
+            return self._cursor(self.first)
+        return self._cursor(self.last) if self.has_more else None
+
+    @property
+    def after_cursor(self) -> Optional[str]:
+        """Cursor for newer messages (kept even at the end, for polling)."""
+        if self.ascending:
+            return self._cursor(self.last) or self.after
+        return self._cursor(self.first)
+
+
+def message_scope(session_id: str) -> str:
+    """Cursor scope for a session's message history."""
+    return f"messages:{session_id}"
+
+
+class ChatService:
+    """Service for chat session and message persistence."""
+
+    def __init__(self) -> None:
+        """Initialize chat service."""
+        self.db = clients.firestore
+        self.collection = SESSIONS
+
+    async def create_session(
+        self,
+        user_id: str,
+        agent_id: Optional[str] = None,
+        metadata: Optional[Dict[str, Any]] = None,
+    ) -> SessionMeta:
+        """
+        Create a new chat session.
+
+        Args:
+            user_id: Owner of the session
+            agent_id: Optional agent bound to the session
+            metadata: Optional session metadata
+
+        Returns:
+            Created session metadata
+        """
+        try:
+            now = datetime.now(timezone.utc)
+            session = SessionMeta(
+                id=str(uuid.uuid4()),
+                user_id=user_id,
+                agent_id=agent_id,
+                metadata=metadata or {},
+                created_at=now,
+                last_message_at=now,
+                message_count=0,
+            )
+            await self.db.collection(self.collection).document(session.id).set(
+                {
+                    "id": session.id,
+                    "user_id": session.user_id,
+                    "agent_id": session.agent_id,
+                    "metadata": session.metadata,
+                    "created_at": session.created_at,
+                    "last_message_at": session.last_message_at,
+                    "message_count": 0,
+                }
+            )
+            await session_cache.put(session)
+
+            logger.info("Session created", session_id=session.id, user_id=user_id)
+            return session
+
+        except Exception as e:
+            logger.error("Failed to create session", error=str(e), exc_info=True)
+            raise FirestoreError(f"Failed to create session: {str(e)}") from e
+
+    async def get_session(self, session_id: str) -> SessionMeta:
+        """
+        Get session metadata, served from the session cache when possible.
+
+        Args:
+            session_id: Session ID
+
+        Returns:
+            Session metadata
+
+        Raises:
+            SessionNotFoundError: If session not found
+        """
+        session = await session_cache.get(session_id)
+        if session is not None:
+            return session
+
+        try:
+            doc = await self.db.collection(self.collection).document(session_id).get()
+        except Exception as e:
+            logger.error("Failed to get session", error=str(e), session_id=session_id)
+            raise FirestoreError(f"Failed to get session: {str(e)}") from e
+
+        if not doc.exists:
+            raise SessionNotFoundError(f"Session {session_id} not found")
+
+        data = doc.to_dict()
+        assert data is not None
+        session = SessionMeta.from_doc(data)
+        await session_cache.put(session)
+        return session
+
+    def message_page(
+        self,
+        session_id: str,
+        before: Optional[str] = None,
+        after: Optional[str] = None,
+        message_count: Optional[int] = None,
+        archive: Optional[List[Dict[str, Any]]] = None,
+    ) -> MessagePage:
+        """
+        Resolve the page of messages requested by the caller's cursors.
+
+        Without cursors the page holds the newest messages. ``before`` pages
+        back through older history, newest first; ``after`` pages forward to
+        newer messages, oldest first.
+
+        Args:
+            session_id: Session ID
+            before: Cursor of the oldest message already seen
+            after: Cursor of the newest message already seen
+            message_count: Session message count, if maintained (lets the
+                newest page be served from the conversation buffer)
+            archive: Session's archived segment index
+
+        Returns:
+            Page to pass to iter_messages
+
+        Raises:
+            InvalidCursorError: If a cursor is invalid for this session
+        """
+        if before and after:
+            raise InvalidCursorError("Use either before or after, not both")
+        scope = message_scope(session_id)
+        cursor = after or before
+        return MessagePage(
+            session_id=session_id,
+            ascending=after is not None,
+            after=after,
+            position=decode_cursor(cursor, scope) if cursor else None,
+            message_count=message_count,
+            archive=archive or [],
+        )
+
+    async def iter_messages(self, page: MessagePage, limit: int) -> AsyncIterator[MessageResponse]:
+        """
+        Stream one page of messages straight from Firestore.
+
+        The newest page of a hot session is served from the conversation
+        buffer instead, and a newest page read from Firestore warms it.
+        Pages reaching past the live messages continue into the session's
+        archived segments. Messages are yielded in query order (see ``page.ascending``); the
+        page's edge cursors are complete once the iterator is exhausted.
+
+        Args:
+            page: Page from message_page
+            limit: Maximum number of messages
+
+        Yields:
+            Message responses
+        """
+        newest_page = page.position is None and not page.ascending
+        if newest_page:
+            hit = conversation_buffer.read(page.session_id, limit, page.message_count)
+            if hit is not None:
+                buffered, page.has_more = hit
+                for item in buffered:
+                    message = item.to_response(page.session_id)
+                    if page.first is None:
+                        page.first = message
+                    page.last = message
+                    yield message
+                return
+
+        # Keep the page for the buffer only when it fits in a ring
+        seed: Optional[List[MessageResponse]] = (
+            [] if newest_page and limit <= conversation_buffer.capacity else None
+        )
+        read_started = time.monotonic()
+        count = 0
+        async with aclosing(self._read_messages(page, limit)) as messages:
+            async for message in messages:
+                if count == limit:
+                    page.has_more = True
+                    break
+                if page.first is None:
+                    page.first = message
+                page.last = message
+                count += 1
+                if seed is not None:
+                    seed.append(message)
+                yield message
+
+        if seed is not None:
+            conversation_buffer.seed(
+                page.session_id,
+                seed,
+                complete=not page.has_more,
+                message_count=page.message_count,
+                read_started=read_started,
+            )
+
+    async def _read_messages(
+        self, page: MessagePage, limit: int
+    ) -> AsyncGenerator[MessageResponse, None]:
+        """Messages past the page position in page order, live and archived."""
+        if page.ascending and page.archive:
+            async for data in message_archive.iter_messages(page.archive, page.position, True):
+                yield self._to_message(data)
+
+        shape = MESSAGES_OLDEST_FIRST if page.ascending else MESSAGES_NEWEST_FIRST
+        query = shape.build(
+            self.db.collection(self.collection).document(page.session_id).collection(MESSAGES)
+        )
+        if page.position:
+            created_at, message_id = page.position
+            query = query.start_after({"created_at": created_at, "__name__": message_id})
+        # One extra document tells us whether the page is the last one
+        query = query.limit(limit + 1)
+        async for doc in query.stream():
+            data = doc.to_dict()
+            if data:
+                yield self._to_message(data)
+
+        # Archived messages all predate the live ones
+        if not page.ascending and page.archive:
+            async for data in message_archive.iter_messages(page.archive, page.position, False):
+                yield self._to_message(data)
+
+    async def count_messages(self, session: SessionMeta) -> int:
+        """
+        Total number of messages in a session.
+
+        Served from the session's maintained counter; sessions created before
+        the counter existed fall back to a cached count() aggregation.
+
+        Args:
+            session: Authorized session metadata
+
+        Returns:
+            Message count
+        """
+        if session.message_count is not None:
+            return session.message_count
+        query = MESSAGES_COUNT.build(
+            self.db.collection(self.collection).document(session.id).collection(MESSAGES)
+        )
+        return await count_cache.count(("messages", session.id), query)
+
+    @staticmethod
+    def _to_message(data: Dict[str, Any]) -> MessageResponse:
+        """Build a message response from a Firestore document."""
+        return MessageResponse(
+            id=data["id"],
+            session_id=data["session_id"],
+            content=data["content"],
+            role=MessageRole(data["role"]),
+            metadata=data.get("metadata", {}),
+            created_at=data["created_at"],
+        )
+
+    async def authorize_session(self, session_id: str, user_id: str) -> SessionMeta:
+        """
+        Get a session and verify the user owns it.
+
+        Args:
+            session_id: Session ID
+            user_id: User requesting access
+
+        Returns:
+            Session metadata
+
+        Raises:
+            SessionNotFoundError: If session not found
+            SessionAccessDeniedError: If the user does not own the session
+        """
+        session = await self.get_session(session_id)
+        if session.user_id != user_id:
+            raise SessionAccessDeniedError(f"Access to session {session_id} denied")
+        return session
+
+    def start_turn(
+        self,
+        user_id: str,
+        message: str,
+        session: Optional[SessionMeta] = None,
+        metadata: Optional[Dict[str, Any]] = None,
+    ) -> ChatTurn:
+        """
+        Stage a new turn without touching Firestore.
+
+        Args:
+            user_id: User sending the message
+            message: User message content
+            session: Existing (authorized) session, or None to start a new one
+            metadata: Optional user message metadata
+
+        Returns:
+            Staged chat turn
+        """
+        is_new_session = session is None
+        session_id = session.id if session else str(uuid.uuid4())
+        now = datetime.now(timezone.utc)
+        message_id = str(uuid.uuid4())
+
+        return ChatTurn(
+            session_id=session_id,
+            user_id=user_id,
+            is_new_session=is_new_session,
+            user_message={
+                "id": message_id,
+                "session_id": session_id,
+                "content": message,
+                "role": "user",
+                "created_at": now,
+                "metadata": metadata or {},
+            },
+            started_at=now,
+            session=session,
+            context=ConversationContext.from_doc(session.context if session else None),
+        )
+
+    async def commit_turn(
+        self,
+        turn: ChatTurn,
+        response: str,
+        metadata: Optional[Dict[str, Any]] = None,
+    ) -> str:
+        """
+        Persist a completed turn atomically in a single batch commit.
+
+        The session create/update, user message and assistant message either
+        all land or none do, so a failed turn never leaves an orphaned user
+        message behind. With CHAT_WRITE_BEHIND enabled the batch is spooled
+        and committed in the background instead of awaited here.
+
+        The context is advanced from the session as it is now, not from the
+        copy the turn was staged with: the session is re-read and the update
+        is conditioned on its update time, so a turn committed meanwhile (on
+        any instance) makes this one re-read and retry instead of being
+        overwritten. Turns of one session on this instance commit one at a
+        time.
+
+        Args:
+            turn: Staged chat turn
+            response: Assistant response content
+            metadata: Optional assistant message metadata
+
+        Returns:
+            Assistant message ID
+
+        Raises:
+            FirestoreError: If the commit fails
+        """
+        try:
+            now = datetime.now(timezone.utc)
+            assistant_message_id = str(uuid.uuid4())
+            session_path = f"{self.collection}/{turn.session_id}"
+            message_ops = [
+                WriteOp(
+                    path=f"{session_path}/{MESSAGES}/{turn.user_message['id']}",
+                    data=turn.user_message,
+                ),
+                WriteOp(
+                    path=f"{session_path}/{MESSAGES}/{assistant_message_id}",
+                    data={
+                        "id": assistant_message_id,
+                        "session_id": turn.session_id,
+                        "content": response,
+                        "role": "assistant",
+                        "created_at": now,
+                        "metadata": metadata or {},
+                    },
+                ),
+            ]
+
+            async with _turn_locks.hold(turn.session_id):
+                if settings.CHAT_WRITE_BEHIND and write_behind.running:
+                    session = await self._spool_turn(turn, response, now, message_ops)
+                    logger.info("Chat turn queued", session_id=turn.session_id)
+                else:
+                    session = await self._write_turn(turn, response, now, message_ops)
+                    logger.info("Chat turn persisted", session_id=turn.session_id)
+                await session_cache.update(session)
+            self._buffer_turn(turn, message_ops, session.message_count)
+            return assistant_message_id
+
+        except Exception as e:
+            logger.error("Failed to persist chat turn", error=str(e), session_id=turn.session_id)
+            raise FirestoreError(f"Failed to persist chat turn: {str(e)}") from e
+
+    async def _write_turn(
+        self, turn: ChatTurn, response: str, now: datetime, message_ops: List[WriteOp]
+    ) -> SessionMeta:
+        """Commit a turn and return the session's new state."""
+        session_ref = self.db.document(f"{self.collection}/{turn.session_id}")
+        if turn.is_new_session:
+            session, session_data = await self._advance_session(turn, None, response, now)
+            batch = self.db.batch()
+            batch.set(session_ref, session_data)
+            for op in message_ops:
+                batch.set(self.db.document(op.path), op.data)
+            await batch.commit()
+            return session
+
+        for attempt in range(1, settings.CONTEXT_UPDATE_MAX_ATTEMPTS + 1):
+            snapshot = await session_ref.get()
+            data = snapshot.to_dict() if snapshot.exists else None
+            if not data:
+                raise SessionNotFoundError(f"Session {turn.session_id} not found")
+            session, session_data = await self._advance_session(
+                turn, SessionMeta.from_doc(data), response, now
+            )
+
+            batch = self.db.batch()
+            # Fails (aborting the batch) if the session changed or was deleted
+            batch.update(
+                session_ref,
+                session_data,
+                option=self.db.write_option(last_update_time=snapshot.update_time),
+            )
+            for op in message_ops:
+                batch.set(self.db.document(op.path), op.data)
+            try:
+                await batch.commit()
+            except (FailedPrecondition, NotFound):
+                # Re-read: another turn got there first, or the session is gone
+                logger.info("Session context conflict", session_id=turn.session_id, attempt=attempt)
+                continue
+            return session
+
+        raise FirestoreError(f"Session {turn.session_id} was modified concurrently")
+
+    async def _spool_turn(
+        self, turn: ChatTurn, response: str, now: datetime, message_ops: List[WriteOp]
+    ) -> SessionMeta:
+        """Spool a turn for write-behind and return the session's new state."""
+        current: Optional[SessionMeta] = None
+        if not turn.is_new_session:
+            # Turns still in the spool are not in Firestore yet, but each one
+            # updated the session cache, so that is the latest state
+            current = await session_cache.get(turn.session_id) or turn.session
+        session, session_data = await self._advance_session(turn, current, response, now)
+        # Durably spooled; the background flusher commits it as one batch.
+        # Existing sessions are updated, not merged, so a flush after a
+        # delete fails instead of bringing the session back.
+        session_path = f"{self.collection}/{turn.session_id}"
+        await write_behind.enqueue(
+            [
+                WriteOp(session_path, session_data, exists=not turn.is_new_session),
+                *message_ops,
+            ]
+        )
+        return session
+
+    async def _advance_session(
+        self,
+        turn: ChatTurn,
+        current: Optional[SessionMeta],
+        response: str,
+        now: datetime,
+    ) -> Tuple[SessionMeta, Dict[str, Any]]:
+        """
+        Apply a turn to a session's state.
+
+        Args:
+            turn: Completed turn
+            current: Session state to build on (None for a new session)
+            response: Assistant response content
+            now: Time of the turn's writes
+
+        Returns:
+            The session's new state and the session document write
+        """
+        base = ConversationContext.from_doc(current.context) if current else turn.context
+        context = await context_builder.advance(base, turn.user_message["content"], response)
+        if current is None:
+            session = SessionMeta(
+                id=turn.session_id,
+                user_id=turn.user_id,
+                created_at=turn.started_at,
+                last_message_at=now,
+                message_count=TURN_MESSAGES,
+                context=context.to_doc(),
+            )
+            return session, {
+                "id": turn.session_id,
+                "user_id": turn.user_id,
+                "created_at": turn.started_at,
+                "last_message_at": now,
+                "message_count": TURN_MESSAGES,
+                "context": context.to_doc(),
+            }
+
+        session_data: Dict[str, Any] = {"last_message_at": now, "context": context.to_doc()}
+        count = current.message_count
+        if count is not None:
+            session_data["message_count"] = firestore.Increment(TURN_MESSAGES)
+        session = replace(
+            current,
+            last_message_at=now,
+            message_count=None if count is None else count + TURN_MESSAGES,
+            context=context.to_doc(),
+        )
+        return session, session_data
+
+    def _buffer_turn(
+        self, turn: ChatTurn, message_ops: List[WriteOp], message_count: Optional[int]
+    ) -> None:
+        """Append a committed turn to the conversation buffer."""
+        conversation_buffer.append(
+            turn.session_id,
+            [op.data for op in message_ops],
+            message_count=message_count,
+            new_session=turn.is_new_session,
+        )
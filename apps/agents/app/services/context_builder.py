@@ -0,0 +1,175 @@
+"""Conversation context: a rolling summary plus a window of recent turns."""
+
+import re
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Protocol
+
+import structlog
+
+from app.core.config import settings
+
+logger = structlog.get_logger()
+
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s")
+
+
+@dataclass
+class ConversationContext:
+    """Everything the agent sees of a session's past.
+
+    Stored on the session document under ``context``, so assembling the
+    prompt for a turn reads one small document however long the session is.
+    """
+
+    summary: str = ""
+    recent: List[Dict[str, str]] = field(default_factory=list)
+    summarized_turns: int = 0
+
+    @classmethod
+    def from_doc(cls, data: Optional[Dict[str, Any]]) -> "ConversationContext":
+        """Build from the session document's context field."""
+        if not data:
+            return cls()
+        return cls(
+            summary=data.get("summary", ""),
+            recent=list(data.get("recent", [])),
+            summarized_turns=data.get("summarized_turns", 0),
+        )
+
+    def to_doc(self) -> Dict[str, Any]:
+        return {
+            "summary": self.summary,
+            "recent": self.recent,
+            "summarized_turns": self.summarized_turns,
+        }
+
+    def to_prompt(self, message: str) -> List[Dict[str, str]]:
+        """
+        Assemble the chat history for the next turn.
+
+        Args:
+            message: New user message
+
+        Returns:
+            Role/content messages: summary, recent turns, then the new message
+        """
+        messages: List[Dict[str, str]] = []
+        if self.summary:
+            summary = f"Summary of the conversation so far:\n{self.summary}"
+            messages.append({"role": "system", "content": summary})
+        messages.extend(self.recent)
+        messages.append({"role": "user", "content": message})
+        return messages
+
+
+class Summarizer(Protocol):
+    """Folds turns that leave the recent window into the rolling summary."""
+
+    async def summarize(self, summary: str, turns: List[Dict[str, str]]) -> str:
+        """
+        Return the summary updated with turns.
+
+        Args:
+            summary: Summary of everything before turns
+            turns: Role/content messages to fold in, oldest first
+
+        Returns:
+            Updated summary
+        """
+        ...
+
+
+class ExtractiveSummarizer:
+    """Summarizer that keeps the first sentence of each message.
+
+    Deterministic and free to run; the summary is capped at ``max_chars`` by
+    dropping its oldest lines first.
+    """
+
+    def __init__(self, max_chars: int = settings.CONTEXT_SUMMARY_MAX_CHARS) -> None:
+        """
+        Initialize summarizer.
+
+        Args:
+            max_chars: Maximum summary length
+        """
+        self.max_chars = max_chars
+
+    async def summarize(self, summary: str, turns: List[Dict[str, str]]) -> str:
+        lines = summary.splitlines() if summary else []
+        for turn in turns:
+            first = _SENTENCE_END.split(turn["content"].strip(), maxsplit=1)[0]
+            lines.append(f"{turn['role']}: {first}")
+        while lines and len("\n".join(lines)) > self.max_chars:
+            lines.pop(0)
+        return "\n".join(lines)
+
+
+class ContextBuilder:
+    """Advances a session's context by one turn at a time.
+
+    The last ``window_turns`` turns are kept verbatim; older turns are folded
+    into the summary as they leave the window, so each turn costs one
+    summarizer call on one turn rather than a pass over the transcript.
+    While the summarizer fails, evicted turns stay verbatim, up to
+    ``max_recent_turns``; beyond that the oldest are dropped unsummarized.
+    """
+
+    def __init__(
+        self,
+        summarizer: Summarizer,
+        window_turns: int = settings.CONTEXT_WINDOW_TURNS,
+        max_recent_turns: int = settings.CONTEXT_MAX_RECENT_TURNS,
+    ) -> None:
+        """
+        Initialize context builder.
+
+        Args:
+            summarizer: Summarizer used for turns leaving the window
+            window_turns: Number of recent turns kept verbatim
+            max_recent_turns: Verbatim turns kept while summarization fails
+        """
+        self.summarizer = summarizer
+        self.window_turns = window_turns
+        self.max_recent_turns = max(window_turns, max_recent_turns)
+
+    async def advance(
+        self, context: ConversationContext, user_message: str, response: str
+    ) -> ConversationContext:
+        """
+        Return the context after a completed turn.
+
+        Args:
+            context: Context the turn was answered with
+            user_message: User message of the turn
+            response: Assistant response of the turn
+
+        Returns:
+            Updated context
+        """
+        recent = context.recent + [
+            {"role": "user", "content": user_message},
+            {"role": "assistant", "content": response},
+        ]
+        # Each turn is a user message plus an assistant message
+        overflow = len(recent) - 2 * self.window_turns
+        if overflow <= 0:
+            return ConversationContext(context.summary, recent, context.summarized_turns)
+
+        evicted, recent = recent[:overflow], recent[overflow:]
+        try:
+            summary = await self.summarizer.summarize(context.summary, evicted)
+        except Exception as e:
+            # Keep the turns verbatim and try again on the next turn
+            logger.warning("Conversation summarization failed", error=str(e))
+            recent = evicted + recent
+            dropped = len(recent) - 2 * self.max_recent_turns
+            if dropped > 0:
+                logger.warning("Dropped unsummarized turns", turns=dropped // 2)
+                recent = recent[dropped:]
+            return ConversationContext(context.summary, recent, context.summarized_turns)
+        return ConversationContext(summary, recent, context.summarized_turns + overflow // 2)
+
+
+# Global context builder instance
+context_builder = ContextBuilder(ExtractiveSummarizer())
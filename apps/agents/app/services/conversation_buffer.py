@@ -0,0 +1,278 @@
+"""In-process buffer of recent messages for active sessions."""
+
+import json
+import time
+from collections import OrderedDict
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import structlog
+
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.models.message import MessageResponse, MessageRole
+
+logger = structlog.get_logger()
+
+# Approximate per-message bookkeeping cost on top of content and metadata
+_MESSAGE_OVERHEAD_BYTES = 200
+
+
+class BufferedMessage:
+    """One buffered message, slotted to keep per-message overhead small."""
+
+    __slots__ = ("id", "role", "content", "created_at", "metadata", "size")
+
+    def __init__(
+        self,
+        id: str,
+        role: str,
+        content: str,
+        created_at: datetime,
+        metadata: Optional[Dict[str, Any]] = None,
+    ) -> None:
+        self.id = id
+        self.role = role
+        self.content = content
+        # Aware UTC, like the timestamps Firestore returns, so a message
+        # serializes the same whether it is served from here or from Firestore
+        self.created_at = (
+            created_at.replace(tzinfo=timezone.utc)
+            if created_at.tzinfo is None
+            else created_at.astimezone(timezone.utc)
+        )
+        self.metadata = metadata or None
+        self.size = _MESSAGE_OVERHEAD_BYTES + len(content.encode())
+        if self.metadata:
+            self.size += len(json.dumps(self.metadata, default=str))
+
+    @classmethod
+    def from_doc(cls, data: Dict[str, Any]) -> "BufferedMessage":
+        """Build from a Firestore message document."""
+        return cls(
+            data["id"], data["role"], data["content"], data["created_at"], data.get("metadata")
+        )
+
+    @classmethod
+    def from_response(cls, message: MessageResponse) -> "BufferedMessage":
+        return cls(
+            message.id,
+            message.role.value,
+            message.content,
+            message.created_at,
+            message.metadata,
+        )
+
+    def to_response(self, session_id: str) -> MessageResponse:
+        return MessageResponse(
+            id=self.id,
+            session_id=session_id,
+            content=self.content,
+            role=MessageRole(self.role),
+            metadata=self.metadata or {},
+            created_at=self.created_at,
+        )
+
+
+class _Ring:
+    """Fixed-capacity ring of a session's newest messages."""
+
+    __slots__ = ("slots", "start", "length", "bytes", "complete", "message_count")
+
+    def __init__(self, capacity: int, complete: bool, message_count: int) -> None:
+        self.slots: List[Optional[BufferedMessage]] = [None] * capacity
+        self.start = 0
+        self.length = 0
+        self.bytes = 0
+        # Whether the ring still holds the session's first message
+        self.complete = complete
+        self.message_count = message_count
+
+    def push(self, message: BufferedMessage) -> None:
+        capacity = len(self.slots)
+        if self.length == capacity:
+            oldest = self.slots[self.start]
+            assert oldest is not None
+            self.bytes -= oldest.size
+            self.slots[self.start] = message
+            self.start = (self.start + 1) % capacity
+            self.complete = False
+        else:
+            self.slots[(self.start + self.length) % capacity] = message
+            self.length += 1
+        self.bytes += message.size
+
+    def newest(self, limit: int) -> List[BufferedMessage]:
+        capacity = len(self.slots)
+        count = min(limit, self.length)
+        newest = []
+        for i in range(count):
+            message = self.slots[(self.start + self.length - 1 - i) % capacity]
+            assert message is not None
+            newest.append(message)
+        return newest
+
+
+class ConversationBuffer:
+    """Recent messages of hot sessions, bounded by a global byte budget.
+
+    Turns are appended as they are committed, so the newest page of an
+    active session is served from memory. Whole sessions are evicted least
+    recently used first once the budget is exceeded. Each ring remembers the
+    session's message count; a read whose expected count differs (a turn
+    was written by another instance) drops the ring and misses.
+    """
+
+    def __init__(
+        self,
+        max_bytes: int = settings.CONVERSATION_BUFFER_MAX_BYTES,
+        messages_per_session: int = settings.CONVERSATION_BUFFER_MESSAGES_PER_SESSION,
+    ) -> None:
+        """
+        Initialize buffer.
+
+        Args:
+            max_bytes: Global budget across all sessions
+            messages_per_session: Ring capacity per session
+        """
+        self.max_bytes = max_bytes
+        self.capacity = messages_per_session
+        self._sessions: "OrderedDict[str, _Ring]" = OrderedDict()
+        self._bytes = 0
+        # Appends to sessions that were not buffered; they make older reads stale
+        self._written: TTLCache[str, float] = TTLCache(maxsize=10000, ttl=60)
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    def append(
+        self,
+        session_id: str,
+        messages: Iterable[Dict[str, Any]],
+        message_count: Optional[int],
+        new_session: bool = False,
+    ) -> None:
+        """
+        Record messages just written to a session.
+
+        Args:
+            session_id: Session ID
+            messages: Message documents, oldest first
+            message_count: Session message count after the write (None if
+                the session has no maintained counter)
+            new_session: Whether the messages are the session's first
+        """
+        ring = self._sessions.get(session_id)
+        if ring is None and not new_session:
+            # Not hot here; only make sure an in-flight seed cannot go stale
+            self._written.set(session_id, time.monotonic())
+            return
+        if message_count is None:
+            self.invalidate(session_id)
+            return
+        if ring is None:
+            ring = _Ring(self.capacity, complete=True, message_count=0)
+            self._sessions[session_id] = ring
+
+        before = ring.bytes
+        for data in messages:
+            ring.push(BufferedMessage.from_doc(data))
+        ring.message_count = message_count
+        self._bytes += ring.bytes - before
+        self._sessions.move_to_end(session_id)
+        self._evict()
+
+    def seed(
+        self,
+        session_id: str,
+        newest: List[MessageResponse],
+        complete: bool,
+        message_count: Optional[int],
+        read_started: float,
+    ) -> None:
+        """
+        Warm a session from a page read from Firestore.
+
+        Args:
+            session_id: Session ID
+            newest: Newest messages of the session, newest first
+            complete: Whether newest is the session's whole history
+            message_count: Session message count the page was read against
+            read_started: time.monotonic() when the read began
+        """
+        if message_count is None or session_id in self._sessions:
+            return
+        written = self._written.get(session_id)
+        if written is not None and written >= read_started:
+            return
+
+        ring = _Ring(self.capacity, complete=complete, message_count=message_count)
+        for message in reversed(newest[: self.capacity]):
+            ring.push(BufferedMessage.from_response(message))
+        if len(newest) > self.capacity:
+            ring.complete = False
+        self._sessions[session_id] = ring
+        self._bytes += ring.bytes
+        self._evict()
+
+    def read(
+        self, session_id: str, limit: int, message_count: Optional[int]
+    ) -> Optional[Tuple[List[BufferedMessage], bool]]:
+        """
+        Return a session's newest messages if they are buffered.
+
+        Args:
+            session_id: Session ID
+            limit: Number of messages wanted
+            message_count: Session message count known to the caller
+
+        Returns:
+            (messages newest first, whether older messages exist), or None
+            on a miss
+        """
+        ring = self._sessions.get(session_id)
+        if ring is None or message_count is None:
+            self.misses += 1
+            return None
+        if ring.message_count != message_count:
+            self.invalidate(session_id)
+            self.misses += 1
+            return None
+        if ring.length < limit and not ring.complete:
+            self.misses += 1
+            return None
+
+        self._sessions.move_to_end(session_id)
+        self.hits += 1
+        has_more = ring.length > limit or not ring.complete
+        return ring.newest(limit), has_more
+
+    def invalidate(self, session_id: str) -> None:
+        """Drop a session from the buffer."""
+        ring = self._sessions.pop(session_id, None)
+        if ring is not None:
+            self._bytes -= ring.bytes
+
+    def _evict(self) -> None:
+        while self._bytes > self.max_bytes and self._sessions:
+            _, ring = self._sessions.popitem(last=False)
+            self._bytes -= ring.bytes
+            self.evictions += 1
+
+    def metrics(self) -> Dict[str, Any]:
+        """Occupancy and hit counters."""
+        return {
+            "sessions": len(self._sessions),
+            "bytes": self._bytes,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
+
+
+# Global conversation buffer instance
+conversation_buffer = ConversationBuffer()
@@ -0,0 +1,176 @@
+"""Document counts without scanning documents."""
+
+import asyncio
+from collections import Counter
+from typing import Hashable, Optional, cast
+
+import structlog
+from google.api_core.exceptions import AlreadyExists, FailedPrecondition
+from google.cloud import firestore
+from google.cloud.firestore_v1.async_aggregation import AsyncAggregationQuery
+
+from app.core.cache import SingleFlight, TTLCache
+from app.core.clients import clients
+from app.core.config import settings
+from app.core.repository import AGENT_COUNTERS, AGENT_OWNERS, AGENTS, AGENTS_COUNT
+
+logger = structlog.get_logger()
+
+
+async def count_documents(query: firestore.AsyncQuery) -> int:
+    """Run a count() aggregation over query."""
+    # AsyncQuery.count() is annotated as returning the class, not an instance
+    aggregation = cast(AsyncAggregationQuery, query.count(alias="total"))
+    results = await aggregation.get()
+    return int(results[0][0].value)
+
+
+class CountCache:
+    """Short-TTL cache in front of Firestore count() aggregation queries.
+
+    Aggregations are answered from the index (billed per 1000 index entries)
+    rather than by reading documents, but they are still a round trip; the
+    cache and single-flight keep bursts of identical list requests to one.
+    """
+
+    def __init__(
+        self,
+        maxsize: int = settings.COUNT_CACHE_SIZE,
+        ttl: float = settings.COUNT_CACHE_TTL_SECONDS,
+    ) -> None:
+        """
+        Initialize count cache.
+
+        Args:
+            maxsize: Maximum cached counts
+            ttl: Count time-to-live in seconds
+        """
+        self._counts: TTLCache[Hashable, int] = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._flight: SingleFlight[Hashable, int] = SingleFlight()
+
+    async def count(self, key: Hashable, query: firestore.AsyncQuery) -> int:
+        """
+        Count the documents matching query.
+
+        Args:
+            key: Cache key identifying the query shape and filters
+            query: Query to count
+
+        Returns:
+            Number of matching documents
+        """
+        cached = self._counts.get(key)
+        if cached is not None:
+            return cached
+
+        async def load() -> int:
+            total = await count_documents(query)
+            self._counts.set(key, total)
+            return total
+
+        return await self._flight.do(key, load)
+
+    def invalidate(self, key: Hashable) -> None:
+        """Drop a cached count."""
+        self._counts.pop(key)
+
+
+def agent_counter_ref(db: firestore.AsyncClient, user_id: str) -> firestore.AsyncDocumentReference:
+    """Counter document ({"agents": n, "seeded": true}) holding a user's agent count.
+
+    The agent write paths only increment it, so it is trusted once it has
+    been seeded with a real count; until then it may cover only the agents
+    created since counters existed.
+    """
+    return db.collection(AGENT_COUNTERS).document(user_id)
+
+
+async def read_agent_counter(db: firestore.AsyncClient, user_id: str) -> Optional[int]:
+    """Return a user's maintained agent count, or None if it is not seeded (or drifted)."""
+    doc = await agent_counter_ref(db, user_id).get()
+    data = (doc.to_dict() or {}) if doc.exists else {}
+    if not data.get("seeded"):
+        return None
+    total = int(data.get("agents", 0))
+    if total < 0:
+        # Only possible if an agent was deleted by someone other than its owner
+        logger.warning("Agent counter drifted below zero", user_id=user_id, agents=total)
+        return None
+    return total
+
+
+async def seed_agent_counter(
+    db: firestore.AsyncClient,
+    user_id: str,
+    max_attempts: int = settings.AGENT_UPDATE_MAX_ATTEMPTS,
+) -> Optional[int]:
+    """
+    Set a user's counter to the real count of their agents.
+
+    The write is conditioned on the counter as read before counting; an
+    agent created or deleted meanwhile also moves the counter (both land in
+    one batch), failing the write so the count is taken again.
+
+    Args:
+        db: Async Firestore client
+        user_id: Owner of the agents
+        max_attempts: Counts taken before giving up to concurrent writers
+
+    Returns:
+        The seeded count, or None if every attempt lost to a writer
+    """
+    ref = agent_counter_ref(db, user_id)
+    query = AGENTS_COUNT[(True, False)].build(db.collection(AGENTS), created_by=user_id)
+    for _ in range(max_attempts):
+        snapshot = await ref.get()
+        total = await count_documents(query)
+        seeded = {"agents": total, "seeded": True}
+        try:
+            if snapshot.exists:
+                await ref.update(
+                    seeded, option=db.write_option(last_update_time=snapshot.update_time)
+                )
+            else:
+                await ref.create(seeded)
+        except (AlreadyExists, FailedPrecondition):
+            continue
+        logger.info("Agent counter seeded", user_id=user_id, agents=total)
+        return total
+    return None
+
+
+async def backfill_agent_counters() -> int:
+    """
+    Rebuild every user's agent counter from the agents collection.
+
+    Counters are maintained by the agent write paths; run this once for data
+    written before they existed (``python -m app.services.counters``).
+
+    Returns:
+        Number of counter documents written
+    """
+    db = clients.firestore
+    counts: Counter[str] = Counter()
+    async for doc in AGENT_OWNERS.build(db.collection(AGENTS)).stream():
+        created_by = (doc.to_dict() or {}).get("created_by")
+        if created_by:
+            counts[created_by] += 1
+
+    batch = db.batch()
+    for i, (user_id, total) in enumerate(counts.items(), start=1):
+        batch.set(agent_counter_ref(db, user_id), {"agents": total, "seeded": True})
+        if i % 500 == 0:
+            await batch.commit()
+            batch = db.batch()
+    await batch.commit()
+
+    logger.info("Agent counters backfilled", users=len(counts))
+    return len(counts)
+
+
+# Global count cache instance
+count_cache = CountCache()
+
+
+if __name__ == "__main__":
+    asyncio.run(backfill_agent_counters())
@@ -0,0 +1,406 @@
+"""Archival of cold session messages to Cloud Storage.
+
+Messages older than ``ARCHIVE_MIN_AGE_DAYS`` are packed, oldest first, into
+gzip-compressed NDJSON segments (see ``app.services.records``) and their
+Firestore documents are deleted. The session document keeps the segment
+index under ``archive``; archived messages always precede live ones, so a
+page that runs out of live messages continues into the segments.
+
+Run the job with ``python -m app.services.message_archive``.
+"""
+
+import asyncio
+import gzip
+import shutil
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, AsyncIterator, Dict, List, Optional, Protocol, Tuple
+
+import structlog
+from google.api_core.exceptions import FailedPrecondition, NotFound
+from google.cloud import firestore
+
+from app.core.blocking import blocking_executor
+from app.core.cache import SingleFlight, TTLCache
+from app.core.clients import clients
+from app.core.config import settings
+from app.core.exceptions import ArchiveError
+from app.core.repository import MESSAGES, MESSAGES_OLDEST_FIRST, SESSIONS, SESSIONS_ARCHIVE_SCAN
+from app.services.records import decode_line, encode_line
+from app.services.session_cache import session_cache
+
+logger = structlog.get_logger()
+
+SEGMENT_CONTENT_TYPE = "application/x-ndjson"
+# Commit conflicts tolerated per session before it is left for the next run
+_MAX_CONFLICTS = 3
+
+
+class ArchiveStore(Protocol):
+    """Blob storage for archive segments."""
+
+    async def put(self, name: str, data: bytes) -> None:
+        ...
+
+    async def get(self, name: str) -> bytes:
+        ...
+
+    async def delete(self, name: str) -> None:
+        ...
+
+    async def delete_prefix(self, prefix: str) -> int:
+        ...
+
+
+class GCSArchiveStore:
+    """Archive segments in a Cloud Storage bucket."""
+
+    def __init__(self, bucket: str) -> None:
+        """
+        Initialize store.
+
+        Args:
+            bucket: Bucket name
+        """
+        client = clients.storage
+        if client is None:
+            raise ArchiveError("Cloud Storage client is not available")
+        self.bucket = client.bucket(bucket)
+
+    async def put(self, name: str, data: bytes) -> None:
+        blob = self.bucket.blob(name)
+        blob.content_encoding = "gzip"
+        await blocking_executor.run(
+            "storage", blob.upload_from_string, data, content_type=SEGMENT_CONTENT_TYPE
+        )
+
+    async def get(self, name: str) -> bytes:
+        # raw_download keeps the stored gzip bytes instead of decoding them
+        blob = self.bucket.blob(name)
+        return await blocking_executor.run("storage", blob.download_as_bytes, raw_download=True)
+
+    async def delete(self, name: str) -> None:
+        try:
+            await blocking_executor.run("storage", self.bucket.blob(name).delete)
+        except NotFound:
+            pass
+
+    async def delete_prefix(self, prefix: str) -> int:
+        def delete() -> int:
+            blobs = list(self.bucket.list_blobs(prefix=prefix))
+            # Blobs already gone are ignored
+            self.bucket.delete_blobs(blobs, on_error=lambda _: None)
+            return len(blobs)
+
+        return await blocking_executor.run("storage", delete)
+
+
+class LocalArchiveStore:
+    """Archive segments in a local directory, standing in for GCS."""
+
+    def __init__(self, root: str) -> None:
+        """
+        Initialize store.
+
+        Args:
+            root: Directory segments are written under
+        """
+        self.root = Path(root)
+
+    async def put(self, name: str, data: bytes) -> None:
+        path = self.root / name
+
+        def write() -> None:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_bytes(data)
+
+        await blocking_executor.run("storage", write)
+
+    async def get(self, name: str) -> bytes:
+        try:
+            return await blocking_executor.run("storage", (self.root / name).read_bytes)
+        except FileNotFoundError as e:
+            raise ArchiveError(f"Archive segment {name} not found") from e
+
+    async def delete(self, name: str) -> None:
+        await blocking_executor.run("storage", (self.root / name).unlink, missing_ok=True)
+
+    async def delete_prefix(self, prefix: str) -> int:
+        # Prefixes name a "directory" (they end in "/")
+        directory = self.root / prefix
+
+        def delete() -> int:
+            if not directory.is_dir():
+                return 0
+            files = sum(1 for p in directory.rglob("*") if p.is_file())
+            shutil.rmtree(directory, ignore_errors=True)
+            return files
+
+        return await blocking_executor.run("storage", delete)
+
+
+def get_archive_store() -> Optional[ArchiveStore]:
+    """Archive store from settings, or None if archival is not configured."""
+    if settings.ARCHIVE_LOCAL_DIR:
+        return LocalArchiveStore(settings.ARCHIVE_LOCAL_DIR)
+    bucket = settings.ARCHIVE_BUCKET or settings.STORAGE_BUCKET
+    if bucket and clients.storage is not None:
+        return GCSArchiveStore(bucket)
+    return None
+
+
+def _utc(value: datetime) -> datetime:
+    # Cursor positions minted before timestamps were all aware may be naive
+    return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+
+
+def _key(created_at: datetime, message_id: str) -> Tuple[datetime, str]:
+    return _utc(created_at), message_id
+
+
+def _entry_key(entry: Dict[str, Any], edge: str) -> Tuple[datetime, str]:
+    return _key(datetime.fromisoformat(entry[f"{edge}_at"]), entry[f"{edge}_id"])
+
+
+def encode_segment(messages: List[Dict[str, Any]]) -> bytes:
+    """Compress message documents, oldest first, into a segment."""
+    return gzip.compress("".join(encode_line("message", m) for m in messages).encode())
+
+
+def decode_segment(raw: bytes) -> List[Dict[str, Any]]:
+    """Decode a segment back into message documents, oldest first."""
+    lines = gzip.decompress(raw).splitlines()
+    return [decode_line(line, number)[1] for number, line in enumerate(lines, start=1)]
+
+
+def segment_entry(session_id: str, index: int, messages: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Index entry for a segment of a session's messages.
+
+    Args:
+        session_id: Session ID
+        index: Position of the segment in the session's index
+        messages: Segment messages, oldest first
+
+    Returns:
+        Blob name, message count and (created_at, id) of both edges
+    """
+    first, last = messages[0], messages[-1]
+    # Named by content, so a racing archiver can only write identical bytes
+    name = f"{index:06d}-{first['id']}-{len(messages)}.ndjson.gz"
+    return {
+        "name": f"{settings.ARCHIVE_PREFIX}/{session_id}/{name}",
+        "count": len(messages),
+        "first_at": _utc(first["created_at"]).isoformat(),
+        "first_id": first["id"],
+        "last_at": _utc(last["created_at"]).isoformat(),
+        "last_id": last["id"],
+    }
+
+
+class MessageArchive:
+    """Writes cold messages to segments and reads them back for paging."""
+
+    def __init__(
+        self,
+        min_messages: int = settings.ARCHIVE_MIN_MESSAGES,
+        segment_messages: int = settings.ARCHIVE_SEGMENT_MESSAGES,
+        cache_size: int = settings.ARCHIVE_SEGMENT_CACHE_SIZE,
+    ) -> None:
+        """
+        Initialize archive.
+
+        Args:
+            min_messages: Live messages a session needs before it is archived
+            segment_messages: Messages per segment (deleted in one batch)
+            cache_size: Decoded segments kept in memory for paging
+        """
+        self.min_messages = min_messages
+        # The session update shares the 500-write batch with the deletes
+        self.segment_messages = min(segment_messages, 499)
+        self._store: Optional[ArchiveStore] = None
+        self._segments: TTLCache[str, List[Dict[str, Any]]] = TTLCache(
+            maxsize=cache_size, ttl=600
+        )
+        self._flight: SingleFlight[str, List[Dict[str, Any]]] = SingleFlight()
+
+    @property
+    def store(self) -> ArchiveStore:
+        if self._store is None:
+            self._store = get_archive_store()
+            if self._store is None:
+                raise ArchiveError("Message archive storage is not configured")
+        return self._store
+
+    async def read_segment(self, name: str) -> List[Dict[str, Any]]:
+        """
+        Load a segment, served from memory while it is being paged through.
+
+        Args:
+            name: Segment blob name
+
+        Returns:
+            Message documents, oldest first
+        """
+        cached = self._segments.get(name)
+        if cached is not None:
+            return cached
+
+        async def load() -> List[Dict[str, Any]]:
+            messages = decode_segment(await self.store.get(name))
+            self._segments.set(name, messages)
+            return messages
+
+        return await self._flight.do(name, load)
+
+    async def iter_messages(
+        self,
+        archive: List[Dict[str, Any]],
+        position: Optional[Tuple[datetime, str]],
+        ascending: bool,
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Stream archived messages past a cursor position.
+
+        Segments wholly on the wrong side of the position are skipped
+        without being read.
+
+        Args:
+            archive: Session segment index, oldest first
+            position: (created_at, id) to continue after, if any
+            ascending: Oldest first (after a cursor) or newest first
+
+        Yields:
+            Message documents in page order
+        """
+        after = _key(*position) if position else None
+        for entry in archive if ascending else reversed(archive):
+            if after is not None:
+                if ascending and _entry_key(entry, "last") <= after:
+                    continue
+                if not ascending and _entry_key(entry, "first") >= after:
+                    continue
+            messages = await self.read_segment(entry["name"])
+            for data in messages if ascending else reversed(messages):
+                if after is not None:
+                    key = _key(data["created_at"], data["id"])
+                    if (key <= after) if ascending else (key >= after):
+                        continue
+                yield data
+
+    async def delete_session(self, session_id: str) -> int:
+        """
+        Delete every segment of a session, including unreferenced ones.
+
+        Args:
+            session_id: Session ID
+
+        Returns:
+            Number of segments deleted (0 when archival is not configured)
+        """
+        try:
+            store = self.store
+        except ArchiveError:
+            return 0
+        return await store.delete_prefix(f"{settings.ARCHIVE_PREFIX}/{session_id}/")
+
+    async def archive_session(self, session_id: str, cutoff: datetime) -> int:
+        """
+        Move a session's messages older than cutoff into segments.
+
+        Each segment is uploaded before the batch that deletes its messages
+        and appends it to the index, so a failure at any point leaves every
+        message readable. Segments are full except the last one of a session
+        that has itself gone cold.
+
+        Args:
+            session_id: Session ID
+            cutoff: Messages created before this are archived
+
+        Returns:
+            Number of messages archived
+        """
+        db = clients.firestore
+        session_ref = db.collection(SESSIONS).document(session_id)
+        archived = conflicts = 0
+        while conflicts < _MAX_CONFLICTS:
+            snapshot = await session_ref.get()
+            data = snapshot.to_dict() if snapshot.exists else None
+            # Totals of legacy sessions come from aggregation, which would miss archives
+            if not data or data.get("message_count") is None:
+                break
+
+            query = MESSAGES_OLDEST_FIRST.build(session_ref.collection(MESSAGES))
+            docs = [d.to_dict() async for d in query.limit(self.segment_messages).stream()]
+            cold = [d for d in docs if d and _utc(d["created_at"]) < cutoff]
+            session_cold = _utc(data["last_message_at"]) < cutoff
+            if not cold or (len(cold) < self.segment_messages and not session_cold):
+                break
+
+            segments = list(data.get("archive") or [])
+            entry = segment_entry(session_id, len(segments), cold)
+            await self.store.put(entry["name"], encode_segment(cold))
+
+            batch = db.batch()
+            batch.update(
+                session_ref,
+                {
+                    "archive": segments + [entry],
+                    "archived_count": firestore.Increment(len(cold)),
+                },
+                option=db.write_option(last_update_time=snapshot.update_time),
+            )
+            for message in cold:
+                batch.delete(session_ref.collection(MESSAGES).document(message["id"]))
+            try:
+                await batch.commit()
+            except FailedPrecondition:
+                # A turn or another archiver updated the session; re-read it
+                conflicts += 1
+                continue
+            archived += len(cold)
+            await session_cache.invalidate(session_id)
+
+        if archived:
+            logger.info("Session messages archived", session_id=session_id, messages=archived)
+        return archived
+
+    async def archive_cold_sessions(
+        self, min_age_days: int = settings.ARCHIVE_MIN_AGE_DAYS
+    ) -> Dict[str, int]:
+        """
+        Archive cold messages of every session with enough live messages.
+
+        Args:
+            min_age_days: Age after which messages are archived
+
+        Returns:
+            Sessions touched and messages archived
+        """
+        cutoff = datetime.now(timezone.utc) - timedelta(days=min_age_days)
+        query = SESSIONS_ARCHIVE_SCAN.build(clients.firestore.collection(SESSIONS))
+        candidates = []
+        async for doc in query.stream():
+            data = doc.to_dict() or {}
+            count = data.get("message_count")
+            if count is None or "created_at" not in data or _utc(data["created_at"]) >= cutoff:
+                continue
+            if count - data.get("archived_count", 0) >= self.min_messages:
+                candidates.append(doc.id)
+
+        sessions = messages = 0
+        for session_id in candidates:
+            archived = await self.archive_session(session_id, cutoff)
+            sessions += bool(archived)
+            messages += archived
+
+        logger.info("Archival finished", sessions=sessions, messages=messages)
+        return {"sessions": sessions, "messages": messages}
+
+
+# Global message archive instance
+message_archive = MessageArchive()
+
+
+if __name__ == "__main__":
+    asyncio.run(message_archive.archive_cold_sessions())
@@ -0,0 +1,60 @@
+"""NDJSON session and message records.
+
+Each line is ``{"type": "session" | "message", "data": {...}}`` holding a
+Firestore document; datetimes are ISO 8601 strings. Session exports and
+archived message segments share the format.
+"""
+
+import json
+from datetime import datetime
+from typing import Any, Dict, Tuple, Union
+
+from app.core.exceptions import ValidationError
+
+# Document fields stored as Firestore timestamps
+_TIMESTAMP_FIELDS = ("created_at", "last_message_at", "updated_at")
+
+
+def _json_default(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+
+def encode_line(kind: str, data: Dict[str, Any]) -> str:
+    """Encode one export line."""
+    return json.dumps({"type": kind, "data": data}, default=_json_default) + "\n"
+
+
+def decode_line(line: Union[str, bytes], number: int) -> Tuple[str, Dict[str, Any]]:
+    """
+    Decode one export line.
+
+    Args:
+        line: NDJSON line
+        number: 1-based line number, for error messages
+
+    Returns:
+        (type, document data) with timestamps parsed
+
+    Raises:
+        ValidationError: If the line is not a session or message record
+    """
+    try:
+        record = json.loads(line)
+        kind, data = record["type"], record["data"]
+        for name in _TIMESTAMP_FIELDS:
+            if isinstance(data.get(name), str):
+                data[name] = datetime.fromisoformat(data[name])
+    except (ValueError, KeyError, TypeError, AttributeError) as e:
+        raise ValidationError(f"Line {number}: malformed record") from e
+
+    if kind == "session" and isinstance(data.get("id"), str):
+        return kind, data
+    if (
+        kind == "message"
+        and isinstance(data.get("id"), str)
+        and isinstance(data.get("session_id"), str)
+    ):
+        return kind, data
+    raise ValidationError(f"Line {number}: expected a session or message record with ids")
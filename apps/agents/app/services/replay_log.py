@@ -0,0 +1,148 @@
+"""Redis copy of chat stream frames, for resuming a run on another instance.
+
+Frames of each run are appended to the Redis stream ``chat-run:{id}`` with
+entry ID ``{seq}-0``, trimmed to about ``STREAM_REPLAY_MAX_FRAMES`` and
+expiring ``STREAM_REPLAY_TTL_SECONDS`` after the last write. The owner is kept
+next to it so a resume on another instance can be authorized. The copy is
+best-effort: failures are logged and resumes fall back to the instance that
+generates the run.
+"""
+
+import asyncio
+from typing import AsyncIterator, Dict, List, Optional, Tuple, cast
+
+import structlog
+from redis.asyncio import Redis
+from redis.typing import EncodableT, FieldT
+
+from app.core.config import settings
+from app.core.exceptions import ReplayUnavailableError
+from app.core.redis_client import get_redis
+
+logger = structlog.get_logger()
+
+# XREAD block per poll; stays below REDIS_SOCKET_TIMEOUT_SECONDS
+_POLL_MS = 100
+
+# Stream entries as returned without decode_responses: (entry ID, fields)
+_Entries = List[Tuple[bytes, Dict[bytes, bytes]]]
+
+
+class RedisReplayLog:
+    """Frames of in-progress runs in Redis streams."""
+
+    def __init__(
+        self,
+        redis: Optional[Redis] = None,
+        max_frames: int = settings.STREAM_REPLAY_MAX_FRAMES,
+        ttl: int = settings.STREAM_REPLAY_TTL_SECONDS,
+    ) -> None:
+        """
+        Initialize replay log.
+
+        Args:
+            redis: Optional Redis client (defaults to the shared client)
+            max_frames: Frames kept per run
+            ttl: Seconds a run's frames outlive its last write
+        """
+        self.max_frames = max_frames
+        self.ttl = ttl
+        self._redis = redis
+
+    @property
+    def redis(self) -> Optional[Redis]:
+        return self._redis if self._redis is not None else get_redis()
+
+    @staticmethod
+    def _key(run_id: str) -> str:
+        return f"chat-run:{run_id}"
+
+    async def append(self, run_id: str, user_id: str, seq: int, frame: bytes, last: bool) -> bool:
+        """
+        Copy one frame.
+
+        Returns:
+            False if Redis is not configured or the write failed
+        """
+        redis = self.redis
+        if redis is None:
+            return False
+        key = self._key(run_id)
+        fields: Dict[FieldT, EncodableT] = {"f": frame}
+        if last:
+            fields["last"] = 1
+        try:
+            async with redis.pipeline(transaction=False) as pipe:
+                pipe.xadd(key, fields, id=f"{seq}-0", maxlen=self.max_frames, approximate=True)
+                pipe.expire(key, self.ttl)
+                pipe.set(f"{key}:owner", user_id, ex=self.ttl)
+                await pipe.execute()
+        except Exception as e:
+            logger.warning("Replay log write failed", run_id=run_id, error=str(e))
+            return False
+        return True
+
+    async def owner(self, run_id: str) -> Optional[str]:
+        """Return the UID that owns a run, or None if Redis has no copy of it."""
+        redis = self.redis
+        if redis is None:
+            return None
+        try:
+            owner = cast(Optional[bytes], await redis.get(f"{self._key(run_id)}:owner"))
+        except Exception as e:
+            logger.warning("Replay log read failed", run_id=run_id, error=str(e))
+            return None
+        return owner.decode() if owner is not None else None
+
+    async def check(self, run_id: str, after: int) -> None:
+        """
+        Make sure frames after ``after`` are still held.
+
+        Raises:
+            ReplayUnavailableError: If older frames were already trimmed
+        """
+        redis = self.redis
+        if redis is None:
+            raise ReplayUnavailableError("Replay log is not configured")
+        first = cast(_Entries, await redis.xrange(self._key(run_id), count=1))
+        if first and _seq(first[0][0]) > after + 1:
+            raise ReplayUnavailableError(f"Frames after {after} are no longer buffered")
+
+    async def follow(
+        self, run_id: str, after: int, stop: "asyncio.Future[None]"
+    ) -> AsyncIterator[bytes]:
+        """
+        Yield frames after ``after`` as the generating instance writes them.
+
+        Ends after the run's last frame, when ``stop`` is done, or when no
+        frame arrives for ``ttl`` seconds (the generating instance is gone).
+
+        Raises:
+            ReplayUnavailableError: If the reader fell behind the trimmed window
+        """
+        redis = self.redis
+        if redis is None:
+            return
+        key = self._key(run_id)
+        last_id: bytes | str = f"{after}-0"
+        idle = 0.0
+        while not stop.done() and idle < self.ttl:
+            result = cast(
+                List[Tuple[bytes, _Entries]],
+                await redis.xread({key: last_id}, count=100, block=_POLL_MS),
+            )
+            if not result:
+                idle += _POLL_MS / 1000
+                continue
+            idle = 0.0
+            for entry_id, fields in result[0][1]:
+                if _seq(entry_id) != after + 1:
+                    raise ReplayUnavailableError(f"Frames after {after} are no longer buffered")
+                after, last_id = after + 1, entry_id
+                yield fields[b"f"]
+                if b"last" in fields:
+                    return
+
+
+def _seq(entry_id: bytes) -> int:
+    return int(entry_id.split(b"-", 1)[0])
@@ -0,0 +1,173 @@
+"""Session metadata cache for ownership checks."""
+
+import dataclasses
+import json
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+import structlog
+from redis.asyncio import Redis
+
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.core.pubsub import EventBus, event_bus
+from app.core.redis_client import get_redis
+
+logger = structlog.get_logger()
+
+INVALIDATION_TOPIC = "sessions.invalidate"
+
+
+@dataclass(frozen=True, slots=True)
+class SessionMeta:
+    """Session document fields needed for ownership checks and responses."""
+
+    id: str
+    user_id: str
+    created_at: datetime
+    last_message_at: datetime
+    agent_id: Optional[str] = None
+    metadata: Dict[str, Any] = field(default_factory=dict)
+    # Maintained message counter; None for sessions created before it existed
+    message_count: Optional[int] = None
+    # Rolling conversation context (see ConversationContext)
+    context: Optional[Dict[str, Any]] = None
+    # Archived message segments, oldest first (see MessageArchive)
+    archive: List[Dict[str, Any]] = field(default_factory=list)
+
+    @classmethod
+    def from_doc(cls, data: Dict[str, Any]) -> "SessionMeta":
+        """Build from a Firestore session document."""
+        return cls(
+            id=data["id"],
+            user_id=data["user_id"],
+            created_at=data["created_at"],
+            last_message_at=data["last_message_at"],
+            agent_id=data.get("agent_id"),
+            metadata=data.get("metadata") or {},
+            message_count=data.get("message_count"),
+            context=data.get("context"),
+            archive=data.get("archive") or [],
+        )
+
+    def to_json(self) -> str:
+        return json.dumps(
+            {
+                **dataclasses.asdict(self),
+                "created_at": self.created_at.isoformat(),
+                "last_message_at": self.last_message_at.isoformat(),
+            }
+        )
+
+    @classmethod
+    def from_json(cls, raw: str | bytes) -> "SessionMeta":
+        data = json.loads(raw)
+        data["created_at"] = datetime.fromisoformat(data["created_at"])
+        data["last_message_at"] = datetime.fromisoformat(data["last_message_at"])
+        return cls(**data)
+
+
+class SessionCache:
+    """Two-level session metadata cache.
+
+    A per-instance TTL/LRU cache is consulted first; when Redis is configured
+    it backs the local cache so entries are shared across instances. Redis
+    failures are logged and treated as misses, never as errors.
+
+    Changes (``update``, ``invalidate``) are broadcast on the event bus, so
+    other instances drop their local copy and re-read the shared one.
+    """
+
+    def __init__(
+        self,
+        bus: EventBus,
+        maxsize: int = settings.SESSION_CACHE_SIZE,
+        ttl: float = settings.SESSION_CACHE_TTL_SECONDS,
+        redis: Optional[Redis] = None,
+    ) -> None:
+        """
+        Initialize cache.
+
+        Args:
+            bus: Event bus used to broadcast and receive invalidations
+            maxsize: Maximum sessions kept in process
+            ttl: Entry time-to-live in seconds (local and Redis)
+            redis: Optional Redis client (defaults to the shared client)
+        """
+        self.bus = bus
+        self.ttl = ttl
+        self._local: TTLCache[str, SessionMeta] = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._redis = redis
+        bus.subscribe(INVALIDATION_TOPIC, self._on_invalidation)
+
+    @property
+    def redis(self) -> Optional[Redis]:
+        return self._redis if self._redis is not None else get_redis()
+
+    @staticmethod
+    def _key(session_id: str) -> str:
+        return f"session-meta:{session_id}"
+
+    async def get(self, session_id: str) -> Optional[SessionMeta]:
+        """Return cached session metadata, or None on a miss."""
+        meta = self._local.get(session_id)
+        if meta is not None or self.redis is None:
+            return meta
+
+        try:
+            raw = await self.redis.get(self._key(session_id))
+        except Exception as e:
+            logger.warning("Session cache read failed", error=str(e), session_id=session_id)
+            return None
+        if raw is None:
+            return None
+
+        meta = SessionMeta.from_json(raw)
+        self._local.set(session_id, meta)
+        return meta
+
+    async def put(self, meta: SessionMeta) -> None:
+        """Cache session metadata just read from (or created in) Firestore."""
+        self._local.set(meta.id, meta)
+        await self._put_shared(meta)
+
+    async def update(self, meta: SessionMeta) -> None:
+        """Store changed session metadata and drop stale copies on other instances."""
+        # Shared copy first, so instances reacting to the broadcast re-read the new one
+        await self._put_shared(meta)
+        await self.bus.publish(INVALIDATION_TOPIC, {"id": meta.id})
+        self._local.set(meta.id, meta)
+
+    def forget(self, session_id: str) -> None:
+        """Drop a session from this instance's cache only."""
+        self._local.pop(session_id)
+
+    async def invalidate(self, session_id: str) -> None:
+        """Drop a session from every cache level, here and on other instances."""
+        self._local.pop(session_id)
+        if self.redis is not None:
+            try:
+                await self.redis.delete(self._key(session_id))
+            except Exception as e:
+                logger.warning(
+                    "Session cache invalidation failed", error=str(e), session_id=session_id
+                )
+        await self.bus.publish(INVALIDATION_TOPIC, {"id": session_id})
+
+    async def _put_shared(self, meta: SessionMeta) -> None:
+        if self.redis is None:
+            return
+        try:
+            await self.redis.set(self._key(meta.id), meta.to_json(), ex=int(self.ttl))
+        except Exception as e:
+            logger.warning("Session cache write failed", error=str(e), session_id=meta.id)
+
+    def _on_invalidation(self, payload: Dict[str, Any]) -> None:
+        session_id = payload.get("id")
+        if session_id:
+            self._local.pop(session_id)
+
+
+# Global session cache instance
+session_cache = SessionCache(event_bus)
@@ -0,0 +1,256 @@
+"""Background deletion of sessions and everything below them.
+
+Deleting a session document leaves its ``messages`` subcollection behind, so
+deletions walk each session's subtree and delete it bottom-up through one
+BulkWriter per job (the session document goes last, so an interrupted job
+can be re-issued). BulkWriter throttles itself, starting at 500 ops/s and
+ramping up 50% every 5 minutes to ``DELETE_MAX_OPS_PER_SECOND``.
+
+Jobs run in the background of the instance that accepted them; their
+progress lives in ``agents-jobs/{id}`` so any instance can answer a poll.
+"""
+
+import asyncio
+import threading
+import uuid
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Set
+
+import structlog
+from google.cloud.firestore_v1.bulk_writer import BulkWriteFailure, BulkWriter, BulkWriterOptions
+
+from app.core.blocking import blocking_executor
+from app.core.clients import clients
+from app.core.config import settings
+from app.core.exceptions import DeletionJobNotFoundError
+from app.core.pubsub import EventBus, event_bus
+from app.core.repository import DOCUMENT_ID, JOBS, SESSION_DESCENDANTS, SESSIONS, SESSIONS_BY_USER
+from app.services.conversation_buffer import conversation_buffer
+from app.services.message_archive import message_archive
+from app.services.session_cache import session_cache
+
+logger = structlog.get_logger()
+
+DELETED_TOPIC = "sessions.deleted"
+
+# Attempts per document before a deletion job fails
+_MAX_ATTEMPTS = 5
+
+SESSION_IDS_BY_USER = SESSIONS_BY_USER.project(DOCUMENT_ID)
+
+
+class _Progress:
+    """Counters shared with the BulkWriter's worker threads."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.documents = 0
+        self.sessions = 0
+        self.failure: Optional[str] = None
+        self.cancelled = False
+
+    def on_result(self, *_: Any) -> None:
+        with self._lock:
+            self.documents += 1
+
+    def on_error(self, failure: BulkWriteFailure, _: BulkWriter) -> bool:
+        if failure.attempts < _MAX_ATTEMPTS:
+            return True
+        with self._lock:
+            self.failure = self.failure or failure.message
+        return False
+
+
+class SessionDeleter:
+    """Runs session deletion jobs and tracks their progress."""
+
+    def __init__(
+        self,
+        bus: EventBus,
+        concurrency: int = settings.DELETE_JOB_CONCURRENCY,
+        max_ops_per_second: int = settings.DELETE_MAX_OPS_PER_SECOND,
+        progress_interval: float = settings.DELETE_JOB_PROGRESS_SECONDS,
+    ) -> None:
+        """
+        Initialize deleter.
+
+        Args:
+            bus: Event bus used to drop deleted sessions on every instance
+            concurrency: Jobs running at once on this instance (others wait)
+            max_ops_per_second: BulkWriter ramp-up ceiling
+            progress_interval: Seconds between progress writes
+        """
+        self.bus = bus
+        self.options = BulkWriterOptions(
+            initial_ops_per_second=min(500, max_ops_per_second),
+            max_ops_per_second=max_ops_per_second,
+        )
+        self.progress_interval = progress_interval
+        self._slots = asyncio.Semaphore(concurrency)
+        self._tasks: Set[asyncio.Task] = set()
+        bus.subscribe(DELETED_TOPIC, self._on_deleted)
+
+    async def delete_session(self, session_id: str, requested_by: str) -> Dict[str, Any]:
+        """
+        Start deleting one session.
+
+        Args:
+            session_id: Session ID (ownership already checked)
+            requested_by: UID of the caller
+
+        Returns:
+            Created job
+        """
+        return await self._start("session", session_id, requested_by, [session_id])
+
+    async def purge_user(self, user_id: str, requested_by: str) -> Dict[str, Any]:
+        """
+        Start deleting every session of a user.
+
+        Args:
+            user_id: User whose sessions are deleted
+            requested_by: UID of the admin
+
+        Returns:
+            Created job
+        """
+        return await self._start("user", user_id, requested_by, None)
+
+    async def get_job(self, job_id: str) -> Dict[str, Any]:
+        """
+        Get a deletion job.
+
+        Args:
+            job_id: Job ID
+
+        Returns:
+            Job document
+
+        Raises:
+            DeletionJobNotFoundError: If the job does not exist
+        """
+        doc = await clients.firestore.collection(JOBS).document(job_id).get()
+        if not doc.exists:
+            raise DeletionJobNotFoundError(f"Deletion job {job_id} not found")
+        return doc.to_dict() or {}
+
+    async def shutdown(self) -> None:
+        """Stop running jobs; they are marked interrupted and can be re-issued."""
+        for task in list(self._tasks):
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    async def _start(
+        self, kind: str, target: str, requested_by: str, session_ids: Optional[List[str]]
+    ) -> Dict[str, Any]:
+        now = datetime.now(timezone.utc)
+        job_id = str(uuid.uuid4())
+        job = {
+            "id": job_id,
+            "kind": kind,
+            "target": target,
+            "requested_by": requested_by,
+            "status": "pending",
+            "sessions": len(session_ids) if session_ids is not None else None,
+            "sessions_deleted": 0,
+            "documents_deleted": 0,
+            "error": None,
+            "created_at": now,
+            "updated_at": now,
+        }
+        await clients.firestore.collection(JOBS).document(job_id).set(job)
+
+        task = asyncio.create_task(self._run(job_id, target, session_ids))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        logger.info("Deletion job started", job_id=job_id, kind=kind, target=target)
+        return job
+
+    async def _update(self, job_id: str, **fields: Any) -> None:
+        fields["updated_at"] = datetime.now(timezone.utc)
+        await clients.firestore.collection(JOBS).document(job_id).update(fields)
+
+    async def _run(self, job_id: str, user_id: str, session_ids: Optional[List[str]]) -> None:
+        progress = _Progress()
+        try:
+            async with self._slots:
+                if session_ids is None:
+                    query = SESSION_IDS_BY_USER.build(
+                        clients.firestore.collection(SESSIONS), user_id=user_id
+                    )
+                    session_ids = [doc.id async for doc in query.stream()]
+                await self._update(job_id, status="running", sessions=len(session_ids))
+
+                work = asyncio.ensure_future(
+                    blocking_executor.run("bulk", self._delete_tree, session_ids, progress)
+                )
+                while not work.done():
+                    await asyncio.wait({work}, timeout=self.progress_interval)
+                    await self._update(
+                        job_id,
+                        sessions_deleted=progress.sessions,
+                        documents_deleted=progress.documents,
+                    )
+                try:
+                    await work
+                finally:
+                    for session_id in session_ids:
+                        await session_cache.invalidate(session_id)
+                    await self.bus.publish(DELETED_TOPIC, {"ids": session_ids})
+
+                if progress.failure:
+                    # Archives go only with their session, so a re-issued job still finds them
+                    raise RuntimeError(progress.failure)
+                for session_id in session_ids:
+                    await message_archive.delete_session(session_id)
+
+            await self._update(
+                job_id,
+                status="done",
+                sessions_deleted=progress.sessions,
+                documents_deleted=progress.documents,
+            )
+            logger.info("Deletion job finished", job_id=job_id, documents=progress.documents)
+
+        except asyncio.CancelledError:
+            progress.cancelled = True
+            await self._update(job_id, status="interrupted")
+            raise
+        except Exception as e:
+            logger.error("Deletion job failed", job_id=job_id, error=str(e))
+            await self._update(
+                job_id,
+                status="failed",
+                error=str(e),
+                sessions_deleted=progress.sessions,
+                documents_deleted=progress.documents,
+            )
+
+    def _delete_tree(self, session_ids: List[str], progress: _Progress) -> None:
+        """Delete sessions and their descendants (blocking; runs off the loop)."""
+        db = clients.firestore_sync
+        writer = db.bulk_writer(self.options)
+        writer.on_write_result(progress.on_result)
+        writer.on_write_error(progress.on_error)
+        try:
+            for session_id in session_ids:
+                session_ref = db.collection(SESSIONS).document(session_id)
+                for collection in session_ref.collections():
+                    query = SESSION_DESCENDANTS.build(collection.recursive())
+                    for snapshot in query.stream():
+                        if progress.cancelled:
+                            return
+                        writer.delete(snapshot.reference)
+                writer.delete(session_ref)
+                progress.sessions += 1
+        finally:
+            writer.close()
+
+    def _on_deleted(self, payload: Dict[str, Any]) -> None:
+        for session_id in payload.get("ids") or []:
+            session_cache.forget(session_id)
+            conversation_buffer.invalidate(session_id)
+
+
+# Global session deleter instance
+session_deleter = SessionDeleter(event_bus)
@@ -0,0 +1,327 @@
+"""Bulk export and import of a user's sessions as NDJSON.
+
+Lines are session and message records (see ``app.services.records``).
+Message lines carry their ``session_id``, so lines of different sessions may
+interleave and an export can be imported in any order. Archived messages are
+exported inline, so an import always lands every message in Firestore.
+"""
+
+import asyncio
+from typing import Any, AsyncIterator, Dict, List, Optional, Set, Tuple, Union
+
+import structlog
+from google.cloud.firestore_v1.bulk_writer import BulkWriteFailure, BulkWriter, BulkWriterOptions
+
+from app.core.blocking import blocking_executor
+from app.core.clients import clients
+from app.core.config import settings
+from app.core.exceptions import FirestoreError
+from app.core.repository import IMPORTS, MESSAGES, MESSAGES_BY_ID, SESSIONS, SESSIONS_BY_USER
+from app.services.conversation_buffer import conversation_buffer
+from app.services.message_archive import decode_segment, message_archive
+from app.services.records import decode_line, encode_line
+from app.services.session_cache import session_cache
+
+logger = structlog.get_logger()
+
+# Lines per chunk handed to the HTTP response
+_EXPORT_CHUNK_LINES = 500
+# Chunks buffered between the Firestore readers and the response
+_EXPORT_QUEUE_CHUNKS = 64
+# Attempts per document before an import chunk fails
+_IMPORT_MAX_ATTEMPTS = 5
+
+
+def id_ranges(partitions: int) -> List[Tuple[Optional[str], Optional[str]]]:
+    """
+    Split the document ID space into contiguous ranges.
+
+    Message IDs are UUID4 hex strings, so ranges split on the leading byte
+    hold roughly equal shares of a session. The first and last ranges are
+    open, so IDs of any other form are still covered exactly once.
+
+    Args:
+        partitions: Number of ranges (1-256)
+
+    Returns:
+        (start_at, end_before) pairs; None means unbounded
+    """
+    partitions = max(1, min(partitions, 256))
+    bounds = [format(i * 256 // partitions, "02x") for i in range(1, partitions)]
+    return list(zip([None, *bounds], [*bounds, None], strict=True))
+
+
+class SessionExporter:
+    """Streams a user's sessions and messages as NDJSON.
+
+    Sessions are read in one query; messages of each session are read with
+    one query per document-ID range, and up to ``concurrency`` range queries
+    run at once. A bounded queue between the readers and the response keeps
+    memory flat when the client reads slower than Firestore answers.
+    """
+
+    def __init__(
+        self,
+        concurrency: int = settings.EXPORT_CONCURRENCY,
+        partitions: int = settings.EXPORT_PARTITIONS,
+        partition_threshold: int = settings.EXPORT_PARTITION_THRESHOLD_MESSAGES,
+    ) -> None:
+        """
+        Initialize exporter.
+
+        Args:
+            concurrency: Maximum message queries in flight
+            partitions: ID ranges a large session is split into
+            partition_threshold: Message count above which a session is split
+        """
+        self.db = clients.firestore
+        self.concurrency = concurrency
+        self.partitions = partitions
+        self.partition_threshold = partition_threshold
+
+    async def export_user(self, user_id: str) -> AsyncIterator[str]:
+        """
+        Export every session of a user.
+
+        Args:
+            user_id: Session owner
+
+        Yields:
+            Chunks of NDJSON lines
+
+        Raises:
+            FirestoreError: If a read fails
+        """
+        queue: "asyncio.Queue[Union[str, Exception, None]]" = asyncio.Queue(
+            maxsize=_EXPORT_QUEUE_CHUNKS
+        )
+        producer = asyncio.create_task(self._produce(user_id, queue))
+        try:
+            while True:
+                item = await queue.get()
+                if item is None:
+                    break
+                if isinstance(item, Exception):
+                    raise FirestoreError(f"Session export failed: {item}") from item
+                yield item
+        finally:
+            producer.cancel()
+
+    async def _produce(
+        self, user_id: str, queue: "asyncio.Queue[Union[str, Exception, None]]"
+    ) -> None:
+        semaphore = asyncio.Semaphore(self.concurrency)
+        tasks: Set[asyncio.Task] = set()
+        sessions = 0
+        try:
+            query = SESSIONS_BY_USER.build(self.db.collection(SESSIONS), user_id=user_id)
+            async for doc in query.stream():
+                data = doc.to_dict() or {}
+                sessions += 1
+                # Archived messages are exported inline, so drop the index
+                archive = data.pop("archive", None)
+                data.pop("archived_count", None)
+                await queue.put(encode_line("session", data))
+
+                readers = []
+                if archive:
+                    readers.append(self._export_archive(archive, queue))
+                count = data.get("message_count")
+                live = None if count is None else count - sum(e["count"] for e in archive or [])
+                split = live is None or live > self.partition_threshold
+                for start, end in id_ranges(self.partitions if split else 1):
+                    readers.append(self._export_range(doc.id, start, end, queue))
+
+                for reader in readers:
+                    # Acquired here so session reads pause while all slots are busy
+                    await semaphore.acquire()
+                    task = asyncio.create_task(reader)
+                    task.add_done_callback(lambda _: semaphore.release())
+                    tasks.add(task)
+                    task.add_done_callback(tasks.discard)
+            await asyncio.gather(*tasks)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error("Session export failed", user_id=user_id, error=str(e))
+            await queue.put(e)
+            return
+        finally:
+            for task in tasks:
+                task.cancel()
+
+        logger.info("Sessions exported", user_id=user_id, sessions=sessions)
+        await queue.put(None)
+
+    async def _export_range(
+        self,
+        session_id: str,
+        start: Optional[str],
+        end: Optional[str],
+        queue: "asyncio.Queue[Union[str, Exception, None]]",
+    ) -> None:
+        """Read one ID range of a session's messages into the queue."""
+        query = MESSAGES_BY_ID.build(
+            self.db.collection(SESSIONS).document(session_id).collection(MESSAGES)
+        )
+        if start is not None:
+            query = query.start_at({"__name__": start})
+        if end is not None:
+            query = query.end_before({"__name__": end})
+
+        lines: List[str] = []
+        async for doc in query.stream():
+            lines.append(encode_line("message", doc.to_dict() or {}))
+            if len(lines) >= _EXPORT_CHUNK_LINES:
+                await queue.put("".join(lines))
+                lines = []
+        if lines:
+            await queue.put("".join(lines))
+
+    async def _export_archive(
+        self,
+        archive: List[Dict[str, Any]],
+        queue: "asyncio.Queue[Union[str, Exception, None]]",
+    ) -> None:
+        """Read a session's archived segments into the queue."""
+        for entry in archive:
+            # Read around the segment cache, which serves interactive paging
+            messages = decode_segment(await message_archive.store.get(entry["name"]))
+            await queue.put("".join(encode_line("message", m) for m in messages))
+
+
+class SessionImporter:
+    """Writes NDJSON exports back with a throttled BulkWriter.
+
+    Lines are written in chunks. After each chunk is flushed, a checkpoint
+    document under ``agents-imports/{import_id}`` records how many lines are
+    durable, so re-sending the same file with the same import ID skips what
+    already landed. Writes are idempotent sets, so a chunk interrupted
+    mid-flush is simply written again.
+    """
+
+    def __init__(
+        self,
+        chunk_size: int = settings.IMPORT_CHUNK_SIZE,
+        max_ops_per_second: int = settings.IMPORT_MAX_OPS_PER_SECOND,
+    ) -> None:
+        """
+        Initialize importer.
+
+        Args:
+            chunk_size: Lines written between checkpoints
+            max_ops_per_second: BulkWriter write rate ceiling
+        """
+        self.db = clients.firestore
+        self.chunk_size = chunk_size
+        # BulkWriter ramps up from 500 ops/s following the 500/50/5 rule
+        self.options = BulkWriterOptions(
+            initial_ops_per_second=min(500, max_ops_per_second),
+            max_ops_per_second=max_ops_per_second,
+        )
+
+    async def import_lines(
+        self, import_id: str, lines: AsyncIterator[bytes]
+    ) -> Dict[str, Any]:
+        """
+        Import an export, resuming from the import's checkpoint.
+
+        Args:
+            import_id: Caller-chosen ID naming the checkpoint
+            lines: NDJSON lines of the export
+
+        Returns:
+            Checkpoint: lines committed, sessions and messages written
+
+        Raises:
+            ValidationError: If a line is malformed (earlier chunks stay written)
+            FirestoreError: If a write fails after retries
+        """
+        checkpoint_ref = self.db.collection(IMPORTS).document(import_id)
+        snapshot = await checkpoint_ref.get()
+        checkpoint = {"committed_lines": 0, "sessions": 0, "messages": 0}
+        if snapshot.exists:
+            checkpoint.update(snapshot.to_dict() or {})
+        skip = checkpoint["committed_lines"]
+
+        # BulkWriter is synchronous; from the async client it would open a
+        # sync copy (and a gRPC channel) per import that is never closed
+        writer = await blocking_executor.run(
+            "bulk", lambda: clients.firestore_sync.bulk_writer(self.options)
+        )
+        failures: List[BulkWriteFailure] = []
+
+        def on_error(failure: BulkWriteFailure, _: BulkWriter) -> bool:
+            if failure.attempts < _IMPORT_MAX_ATTEMPTS:
+                return True
+            failures.append(failure)
+            return False
+
+        writer.on_write_error(on_error)
+
+        number = 0
+        chunk: List[Tuple[str, Dict[str, Any]]] = []
+        try:
+            async for line in lines:
+                if not line.strip():
+                    continue
+                number += 1
+                if number <= skip:
+                    continue
+                chunk.append(decode_line(line, number))
+                if len(chunk) >= self.chunk_size:
+                    await self._write_chunk(writer, failures, chunk)
+                    self._count(checkpoint, chunk)
+                    checkpoint["committed_lines"] = number
+                    await checkpoint_ref.set(checkpoint)
+                    chunk = []
+
+            if chunk:
+                await self._write_chunk(writer, failures, chunk)
+                self._count(checkpoint, chunk)
+                checkpoint["committed_lines"] = number
+            checkpoint["done"] = True
+            await checkpoint_ref.set(checkpoint)
+        finally:
+            await blocking_executor.run("bulk", writer.close)
+
+        logger.info("Sessions imported", import_id=import_id, **checkpoint)
+        return checkpoint
+
+    async def _write_chunk(
+        self,
+        writer: BulkWriter,
+        failures: List[BulkWriteFailure],
+        chunk: List[Tuple[str, Dict[str, Any]]],
+    ) -> None:
+        """Write and flush one chunk; BulkWriter blocks, so it runs off the loop."""
+        writes = []
+        for kind, data in chunk:
+            if kind == "session":
+                path = f"{SESSIONS}/{data['id']}"
+            else:
+                path = f"{SESSIONS}/{data['session_id']}/{MESSAGES}/{data['id']}"
+            writes.append((path, data))
+
+        def write() -> None:
+            db = clients.firestore_sync
+            for path, data in writes:
+                writer.set(db.document(path), data)
+            writer.flush()
+
+        await blocking_executor.run("bulk", write)
+        if failures:
+            failure = failures[0]
+            raise FirestoreError(
+                f"Import write failed after {failure.attempts} attempts: {failure.message}"
+            )
+
+        # Imported sessions may be cached with older state
+        for session_id in {d["id"] if k == "session" else d["session_id"] for k, d in chunk}:
+            await session_cache.invalidate(session_id)
+            conversation_buffer.invalidate(session_id)
+
+    @staticmethod
+    def _count(checkpoint: Dict[str, Any], chunk: List[Tuple[str, Dict[str, Any]]]) -> None:
+        for kind, _ in chunk:
+            checkpoint["sessions" if kind == "session" else "messages"] += 1
@@ -0,0 +1,383 @@
+"""Write-behind persistence queue backed by a durable local spool."""
+
+import asyncio
+import json
+import os
+import sqlite3
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Tuple, TypeVar
+
+import structlog
+from google.api_core import exceptions as api_exceptions
+from google.cloud import firestore
+from google.cloud.firestore_v1.transforms import Increment
+
+from app.core.blocking import blocking_executor
+from app.core.clients import clients
+from app.core.config import settings
+
+logger = structlog.get_logger()
+
+T = TypeVar("T")
+
+# Firestore rejects batches with more than 500 writes
+_MAX_BATCH_WRITES = 500
+
+
+@dataclass
+class WriteOp:
+    """A single idempotent document write.
+
+    ``exists`` writes with ``update``, which fails if the document is gone,
+    instead of ``set``; a flush after a delete then cannot recreate it.
+    """
+
+    path: str
+    data: Dict[str, Any]
+    merge: bool = False
+    exists: bool = False
+
+    def to_json(self) -> Dict[str, Any]:
+        return {"path": self.path, "data": self.data, "merge": self.merge, "exists": self.exists}
+
+    @classmethod
+    def from_json(cls, raw: Dict[str, Any]) -> "WriteOp":
+        return cls(
+            path=raw["path"],
+            data=raw["data"],
+            merge=raw.get("merge", False),
+            exists=raw.get("exists", False),
+        )
+
+
+def _encode(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return {"__datetime__": value.isoformat()}
+    if isinstance(value, Increment):
+        return {"__increment__": value.value}
+    raise TypeError(f"Cannot spool value of type {type(value).__name__}")
+
+
+def _decode(obj: Dict[str, Any]) -> Any:
+    if "__datetime__" in obj and len(obj) == 1:
+        return datetime.fromisoformat(obj["__datetime__"])
+    if "__increment__" in obj and len(obj) == 1:
+        return firestore.Increment(obj["__increment__"])
+    return obj
+
+
+@dataclass
+class WriteBehindStats:
+    """Counters for the write-behind queue."""
+
+    enqueued: int = 0
+    flushed: int = 0
+    flush_failures: int = 0
+    dead_lettered: int = 0
+    last_flush_at: Optional[float] = None
+    last_error: Optional[str] = None
+
+
+# Errors that say nothing about the writes themselves; they are retried
+# without counting towards max_attempts, so an outage dead-letters nothing
+_TRANSIENT_ERRORS = (
+    api_exceptions.Aborted,
+    api_exceptions.DeadlineExceeded,
+    api_exceptions.InternalServerError,
+    api_exceptions.ServiceUnavailable,
+    api_exceptions.TooManyRequests,
+    ConnectionError,
+    asyncio.TimeoutError,
+)
+
+# (seq, attempts, writes) of one spooled group
+_Group = Tuple[int, int, List[WriteOp]]
+
+
+class WriteBehindQueue:
+    """Queues Firestore writes and flushes them in the background.
+
+    Every enqueued group of writes is first appended to a SQLite spool in WAL
+    mode, so it survives a process crash and is replayed on the next start.
+    A single flusher task drains the spool in order, committing each group's
+    writes in one batch. Writes must be idempotent (fixed document IDs,
+    ``set``/``merge``/``update`` only) because a group may be committed more
+    than once if the process dies between commit and spool deletion. Counter
+    increments are the one exception: such a replay counts them twice.
+
+    A group that keeps failing for reasons other than an outage is moved to
+    the ``dead_letter`` table after ``max_attempts`` tries, so it cannot
+    block the groups behind it. SQLite calls run on the blocking executor's
+    ``spool`` category, one at a time, never on the event loop.
+    """
+
+    def __init__(
+        self,
+        spool_path: str = settings.WRITE_BEHIND_SPOOL_PATH,
+        batch_size: int = settings.WRITE_BEHIND_BATCH_SIZE,
+        flush_interval: float = settings.WRITE_BEHIND_FLUSH_INTERVAL_SECONDS,
+        max_backoff: float = settings.WRITE_BEHIND_MAX_BACKOFF_SECONDS,
+        max_attempts: int = settings.WRITE_BEHIND_MAX_ATTEMPTS,
+    ) -> None:
+        """
+        Initialize queue.
+
+        Args:
+            spool_path: SQLite spool file path
+            batch_size: Maximum spooled groups drained per flush
+            flush_interval: Idle wait between flushes
+            max_backoff: Upper bound for retry backoff after failed flushes
+            max_attempts: Failed commits before a group is dead-lettered
+        """
+        self.spool_path = spool_path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_backoff = max_backoff
+        self.max_attempts = max_attempts
+        self.stats = WriteBehindStats()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._wakeup = asyncio.Event()
+        self._task: Optional[asyncio.Task[None]] = None
+
+    @property
+    def running(self) -> bool:
+        """Whether the flusher is running."""
+        return self._task is not None and not self._task.done()
+
+    async def start(self) -> None:
+        """Open the spool and start the flusher (replaying leftover writes)."""
+        if self.running:
+            return
+        await self._spool(self._connect)
+        self._task = asyncio.create_task(self._flush_loop())
+        pending = await self.pending()
+        logger.info("Write-behind queue started", spool=self.spool_path, pending=pending)
+        if pending:
+            self._wakeup.set()
+
+    async def stop(self, timeout: float = settings.WRITE_BEHIND_SHUTDOWN_TIMEOUT_SECONDS) -> None:
+        """Flush what can be flushed within timeout, then stop the flusher."""
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+        try:
+            await asyncio.wait_for(self._drain(), timeout)
+        except Exception as e:
+            logger.warning(
+                "Write-behind queue not fully flushed on shutdown",
+                error=str(e),
+                pending=await self.pending(),
+            )
+        await self._spool(self._close)
+
+    async def enqueue(self, ops: List[WriteOp]) -> None:
+        """
+        Durably spool a group of writes to be committed together.
+
+        Args:
+            ops: Writes to commit atomically in one batch
+        """
+        payload = json.dumps([op.to_json() for op in ops], default=_encode)
+        await self._spool(self._insert, payload)
+        self.stats.enqueued += 1
+        self._wakeup.set()
+
+    async def pending(self) -> int:
+        """Number of spooled groups not yet committed."""
+        pending, _, _ = await self._spool(self._depth)
+        return pending
+
+    async def metrics(self) -> Dict[str, Any]:
+        """Queue depth, lag, dead letters and flush counters."""
+        pending, oldest, dead = await self._spool(self._depth)
+        return {
+            "running": self.running,
+            "pending": pending,
+            "lag_seconds": round(max(0.0, time.time() - oldest), 3) if oldest else 0.0,
+            "dead_letters": dead,
+            "enqueued": self.stats.enqueued,
+            "flushed": self.stats.flushed,
+            "flush_failures": self.stats.flush_failures,
+            "dead_lettered": self.stats.dead_lettered,
+            "last_flush_at": self.stats.last_flush_at,
+            "last_error": self.stats.last_error,
+        }
+
+    async def _flush_loop(self) -> None:
+        backoff = 0.0
+        while True:
+            if backoff:
+                await asyncio.sleep(backoff)
+            else:
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), self.flush_interval)
+                except asyncio.TimeoutError:
+                    pass
+            self._wakeup.clear()
+
+            try:
+                while await self._flush_once():
+                    pass
+                backoff = 0.0
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.stats.flush_failures += 1
+                self.stats.last_error = str(e)
+                backoff = min(self.max_backoff, max(0.5, backoff * 2))
+                logger.warning("Write-behind flush failed", error=str(e), retry_in=backoff)
+
+    async def _drain(self) -> None:
+        while await self._flush_once():
+            pass
+
+    async def _flush_once(self) -> bool:
+        """Commit up to batch_size spooled groups. Returns True if any were flushed."""
+        rows = await self._spool(self._read, self.batch_size)
+        if not rows:
+            return False
+
+        db = clients.firestore
+        batch = db.batch()
+        batch_writes = 0
+        in_batch: List[_Group] = []
+
+        for seq, payload, attempts in rows:
+            ops = [WriteOp.from_json(raw) for raw in json.loads(payload, object_hook=_decode)]
+            # Groups are never split across batches, keeping each one atomic
+            if batch_writes and batch_writes + len(ops) > _MAX_BATCH_WRITES:
+                await self._commit(db, batch, in_batch)
+                batch, batch_writes, in_batch = db.batch(), 0, []
+            self._add(db, batch, ops)
+            batch_writes += len(ops)
+            in_batch.append((seq, attempts, ops))
+
+        await self._commit(db, batch, in_batch)
+        return True
+
+    def _add(
+        self, db: firestore.AsyncClient, batch: firestore.AsyncWriteBatch, ops: List[WriteOp]
+    ) -> None:
+        for op in ops:
+            if op.exists:
+                batch.update(db.document(op.path), op.data)
+            else:
+                batch.set(db.document(op.path), op.data, merge=op.merge)
+
+    async def _commit(
+        self, db: firestore.AsyncClient, batch: firestore.AsyncWriteBatch, groups: List[_Group]
+    ) -> None:
+        try:
+            await batch.commit()
+        except Exception as e:
+            if isinstance(e, _TRANSIENT_ERRORS):
+                raise
+            if len(groups) > 1:
+                # Find the failing group by committing one group at a time, in order
+                for group in groups:
+                    single = db.batch()
+                    self._add(db, single, group[2])
+                    await self._commit(db, single, [group])
+                return
+            seq, attempts, _ = groups[0]
+            if attempts + 1 < self.max_attempts:
+                await self._spool(self._record_attempt, seq)
+                raise
+            await self._spool(self._dead_letter, seq, str(e))
+            self.stats.dead_lettered += 1
+            logger.error(
+                "Write-behind group dead-lettered", seq=seq, attempts=attempts + 1, error=str(e)
+            )
+            return
+        await self._spool(self._delete, [seq for seq, _, _ in groups])
+        self.stats.flushed += len(groups)
+        self.stats.last_flush_at = time.time()
+
+    async def _spool(self, fn: Callable[..., T], *args: Any) -> T:
+        return await blocking_executor.run("spool", fn, *args)
+
+    # SQLite access below runs on the executor's single spool thread slot
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            directory = os.path.dirname(self.spool_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            # Used from executor threads, one call at a time
+            conn = sqlite3.connect(self.spool_path, isolation_level=None, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            # WAL + NORMAL survives process crashes without an fsync per write
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS spool ("
+                "seq INTEGER PRIMARY KEY AUTOINCREMENT, "
+                "payload TEXT NOT NULL, "
+                "attempts INTEGER NOT NULL DEFAULT 0, "
+                "enqueued_at REAL NOT NULL)"
+            )
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS dead_letter ("
+                "seq INTEGER PRIMARY KEY, "
+                "payload TEXT NOT NULL, "
+                "attempts INTEGER NOT NULL, "
+                "enqueued_at REAL NOT NULL, "
+                "failed_at REAL NOT NULL, "
+                "error TEXT NOT NULL)"
+            )
+            self._conn = conn
+        return self._conn
+
+    def _close(self) -> None:
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+    def _insert(self, payload: str) -> None:
+        self._connect().execute(
+            "INSERT INTO spool (payload, enqueued_at) VALUES (?, ?)", (payload, time.time())
+        )
+
+    def _depth(self) -> Tuple[int, Optional[float], int]:
+        conn = self._connect()
+        pending, oldest = conn.execute("SELECT COUNT(*), MIN(enqueued_at) FROM spool").fetchone()
+        (dead,) = conn.execute("SELECT COUNT(*) FROM dead_letter").fetchone()
+        return int(pending), oldest, int(dead)
+
+    def _read(self, limit: int) -> List[Tuple[int, str, int]]:
+        return self._connect().execute(
+            "SELECT seq, payload, attempts FROM spool ORDER BY seq LIMIT ?", (limit,)
+        ).fetchall()
+
+    def _delete(self, seqs: List[int]) -> None:
+        self._connect().executemany("DELETE FROM spool WHERE seq = ?", [(s,) for s in seqs])
+
+    def _record_attempt(self, seq: int) -> None:
+        self._connect().execute("UPDATE spool SET attempts = attempts + 1 WHERE seq = ?", (seq,))
+
+    def _dead_letter(self, seq: int, error: str) -> None:
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.execute(
+                "INSERT OR REPLACE INTO dead_letter "
+                "(seq, payload, attempts, enqueued_at, failed_at, error) "
+                "SELECT seq, payload, attempts + 1, enqueued_at, ?, ? FROM spool WHERE seq = ?",
+                (time.time(), error, seq),
+            )
+            conn.execute("DELETE FROM spool WHERE seq = ?", (seq,))
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+
+
+# Global write-behind queue instance
+write_behind = WriteBehindQueue()
@@ -1,8 +1,8 @@
 """Firestore tools for agent operations."""
 
 import structlog
-from google.cloud import firestore
-from app.core.config import settings
+from app.core.clients import clients
+from app.core.repository import MESSAGES, MESSAGES_NEWEST_FIRST, SESSIONS
 
 logger = structlog.get_logger()
 
@@ -12,7 +12,7 @@ class FirestoreTools:
 
     def __init__(self):
         """Initialize Firestore client."""
-        self.db = firestore.Client(project=settings.GOOGLE_CLOUD_PROJECT)
+        self.db = clients.firestore
         logger.info("Firestore client initialized")
 
     async def get_project(self, project_id: str) -> dict | None:
@@ -27,7 +27,7 @@ class FirestoreTools:
         """
         try:
             doc_ref = self.db.collection("projects").document(project_id)
-            doc = doc_ref.get()
+            doc = await doc_ref.get()
             if doc.exists:
                 return doc.to_dict()
             return None
@@ -47,7 +47,7 @@ class FirestoreTools:
         """
         try:
             doc_ref = self.db.collection("projects").document()
-            doc_ref.set(project_data)
+            await doc_ref.set(project_data)
             logger.info("Project created", project_id=doc_ref.id)
             return doc_ref.id
         except Exception as e:
@@ -66,15 +66,10 @@ class FirestoreTools:
             List of messages
         """
         try:
-            messages_ref = (
-                self.db.collection("agents-sessions")
-                .document(session_id)
-                .collection("messages")
-                .order_by("createdAt", direction=firestore.Query.DESCENDING)
-                .limit(limit)
-            )
-            messages = messages_ref.stream()
-            return [msg.to_dict() for msg in messages]
+            messages_ref = MESSAGES_NEWEST_FIRST.build(
+                self.db.collection(SESSIONS).document(session_id).collection(MESSAGES)
+            ).limit(limit)
+            return [msg.to_dict() async for msg in messages_ref.stream()]
         except Exception as e:
             logger.error("Error getting messages", session_id=session_id, error=str(e))
             raise
@@ -0,0 +1,83 @@
+"""Firestore concurrency benchmark: sync client vs AsyncClient from async handlers.
+
+Simulates chat-turn shaped work (one read + one write per request) issued from
+coroutines, the way request handlers run under uvicorn. With the sync client
+every call blocks the event loop, so concurrent requests serialize; with
+AsyncClient they overlap.
+
+Requires the Firestore emulator:
+
+    FIRESTORE_EMULATOR_HOST=localhost:8081 python -m benchmarks.firestore_concurrency
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+import uuid
+
+from google.cloud import firestore
+
+COLLECTION = "bench-concurrency"
+
+
+async def sync_request(db: firestore.Client, run_id: str, i: int) -> None:
+    """One request using the blocking client inside a coroutine (pre-change path)."""
+    ref = db.collection(COLLECTION).document(f"{run_id}-{i}")
+    ref.set({"i": i, "created_at": firestore.SERVER_TIMESTAMP})
+    ref.get()
+
+
+async def async_request(db: firestore.AsyncClient, run_id: str, i: int) -> None:
+    """One request using AsyncClient (post-change path)."""
+    ref = db.collection(COLLECTION).document(f"{run_id}-{i}")
+    await ref.set({"i": i, "created_at": firestore.SERVER_TIMESTAMP})
+    await ref.get()
+
+
+async def run(mode: str, requests: int, concurrency: int, project: str) -> float:
+    """Run one mode and return throughput in requests/second."""
+    run_id = f"{mode}-{uuid.uuid4().hex[:8]}"
+    semaphore = asyncio.Semaphore(concurrency)
+    if mode == "sync":
+        db: firestore.Client | firestore.AsyncClient = firestore.Client(project=project)
+    else:
+        db = firestore.AsyncClient(project=project)
+    handler = sync_request if mode == "sync" else async_request
+
+    async def bounded(i: int) -> None:
+        async with semaphore:
+            await handler(db, run_id, i)  # type: ignore[arg-type]
+
+    # Warm the channel so connection setup is not measured
+    await bounded(-1)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(bounded(i) for i in range(requests)))
+    elapsed = time.perf_counter() - start
+    return requests / elapsed
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=800)
+    parser.add_argument("--concurrency", type=int, default=80)
+    parser.add_argument("--project", default=os.getenv("GCLOUD_PROJECT", "demo-project"))
+    args = parser.parse_args()
+
+    if not os.getenv("FIRESTORE_EMULATOR_HOST"):
+        print("❌ FIRESTORE_EMULATOR_HOST is not set; start the emulator first")
+        return 1
+
+    results = {}
+    for mode in ("sync", "async"):
+        results[mode] = asyncio.run(run(mode, args.requests, args.concurrency, args.project))
+        print(f"{mode:>5}: {results[mode]:8.1f} req/s")
+
+    print(f"speedup: {results['async'] / results['sync']:.1f}x at concurrency {args.concurrency}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
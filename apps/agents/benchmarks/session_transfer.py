@@ -0,0 +1,138 @@
+"""Session export/import throughput against the Firestore emulator.
+
+Seeds one user's sessions and messages, then times SessionExporter (NDJSON
+out) and SessionImporter (BulkWriter in) over the same data, compared with
+paging the messages 50 at a time the way GET /chat/sessions/{id}/messages
+clients do.
+
+Requires the Firestore emulator:
+
+    FIRESTORE_EMULATOR_HOST=localhost:8081 python -m benchmarks.session_transfer
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import AsyncIterator, List
+
+from google.cloud import firestore
+
+from app.core.repository import MESSAGES, MESSAGES_OLDEST_FIRST, SESSIONS
+from app.services.session_transfer import SessionExporter, SessionImporter
+
+
+async def seed(db: firestore.AsyncClient, user_id: str, sessions: int, messages: int) -> List[str]:
+    """Write sessions for user_id with messages each; return session IDs."""
+    start = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    session_ids = []
+    batch = db.batch()
+    pending = 0
+    for _ in range(sessions):
+        session_id = str(uuid.uuid4())
+        session_ids.append(session_id)
+        session_ref = db.collection(SESSIONS).document(session_id)
+        batch.set(
+            session_ref,
+            {
+                "id": session_id,
+                "user_id": user_id,
+                "created_at": start,
+                "last_message_at": start,
+                "message_count": messages,
+            },
+        )
+        for i in range(messages):
+            message_id = str(uuid.uuid4())
+            batch.set(
+                session_ref.collection(MESSAGES).document(message_id),
+                {
+                    "id": message_id,
+                    "session_id": session_id,
+                    "role": "user" if i % 2 == 0 else "assistant",
+                    "content": f"message {i} " + "x" * 200,
+                    "created_at": start + timedelta(seconds=i),
+                    "metadata": {},
+                },
+            )
+            pending += 1
+            if pending == 500:
+                await batch.commit()
+                batch, pending = db.batch(), 0
+    await batch.commit()
+    return session_ids
+
+
+async def paged_read(db: firestore.AsyncClient, session_ids: List[str], page_size: int) -> int:
+    """Read every message one page at a time, one session after another."""
+    count = 0
+    for session_id in session_ids:
+        base = MESSAGES_OLDEST_FIRST.build(
+            db.collection(SESSIONS).document(session_id).collection(MESSAGES)
+        )
+        last = None
+        while True:
+            query = base if last is None else base.start_after(last)
+            docs = [doc async for doc in query.limit(page_size).stream()]
+            count += len(docs)
+            if len(docs) < page_size:
+                break
+            last = docs[-1]
+    return count
+
+
+async def run(args: argparse.Namespace) -> None:
+    db = firestore.AsyncClient(project=args.project)
+    user_id = f"bench-{uuid.uuid4().hex[:8]}"
+    total = args.sessions * args.messages
+    print(f"seeding {args.sessions} sessions x {args.messages} messages ({total} messages)")
+    session_ids = await seed(db, user_id, args.sessions, args.messages)
+
+    start = time.perf_counter()
+    await paged_read(db, session_ids, page_size=50)
+    paged = time.perf_counter() - start
+    print(f"  paged: {total / paged:9.0f} messages/s ({paged:.1f}s)")
+
+    exporter = SessionExporter()
+    exporter.db = db
+    start = time.perf_counter()
+    body = "".join([chunk async for chunk in exporter.export_user(user_id)])
+    exported = time.perf_counter() - start
+    size = len(body) / 1e6
+    print(f" export: {total / exported:9.0f} messages/s ({exported:.1f}s, {size:.1f} MB)")
+
+    async def lines() -> AsyncIterator[bytes]:
+        for line in body.encode().splitlines():
+            yield line
+
+    importer = SessionImporter(max_ops_per_second=args.max_ops)
+    importer.db = db
+    start = time.perf_counter()
+    await importer.import_lines(f"bench-{uuid.uuid4().hex[:8]}", lines())
+    imported = time.perf_counter() - start
+    print(f" import: {total / imported:9.0f} messages/s ({imported:.1f}s)")
+
+    print(f"export speedup over paging: {paged / exported:.1f}x")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sessions", type=int, default=20)
+    parser.add_argument("--messages", type=int, default=2500)
+    parser.add_argument("--max-ops", type=int, default=10000)
+    parser.add_argument("--project", default=os.getenv("GCLOUD_PROJECT", "demo-project"))
+    args = parser.parse_args()
+
+    if not os.getenv("FIRESTORE_EMULATOR_HOST"):
+        print("❌ FIRESTORE_EMULATOR_HOST is not set; start the emulator first")
+        return 1
+
+    asyncio.run(run(args))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
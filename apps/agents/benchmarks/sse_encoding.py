@@ -0,0 +1,78 @@
+"""Chat stream framing cost per token, single core.
+
+Compares the previous per-token path (a ChatStreamChunk model dumped to
+JSON, an f-string frame, and ``+=`` accumulation of the answer) with
+``app.core.sse`` (pre-encoded frame pieces around a C JSON string escape,
+bytes out, and one join at the end). Pure CPU; no emulator needed:
+
+    python -m benchmarks.sse_encoding --tokens 20000
+"""
+
+import argparse
+import random
+import sys
+import time
+from typing import Callable, List
+
+from app.core.sse import DONE_FRAME, content_frame
+from app.models.message import ChatStreamChunk
+
+WORDS = ["the", "agent", "streams", "tokens", "über", "naïve", "\"quoted\"", "line\n", "😀", "</b>"]
+
+
+def model_path(tokens: List[str]) -> int:
+    full_response = ""
+    sent = 0
+    for token in tokens:
+        full_response += token
+        frame = f"data: {ChatStreamChunk(content=token, done=False).model_dump_json()}\n\n"
+        sent += len(frame.encode())
+    sent += len(f"data: {ChatStreamChunk(content='', done=True).model_dump_json()}\n\n".encode())
+    return sent + len(full_response)
+
+
+def frame_path(tokens: List[str]) -> int:
+    parts: List[str] = []
+    sent = 0
+    for token in tokens:
+        parts.append(token)
+        sent += len(content_frame(token))
+    sent += len(DONE_FRAME)
+    return sent + len("".join(parts))
+
+
+def measure(path: Callable[[List[str]], int], tokens: List[str], rounds: int) -> float:
+    """Best tokens/s over rounds."""
+    best = float("inf")
+    for _ in range(rounds):
+        start = time.perf_counter()
+        path(tokens)
+        best = min(best, time.perf_counter() - start)
+    return len(tokens) / best
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--tokens", type=int, default=20000)
+    parser.add_argument("--rounds", type=int, default=5)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    tokens = [rng.choice(WORDS) + " " for _ in range(args.tokens)]
+
+    # Both paths must put the same bytes on the wire
+    for token in WORDS:
+        expected = f"data: {ChatStreamChunk(content=token, done=False).model_dump_json()}\n\n"
+        assert content_frame(token) == expected.encode(), token
+
+    before = measure(model_path, tokens, args.rounds)
+    after = measure(frame_path, tokens, args.rounds)
+    print(f"{args.tokens} tokens per stream, best of {args.rounds}")
+    print(f"  model: {before:11.0f} tokens/s")
+    print(f" frames: {after:11.0f} tokens/s")
+    print(f"speedup: {after / before:.1f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,194 @@
+"""In-memory Firestore fakes shared by the service tests.
+
+Documents live in one dict keyed by path. Each write bumps the document's
+version, which snapshots report as ``update_time``, so update-time
+preconditions behave as they do in Firestore. Tests subclass these fakes
+for behavior of their own (scripted conflicts, count aggregations).
+"""
+
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Tuple
+
+from google.api_core.exceptions import AlreadyExists, FailedPrecondition, NotFound
+from google.cloud import firestore
+from google.cloud.firestore_v1.transforms import Increment
+
+from app.services.chat_service import ChatService
+
+
+class FakeSnapshot:
+    def __init__(
+        self, data: Optional[dict], update_time: int = 0, doc_id: Optional[str] = None
+    ) -> None:
+        self._data = data
+        self.exists = data is not None
+        self.update_time = update_time
+        self.id = doc_id if doc_id is not None else (data or {}).get("id")
+
+    def to_dict(self) -> Optional[dict]:
+        return None if self._data is None else dict(self._data)
+
+
+class FakeDocRef:
+    def __init__(self, db: "FakeDB", path: str) -> None:
+        self.db = db
+        self.path = path
+
+    @property
+    def id(self) -> str:
+        return self.path.rsplit("/", 1)[-1]
+
+    def collection(self, name: str) -> "FakeCollection":
+        return FakeCollection(self.db, f"{self.path}/{name}")
+
+    async def get(self) -> FakeSnapshot:
+        self.db.reads += 1
+        snapshot = FakeSnapshot(
+            self.db.docs.get(self.path), self.db.versions.get(self.path, 0), self.id
+        )
+        if self.db.after_read is not None:
+            after_read, self.db.after_read = self.db.after_read, None
+            after_read()
+        return snapshot
+
+    async def set(self, data: dict, merge: bool = False) -> None:
+        self.db.write(self.path, data, merge)
+
+    async def create(self, data: dict) -> None:
+        if self.path in self.db.docs:
+            raise AlreadyExists(f"{self.path} exists")
+        self.db.write(self.path, data)
+
+    async def update(self, data: dict, option: Optional[dict] = None) -> None:
+        self.db.check(self.path, option, must_exist=True)
+        self.db.write(self.path, data, merge=True)
+
+
+class FakeCollection:
+    def __init__(self, db: "FakeDB", path: str) -> None:
+        self.db = db
+        self.path = path
+
+    def document(self, doc_id: str) -> FakeDocRef:
+        return FakeDocRef(self.db, f"{self.path}/{doc_id}")
+
+
+class FakeBatch:
+    def __init__(self, db: "FakeDB") -> None:
+        self.db = db
+        self.writes: List[Tuple[str, str, Optional[dict], Optional[dict]]] = []
+
+    def set(self, ref: FakeDocRef, data: dict, merge: bool = False) -> None:
+        self.writes.append(("merge" if merge else "set", ref.path, data, None))
+
+    def update(self, ref: FakeDocRef, data: dict, option: Optional[dict] = None) -> None:
+        self.writes.append(("update", ref.path, data, option))
+
+    def delete(self, ref: FakeDocRef, option: Optional[dict] = None) -> None:
+        self.writes.append(("delete", ref.path, None, option))
+
+    async def commit(self) -> None:
+        # All preconditions are checked before anything is applied
+        for kind, path, _, option in self.writes:
+            self.db.check(path, option, must_exist=kind == "update")
+        for kind, path, data, _ in self.writes:
+            if data is None:
+                self.db.delete(path)
+            else:
+                self.db.write(path, data, merge=kind != "set")
+
+
+class FakeDB:
+    """Path-keyed documents with update-time preconditions and a hook after the next read."""
+
+    def __init__(self) -> None:
+        self.docs: Dict[str, dict] = {}
+        self.versions: Dict[str, int] = {}
+        self.reads = 0
+        self.after_read: Optional[Callable[[], None]] = None
+
+    def collection(self, name: str) -> FakeCollection:
+        return FakeCollection(self, name)
+
+    def document(self, path: str) -> FakeDocRef:
+        return FakeDocRef(self, path)
+
+    def batch(self) -> FakeBatch:
+        return FakeBatch(self)
+
+    def write_option(self, **kwargs: Any) -> dict:
+        return kwargs
+
+    def check(self, path: str, option: Optional[dict], must_exist: bool = False) -> None:
+        """Raise as Firestore would if a write's precondition fails."""
+        option = option or {}
+        if (must_exist or option.get("exists")) and path not in self.docs:
+            raise NotFound(f"{path} not found")
+        expected = option.get("last_update_time")
+        if expected is not None and expected != self.versions.get(path, 0):
+            raise FailedPrecondition(f"{path} changed")
+
+    def write(self, path: str, data: dict, merge: bool = False) -> None:
+        doc = dict(self.docs.get(path, {})) if merge else {}
+        for field, value in data.items():
+            if isinstance(value, Increment):
+                value = doc.get(field, 0) + value.value
+            doc[field] = value
+        self.docs[path] = doc
+        self.versions[path] = self.versions.get(path, 0) + 1
+
+    def delete(self, path: str) -> None:
+        self.docs.pop(path, None)
+        self.versions[path] = self.versions.get(path, 0) + 1
+
+
+class FakeMessageQuery:
+    """Ordered (created_at, id) query over an in-memory message list."""
+
+    def __init__(self, docs: List[dict]) -> None:
+        self.docs = docs
+        self.descending = False
+        self.position: Optional[tuple] = None
+        self.max_results: Optional[int] = None
+
+    def collection(self, name: str) -> "FakeMessageQuery":
+        return self
+
+    def document(self, doc_id: str) -> "FakeMessageQuery":
+        return self
+
+    def order_by(self, field, direction: str = firestore.Query.ASCENDING) -> "FakeMessageQuery":
+        self.descending = direction == firestore.Query.DESCENDING
+        return self
+
+    def start_after(self, fields: dict) -> "FakeMessageQuery":
+        self.position = (fields["created_at"], fields["__name__"])
+        return self
+
+    def limit(self, count: int) -> "FakeMessageQuery":
+        self.max_results = count
+        return self
+
+    def reset(self) -> None:
+        """Forget the last page's position; the fake keeps query state."""
+        self.position = None
+
+    async def stream(self) -> AsyncIterator[FakeSnapshot]:
+        def key(doc: dict) -> tuple:
+            return doc["created_at"], doc["id"]
+
+        docs = sorted(self.docs, key=key, reverse=self.descending)
+        if self.position is not None:
+            if self.descending:
+                docs = [d for d in docs if key(d) < self.position]
+            else:
+                docs = [d for d in docs if key(d) > self.position]
+        for doc in docs[: self.max_results]:
+            yield FakeSnapshot(doc)
+
+
+def make_chat_service(db: Any) -> ChatService:
+    """ChatService reading and writing through a fake client."""
+    service = ChatService.__new__(ChatService)
+    service.db = db
+    service.collection = "agents-sessions"
+    return service
@@ -0,0 +1,120 @@
+"""Tests for the agent cache and cross-instance invalidation."""
+
+import asyncio
+import fnmatch
+from datetime import datetime, timedelta, timezone
+
+from app.core.pubsub import RedisEventBus
+from app.models.agent import AgentConfig, AgentResponse, AgentStatus
+from app.services.agent_cache import AgentCache
+
+
+class FakePubSub:
+    """Pattern subscription on FakeRedis."""
+
+    def __init__(self, server: "FakeRedis") -> None:
+        self.server = server
+        self.queue: asyncio.Queue = asyncio.Queue()
+        self.patterns: list[str] = []
+
+    async def psubscribe(self, pattern: str) -> None:
+        self.patterns.append(pattern)
+        self.server.subscribers.append(self)
+
+    async def listen(self):
+        while True:
+            yield await self.queue.get()
+
+    async def aclose(self) -> None:
+        self.server.subscribers.remove(self)
+
+
+class FakeRedis:
+    """Local stand-in for Redis pub/sub."""
+
+    def __init__(self) -> None:
+        self.subscribers: list[FakePubSub] = []
+
+    def pubsub(self) -> FakePubSub:
+        return FakePubSub(self)
+
+    async def publish(self, channel: str, data: str) -> int:
+        receivers = [
+            sub
+            for sub in self.subscribers
+            if any(fnmatch.fnmatchcase(channel, p) for p in sub.patterns)
+        ]
+        for sub in receivers:
+            sub.queue.put_nowait({"type": "pmessage", "channel": channel, "data": data})
+        return len(receivers)
+
+
+def make_agent(updated_at: datetime, name: str = "Support") -> AgentResponse:
+    return AgentResponse(
+        id="agent-1",
+        config=AgentConfig(name=name),
+        status=AgentStatus.ACTIVE,
+        created_at=updated_at,
+        updated_at=updated_at,
+        created_by="user-1",
+    )
+
+
+async def test_concurrent_misses_load_once():
+    """Concurrent reads of an uncached agent share one load."""
+    cache = AgentCache(RedisEventBus(FakeRedis()))
+    loads = 0
+
+    async def loader() -> AgentResponse:
+        nonlocal loads
+        loads += 1
+        await asyncio.sleep(0.01)
+        return make_agent(datetime(2026, 1, 1, tzinfo=timezone.utc))
+
+    await asyncio.gather(*(cache.get_or_load("agent-1", loader) for _ in range(20)))
+    await cache.get_or_load("agent-1", loader)
+
+    assert loads == 1
+
+
+async def test_invalidation_reaches_other_instances():
+    """An update on one instance drops the entry cached by another."""
+    redis = FakeRedis()
+    bus_a, bus_b = RedisEventBus(redis), RedisEventBus(redis)
+    await bus_a.start()
+    await bus_b.start()
+    cache_a, cache_b = AgentCache(bus_a), AgentCache(bus_b)
+    v1 = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    v2 = v1 + timedelta(seconds=5)
+    current = make_agent(v1)
+
+    async def loader() -> AgentResponse:
+        return current
+
+    assert (await cache_a.get_or_load("agent-1", loader)).config.name == "Support"
+
+    current = make_agent(v2, name="Support v2")
+    await cache_b.invalidate("agent-1", v2)
+    await asyncio.sleep(0.01)
+
+    assert (await cache_a.get_or_load("agent-1", loader)).config.name == "Support v2"
+    await bus_a.stop()
+    await bus_b.stop()
+
+
+async def test_stale_read_is_not_cached_after_invalidation():
+    """A read that returns the pre-update version is not cached."""
+    cache = AgentCache(RedisEventBus(FakeRedis()))
+    v1 = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    loads = 0
+
+    async def stale_loader() -> AgentResponse:
+        nonlocal loads
+        loads += 1
+        return make_agent(v1)
+
+    await cache.invalidate("agent-1", v1 + timedelta(seconds=1))
+    await cache.get_or_load("agent-1", stale_loader)
+    await cache.get_or_load("agent-1", stale_loader)
+
+    assert loads == 2
@@ -0,0 +1,165 @@
+"""Tests for agent service writes and their HTTP mapping."""
+
+from datetime import datetime, timezone
+from types import SimpleNamespace
+
+import pytest
+from fastapi import HTTPException
+from google.api_core.exceptions import FailedPrecondition, NotFound
+
+from app.api.v1 import agents as agents_api
+from app.core.config import settings
+from app.core.cursors import decode_cursor
+from app.core.exceptions import AgentConflictError, AgentNotFoundError
+from app.core.principal import Principal
+from app.core.repository import AGENT_COUNTERS, AGENTS
+from app.models.agent import AgentStatus, AgentSummary, AgentUpdate
+from app.services import agent_service as agent_service_module
+from app.services.agent_service import AgentService
+from tests.conftest import FakeDB, FakeSnapshot
+
+
+def agent_doc(agent_id: str) -> dict:
+    now = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    return {
+        "id": agent_id,
+        "config": {"name": "Helper"},
+        "status": "active",
+        "created_at": now,
+        "updated_at": now,
+        "created_by": "u1",
+    }
+
+
+class ConflictingDB(FakeDB):
+    """Conditional writes lose to scripted concurrent writers before succeeding."""
+
+    def __init__(self, failures: list[Exception] | None = None) -> None:
+        super().__init__()
+        self.failures = failures or []
+        self.preconditions: list[int] = []
+
+    def check(self, path: str, option: dict | None, must_exist: bool = False) -> None:
+        if option and "last_update_time" in option:
+            self.preconditions.append(option["last_update_time"])
+            if self.failures:
+                # A concurrent writer landed first: the stored version moves on
+                self.versions[path] += 1
+                raise self.failures.pop(0)
+        super().check(path, option, must_exist)
+
+
+@pytest.fixture
+def use_db(monkeypatch: pytest.MonkeyPatch):
+    def install(db: FakeDB, *agent_ids: str) -> FakeDB:
+        for agent_id in agent_ids:
+            db.write(f"{AGENTS}/{agent_id}", agent_doc(agent_id))
+
+        class FakeClients:
+            firestore = db
+
+        monkeypatch.setattr(agent_service_module, "clients", FakeClients())
+        return db
+
+    return install
+
+
+PAUSE = AgentUpdate(status=AgentStatus.INACTIVE)
+
+
+async def test_update_retries_after_precondition_failure(use_db):
+    db = use_db(ConflictingDB([FailedPrecondition("changed")]), "a1")
+    version = db.versions[f"{AGENTS}/a1"]
+
+    agent = await AgentService().update_agent("a1", PAUSE, "u1")
+
+    assert agent.status == AgentStatus.INACTIVE
+    assert db.reads == 2
+    # The retry is conditioned on the version it re-read, not the first one
+    assert db.preconditions == [version, version + 1]
+
+
+async def test_update_gives_up_after_max_attempts(use_db):
+    attempts = settings.AGENT_UPDATE_MAX_ATTEMPTS
+    db = use_db(ConflictingDB([FailedPrecondition("changed")] * attempts), "a1")
+
+    with pytest.raises(AgentConflictError):
+        await AgentService().update_agent("a1", PAUSE, "u1")
+    assert db.reads == attempts
+
+    db.failures = [FailedPrecondition("changed")] * attempts
+    with pytest.raises(HTTPException) as exc:
+        await agents_api.update_agent("a1", PAUSE, Principal(uid="u1"))
+    assert exc.value.status_code == 409
+
+
+async def test_update_of_deleted_agent_is_not_found(use_db):
+    # Deleted between the read and the conditional write
+    use_db(ConflictingDB([NotFound("gone")]), "a1")
+    with pytest.raises(AgentNotFoundError):
+        await AgentService().update_agent("a1", PAUSE, "u1")
+
+    use_db(FakeDB())
+    with pytest.raises(HTTPException) as exc:
+        await agents_api.update_agent("a1", PAUSE, Principal(uid="u1"))
+    assert exc.value.status_code == 404
+
+
+async def test_delete_by_another_user_is_not_found(use_db):
+    db = use_db(FakeDB(), "a1")
+
+    with pytest.raises(HTTPException) as exc:
+        await agents_api.delete_agent("a1", Principal(uid="u2"))
+    assert exc.value.status_code == 404
+    assert f"{AGENTS}/a1" in db.docs
+    assert f"{AGENT_COUNTERS}/u2" not in db.docs
+
+    await AgentService().delete_agent("a1", "u1")
+    assert f"{AGENTS}/a1" not in db.docs
+    # The owner's counter is the one decremented
+    assert db.docs[f"{AGENT_COUNTERS}/u1"] == {"agents": -1}
+
+
+class FakeListQuery:
+    """Agent list query recording its projection and serving stored documents."""
+
+    def __init__(self, docs: list[dict]) -> None:
+        self.docs = docs
+        self.fields: list[str] | None = None
+        self.max_results = len(docs)
+
+    def where(self, *args) -> "FakeListQuery":
+        return self
+
+    def order_by(self, *args, **kwargs) -> "FakeListQuery":
+        return self
+
+    def select(self, fields: list[str]) -> "FakeListQuery":
+        self.fields = fields
+        return self
+
+    def limit(self, count: int) -> "FakeListQuery":
+        self.max_results = count
+        return self
+
+    async def stream(self):
+        for data in self.docs[: self.max_results]:
+            yield FakeSnapshot(data, 0)
+
+
+async def test_summary_view_reads_only_summary_fields(monkeypatch):
+    query = FakeListQuery([agent_doc(f"a{i}") for i in range(3)])
+
+    class FakeClients:
+        firestore = SimpleNamespace(collection=lambda name: query)
+
+    monkeypatch.setattr(agent_service_module, "clients", FakeClients())
+
+    summaries, next_cursor = await AgentService().list_agent_summaries("u1", limit=2)
+
+    assert query.fields == ["id", "config.name", "status", "created_at", "updated_at"]
+    assert [summary.id for summary in summaries] == ["a0", "a1"]
+    assert all(isinstance(summary, AgentSummary) for summary in summaries)
+    assert summaries[0].name == "Helper"
+    # Summary cursors continue the same listing
+    assert decode_cursor(next_cursor, "agents:u1:") == (summaries[1].created_at, "a1")
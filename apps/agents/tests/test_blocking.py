@@ -0,0 +1,76 @@
+"""Tests for the blocking I/O executor."""
+
+import asyncio
+import threading
+
+import pytest
+
+from app.core.blocking import BlockingExecutor
+from app.core.exceptions import ExecutorSaturatedError
+
+
+async def test_caps_concurrency_per_category():
+    """No more than the category's cap run at once."""
+    executor = BlockingExecutor({"auth": (2, 10)})
+    lock = threading.Lock()
+    running = 0
+    peak = 0
+
+    def work() -> None:
+        nonlocal running, peak
+        with lock:
+            running += 1
+            peak = max(peak, running)
+        threading.Event().wait(0.02)
+        with lock:
+            running -= 1
+
+    await asyncio.gather(*(executor.run("auth", work) for _ in range(6)))
+
+    assert peak == 2
+    assert executor.metrics()["auth"]["completed"] == 6
+    executor.shutdown()
+
+
+async def test_rejects_when_queue_is_full():
+    """Calls beyond the queue limit fail fast."""
+    executor = BlockingExecutor({"storage": (1, 1)})
+    release = threading.Event()
+
+    running = asyncio.ensure_future(executor.run("storage", release.wait))
+    queued = asyncio.ensure_future(executor.run("storage", lambda: None))
+    await asyncio.sleep(0.01)
+
+    with pytest.raises(ExecutorSaturatedError):
+        await executor.run("storage", lambda: None)
+
+    release.set()
+    await asyncio.gather(running, queued)
+    assert executor.metrics()["storage"]["rejected"] == 1
+    executor.shutdown()
+
+
+async def test_cancelled_caller_keeps_slot_until_worker_finishes():
+    """Cancelling the awaiting task does not free the slot of a running thread."""
+    executor = BlockingExecutor({"system": (1, 10)})
+    started = threading.Event()
+    release = threading.Event()
+
+    def work() -> None:
+        started.set()
+        release.wait()
+
+    first = asyncio.ensure_future(executor.run("system", work))
+    await asyncio.get_running_loop().run_in_executor(None, started.wait)
+    first.cancel()
+    await asyncio.gather(first, return_exceptions=True)
+
+    second = asyncio.ensure_future(executor.run("system", lambda: "ran"))
+    await asyncio.sleep(0.02)
+    assert not second.done()
+    assert executor.metrics()["system"]["in_flight"] == 1
+
+    release.set()
+    assert await second == "ran"
+    assert executor.metrics()["system"]["in_flight"] == 0
+    executor.shutdown()
@@ -0,0 +1,76 @@
+"""Tests for in-process caching primitives."""
+
+import asyncio
+
+from app.core.cache import KeyedLock, SingleFlight, TTLCache
+
+
+class FakeClock:
+    """Manually advanced clock."""
+
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_ttl_cache_expires_entries():
+    """Entries disappear once their expiry passes."""
+    clock = FakeClock()
+    cache: TTLCache[str, int] = TTLCache(maxsize=10, ttl=5, clock=clock)
+    cache.set("a", 1)
+    cache.set("b", 2, expires_at=clock.now + 60)
+
+    clock.now += 10
+    assert cache.get("a") is None
+    assert cache.get("b") == 2
+
+
+def test_ttl_cache_evicts_least_recently_used():
+    """The least recently used entry is evicted at capacity."""
+    cache: TTLCache[str, int] = TTLCache(maxsize=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+
+
+async def test_single_flight_collapses_concurrent_calls():
+    """Concurrent callers with the same key share one loader call."""
+    flight: SingleFlight[str, int] = SingleFlight()
+    calls = 0
+
+    async def load() -> int:
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return 42
+
+    results = await asyncio.gather(*(flight.do("k", load) for _ in range(10)))
+
+    assert results == [42] * 10
+    assert calls == 1
+    await asyncio.sleep(0)
+    assert len(flight) == 0
+
+
+async def test_keyed_lock_serializes_one_key_only():
+    """Holders of one key run one at a time; other keys are not blocked."""
+    locks: KeyedLock[str] = KeyedLock()
+    order: list[str] = []
+
+    async def hold(key: str, name: str) -> None:
+        async with locks.hold(key):
+            order.append(f"{name} in")
+            await asyncio.sleep(0.01)
+            order.append(f"{name} out")
+
+    await asyncio.gather(hold("s1", "a"), hold("s1", "b"), hold("s2", "c"))
+    assert order.index("a out") < order.index("b in")
+    assert order.index("c in") < order.index("a out")
+    assert len(locks) == 0
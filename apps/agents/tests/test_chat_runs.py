@@ -0,0 +1,162 @@
+"""Tests for chat run replay, resume and cancellation."""
+
+import asyncio
+from contextlib import aclosing
+
+import pytest
+
+from app.core.exceptions import ChatRunNotFoundError, ReplayUnavailableError, ValidationError
+from app.core.pubsub import EventBus
+from app.services.chat_runs import ChatRun, ChatRunRegistry, parse_event_id
+from app.services.replay_log import RedisReplayLog
+
+
+class FakeRequest:
+    """Request whose client disconnects when told to."""
+
+    def __init__(self) -> None:
+        self.gone = asyncio.Event()
+
+    async def receive(self) -> dict:
+        await self.gone.wait()
+        return {"type": "http.disconnect"}
+
+
+def make_registry(grace: float = 10.0) -> ChatRunRegistry:
+    # No Redis configured, so the log only ever reports "not replicated"
+    return ChatRunRegistry(EventBus(), RedisReplayLog(), grace=grace)
+
+
+async def slow_model(log: list):
+    try:
+        for word in ["one ", "two ", "three "]:
+            yield word
+            await asyncio.sleep(10)
+    finally:
+        log.append("closed")
+
+
+async def test_cancel_interrupts_waiting_read():
+    log: list = []
+    registry = make_registry()
+    run = ChatRun("u1", "s1")
+    received = []
+
+    async def generate():
+        async for chunk in run.guard(slow_model(log)):
+            received.append(chunk)
+
+    registry.start(run, generate())
+    await asyncio.sleep(0.01)
+    await registry.cancel(run.id, "u2")
+    assert not run.cancelled
+
+    await registry.cancel(run.id, "u1")
+    await registry.shutdown()
+    assert received == ["one "]
+    assert run.reason == "cancelled"
+    assert run.truncated
+    assert log == ["closed"]
+
+
+async def test_cancel_after_last_chunk_is_not_truncation():
+    run = ChatRun("u1", "s1")
+
+    async def quick_model():
+        yield "all "
+        yield "done"
+
+    async with aclosing(run.guard(quick_model())) as guarded:
+        received = [chunk async for chunk in guarded]
+    # A grace timeout or cancel landing after the model finished
+    run.cancel("disconnected")
+
+    assert received == ["all ", "done"]
+    assert run.cancelled
+    assert not run.truncated
+
+
+async def test_resume_after_last_event_id():
+    registry = make_registry()
+    run = ChatRun("u1", "s1")
+    release = asyncio.Event()
+
+    async def generate():
+        for i in range(3):
+            await registry.publish(run, f"frame {i}\n\n".encode())
+        await release.wait()
+        await registry.publish(run, b"done\n\n", last=True)
+
+    registry.start(run, generate())
+    await asyncio.sleep(0)
+    frames = await registry.follow(run.id, "u1", 2, FakeRequest())
+    release.set()
+    received = [frame async for frame in frames]
+
+    assert received == [
+        f"id: {run.id}:3\nframe 2\n\n".encode(),
+        f"id: {run.id}:4\ndone\n\n".encode(),
+    ]
+    with pytest.raises(ChatRunNotFoundError):
+        await registry.follow(run.id, "u2", 0, FakeRequest())
+
+
+async def test_replay_window_is_bounded():
+    run = ChatRun("u1", "s1", max_frames=2)
+    for _ in range(5):
+        run.append(b"x\n\n")
+    assert len(run.frames_after(3)) == 2
+    with pytest.raises(ReplayUnavailableError):
+        run.frames_after(1)
+
+
+async def test_abandoned_run_is_cancelled_after_grace():
+    registry = make_registry(grace=0.01)
+    run = ChatRun("u1", "s1")
+    registry.start(run, slow_model_run(run))
+
+    request = FakeRequest()
+    frames = await registry.follow(run.id, "u1", 0, request)
+    assert await frames.__anext__() == f"id: {run.id}:1\ndata\n\n".encode()
+    request.gone.set()
+    assert [frame async for frame in frames] == []
+
+    await asyncio.sleep(0.05)
+    await asyncio.wait_for(registry.shutdown(), timeout=1)
+    assert run.reason == "disconnected"
+
+
+async def test_run_never_followed_is_cancelled_after_grace():
+    registry = make_registry(grace=0.01)
+    run = ChatRun("u1", "s1")
+    registry.start(run, slow_model_run(run))
+
+    await asyncio.sleep(0.05)
+    await asyncio.wait_for(registry.shutdown(), timeout=1)
+    assert run.reason == "disconnected"
+
+
+async def test_extra_detach_keeps_one_pending_abandon():
+    run = ChatRun("u1", "s1")
+    run.attach()
+    run.detach(10)
+    # A stray follow notice from another instance must not go negative
+    run.detach(10)
+    run.attach()
+    await asyncio.sleep(0.02)
+    assert not run.cancelled
+
+    run.detach(0.01)
+    await asyncio.sleep(0.05)
+    assert run.reason == "disconnected"
+
+
+async def slow_model_run(run: ChatRun) -> None:
+    async for _ in run.guard(slow_model([])):
+        run.append(b"data\n\n")
+
+
+def test_parse_event_id():
+    assert parse_event_id("abc-def:12") == ("abc-def", 12)
+    with pytest.raises(ValidationError):
+        parse_event_id("abc")
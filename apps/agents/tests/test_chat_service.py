@@ -0,0 +1,52 @@
+"""Tests for committing chat turns."""
+
+from datetime import datetime, timezone
+
+from app.services.session_cache import SessionMeta
+from tests.conftest import FakeDB, make_chat_service
+
+SESSION_PATH = "agents-sessions/s1"
+
+
+def recent(db: FakeDB) -> list[str]:
+    return [m["content"] for m in db.docs[SESSION_PATH]["context"]["recent"]]
+
+
+async def test_turn_builds_on_a_turn_committed_since_it_started():
+    """A concurrent turn fails the precondition; the retry keeps both turns."""
+    db = FakeDB()
+    service = make_chat_service(db)
+    now = datetime.now(timezone.utc)
+    db.write(
+        SESSION_PATH,
+        {
+            "id": "s1",
+            "user_id": "u1",
+            "created_at": now,
+            "last_message_at": now,
+            "message_count": 0,
+        },
+    )
+    staged = SessionMeta.from_doc(db.docs[SESSION_PATH])
+    slow = service.start_turn("u1", "first?", session=staged)
+    fast = service.start_turn("u1", "second?", session=staged)
+
+    def commit_fast_turn() -> None:
+        # Another instance commits its turn between our read and our write
+        db.write(
+            SESSION_PATH,
+            {
+                "message_count": 2,
+                "context": {
+                    "summary": "",
+                    "recent": [fast.user_message, {"role": "assistant", "content": "fast"}],
+                },
+            },
+            merge=True,
+        )
+
+    db.after_read = commit_fast_turn
+    await service.commit_turn(slow, "slow")
+
+    assert recent(db) == ["second?", "fast", "first?", "slow"]
+    assert db.docs[SESSION_PATH]["message_count"] == 4
@@ -0,0 +1,82 @@
+"""Tests for backend client startup, warmup and shutdown."""
+
+import asyncio
+
+import pytest
+
+from app.core import clients as clients_module
+from app.core.clients import ClientManager
+from app.core.config import settings
+
+
+class FakeFirestore:
+    """Async Firestore client whose warmup read fails a set number of times."""
+
+    def __init__(self, failures: int = 0) -> None:
+        self.failures = failures
+        self.reads = 0
+        self.closed = False
+
+    def collection(self, name: str) -> "FakeFirestore":
+        return self
+
+    def document(self, doc_id: str) -> "FakeFirestore":
+        return self
+
+    async def get(self) -> None:
+        self.reads += 1
+        if self.reads <= self.failures:
+            raise ConnectionError("channel not ready")
+
+
+class FakeManager(ClientManager):
+    def __init__(self, failures: int = 0) -> None:
+        super().__init__()
+        self.created: list[FakeFirestore] = []
+        self.failures = failures
+
+    def _new_firestore_client(self):
+        client = FakeFirestore(self.failures)
+        self.created.append(client)
+        return client
+
+    async def _close_firestore(self, client) -> None:
+        client.closed = True
+
+
+@pytest.fixture(autouse=True)
+def no_firebase(monkeypatch):
+    monkeypatch.setattr(clients_module, "initialize_firebase_admin", lambda: None)
+    monkeypatch.setattr(clients_module, "get_storage_client", lambda: None)
+    monkeypatch.setattr(settings, "FIRESTORE_CHANNEL_POOL_SIZE", 2)
+    monkeypatch.setattr(settings, "CLIENT_WARMUP_RETRY_SECONDS", 0.01)
+
+
+async def test_start_warms_every_channel_and_stop_closes_them():
+    manager = FakeManager()
+    await manager.start()
+
+    assert manager.ready
+    assert [client.reads for client in manager.created] == [1, 1]
+    assert {id(manager.firestore), id(manager.firestore)} == {id(c) for c in manager.created}
+
+    await manager.stop()
+    assert not manager.ready
+    assert all(client.closed for client in manager.created)
+
+
+async def test_failed_warmup_retries_in_background(monkeypatch):
+    monkeypatch.setattr(settings, "CLIENT_WARMUP_TIMEOUT_SECONDS", 0.001)
+    manager = FakeManager(failures=2)
+    await manager.start()
+    assert not manager.ready
+
+    for _ in range(100):
+        if manager.ready:
+            break
+        await asyncio.sleep(0.01)
+    assert manager.ready
+    # Clients are created once and reused across attempts
+    assert len(manager.created) == 2
+    assert [client.reads for client in manager.created] == [3, 3]
+    await manager.stop()
@@ -0,0 +1,68 @@
+"""Tests for incremental conversation summarization."""
+
+from app.services.context_builder import ContextBuilder, ConversationContext
+
+
+class RecordingSummarizer:
+    """Deterministic summarizer that records what it was asked to fold in."""
+
+    def __init__(self) -> None:
+        self.calls: list[list[str]] = []
+
+    async def summarize(self, summary: str, turns: list[dict]) -> str:
+        self.calls.append([t["content"] for t in turns])
+        folded = "|".join(t["content"] for t in turns)
+        return f"{summary}|{folded}" if summary else folded
+
+
+async def run_turns(builder: ContextBuilder, count: int) -> ConversationContext:
+    context = ConversationContext()
+    for i in range(count):
+        context = await builder.advance(context, f"q{i}", f"a{i}")
+        # Round-trip through the session document every turn
+        context = ConversationContext.from_doc(context.to_doc())
+    return context
+
+
+async def test_recent_window_is_kept_verbatim():
+    """Turns inside the window are not summarized."""
+    summarizer = RecordingSummarizer()
+    context = await run_turns(ContextBuilder(summarizer, window_turns=3), 3)
+
+    assert summarizer.calls == []
+    assert [m["content"] for m in context.recent] == ["q0", "a0", "q1", "a1", "q2", "a2"]
+
+
+async def test_summary_is_updated_one_turn_at_a_time():
+    """Each turn past the window folds only the evicted turn into the summary."""
+    summarizer = RecordingSummarizer()
+    context = await run_turns(ContextBuilder(summarizer, window_turns=2), 5)
+
+    assert summarizer.calls == [["q0", "a0"], ["q1", "a1"], ["q2", "a2"]]
+    assert context.summary == "q0|a0|q1|a1|q2|a2"
+    assert context.summarized_turns == 3
+    assert [m["content"] for m in context.to_prompt("q5")] == [
+        "Summary of the conversation so far:\nq0|a0|q1|a1|q2|a2",
+        "q3",
+        "a3",
+        "q4",
+        "a4",
+        "q5",
+    ]
+
+
+class FailingSummarizer:
+    async def summarize(self, summary: str, turns: list[dict]) -> str:
+        raise RuntimeError("model unavailable")
+
+
+async def test_failed_summaries_keep_a_bounded_window():
+    """Unsummarized turns stay verbatim, but only up to max_recent_turns."""
+    builder = ContextBuilder(FailingSummarizer(), window_turns=2, max_recent_turns=3)
+
+    context = await run_turns(builder, 3)
+    assert [m["content"] for m in context.recent] == ["q0", "a0", "q1", "a1", "q2", "a2"]
+
+    context = await run_turns(builder, 10)
+    assert [m["content"] for m in context.recent] == ["q7", "a7", "q8", "a8", "q9", "a9"]
+    assert context.summary == ""
@@ -0,0 +1,90 @@
+"""Tests for the hot conversation buffer."""
+
+import time
+from datetime import datetime, timedelta, timezone
+
+from google.api_core.datetime_helpers import DatetimeWithNanoseconds
+
+from app.services.chat_service import ChatService
+from app.services.conversation_buffer import BufferedMessage, ConversationBuffer
+
+
+def turn(i: int, size: int = 10) -> list[dict]:
+    created_at = datetime(2026, 1, 1, tzinfo=timezone.utc) + timedelta(seconds=i)
+    return [
+        {"id": f"u{i}", "role": "user", "content": "q" * size, "created_at": created_at},
+        {"id": f"a{i}", "role": "assistant", "content": "a" * size, "created_at": created_at},
+    ]
+
+
+def test_new_session_is_served_from_memory():
+    """A session created here answers its newest page without Firestore."""
+    buffer = ConversationBuffer(max_bytes=1 << 20, messages_per_session=10)
+    for i in range(3):
+        buffer.append("s1", turn(i), message_count=2 * (i + 1), new_session=i == 0)
+
+    messages, has_more = buffer.read("s1", limit=4, message_count=6)
+    assert [m.id for m in messages] == ["a2", "u2", "a1", "u1"]
+    assert has_more
+
+    messages, has_more = buffer.read("s1", limit=50, message_count=6)
+    assert len(messages) == 6
+    assert not has_more
+
+
+def test_ring_overwrites_oldest_and_stops_being_complete():
+    """A full ring keeps the newest messages and no longer covers the history."""
+    buffer = ConversationBuffer(max_bytes=1 << 20, messages_per_session=4)
+    for i in range(3):
+        buffer.append("s1", turn(i), message_count=2 * (i + 1), new_session=i == 0)
+
+    messages, _ = buffer.read("s1", limit=4, message_count=6)
+    assert [m.id for m in messages] == ["a2", "u2", "a1", "u1"]
+    assert buffer.read("s1", limit=5, message_count=6) is None
+
+
+def test_byte_budget_evicts_least_recently_used_session():
+    """Exceeding the budget evicts the session idle the longest."""
+    buffer = ConversationBuffer(max_bytes=3000, messages_per_session=10)
+    buffer.append("old", turn(0, size=500), message_count=2, new_session=True)
+    buffer.append("hot", turn(0, size=500), message_count=2, new_session=True)
+    buffer.read("old", limit=2, message_count=2)
+    buffer.append("new", turn(0, size=500), message_count=2, new_session=True)
+
+    assert buffer.read("hot", limit=2, message_count=2) is None
+    assert buffer.read("old", limit=2, message_count=2) is not None
+
+
+def test_count_mismatch_and_stale_seed_miss():
+    """Writes from elsewhere invalidate the ring; a seed older than a write is refused."""
+    buffer = ConversationBuffer(max_bytes=1 << 20, messages_per_session=10)
+    buffer.append("s1", turn(0), message_count=2, new_session=True)
+    assert buffer.read("s1", limit=2, message_count=4) is None
+    assert len(buffer) == 0
+
+    read_started = time.monotonic()
+    buffer.append("s1", turn(1), message_count=4)
+    buffer.seed("s1", [], complete=True, message_count=2, read_started=read_started)
+    assert len(buffer) == 0
+
+
+def test_buffered_message_serializes_like_firestore():
+    """A message reads back identically from the buffer and from Firestore."""
+    written = {
+        "id": "m1",
+        "session_id": "s1",
+        "role": "user",
+        "content": "hi",
+        "created_at": datetime(2026, 1, 1, 12, 0, 0, 123456, tzinfo=timezone.utc),
+    }
+    # Firestore hands the stored time back as an aware DatetimeWithNanoseconds
+    stored = {
+        **written,
+        "created_at": DatetimeWithNanoseconds(2026, 1, 1, 12, 0, 0, 123456, tzinfo=timezone.utc),
+    }
+    expected = ChatService._to_message(stored).model_dump_json()
+
+    assert BufferedMessage.from_doc(written).to_response("s1").model_dump_json() == expected
+    # Naive UTC values from older writers are buffered as aware UTC too
+    naive = {**written, "created_at": written["created_at"].replace(tzinfo=None)}
+    assert BufferedMessage.from_doc(naive).to_response("s1").model_dump_json() == expected
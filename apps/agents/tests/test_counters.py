@@ -0,0 +1,97 @@
+"""Tests for the count() aggregation cache."""
+
+import asyncio
+from types import SimpleNamespace
+
+from google.cloud.firestore_v1.transforms import Increment
+
+from app.core.repository import AGENT_COUNTERS, AGENTS
+from app.services.counters import CountCache, read_agent_counter, seed_agent_counter
+from tests.conftest import FakeDB
+
+COUNTER = f"{AGENT_COUNTERS}/u1"
+
+
+class FakeAggregation:
+    def __init__(self, query: "FakeQuery") -> None:
+        self.query = query
+
+    async def get(self):
+        self.query.calls += 1
+        await asyncio.sleep(0.01)
+        return [[SimpleNamespace(alias="total", value=self.query.total)]]
+
+
+class FakeQuery:
+    """Query whose count() aggregation returns a fixed total."""
+
+    def __init__(self, total: int) -> None:
+        self.total = total
+        self.calls = 0
+
+    def count(self, alias: str) -> FakeAggregation:
+        return FakeAggregation(self)
+
+
+async def test_concurrent_counts_share_one_aggregation():
+    """A burst of identical count requests runs one aggregation."""
+    cache = CountCache(maxsize=10, ttl=60)
+    query = FakeQuery(42)
+
+    totals = await asyncio.gather(*(cache.count(("agents", "u1"), query) for _ in range(10)))
+    assert totals == [42] * 10
+    assert await cache.count(("agents", "u1"), query) == 42
+    assert query.calls == 1
+
+
+async def test_invalidate_recounts():
+    """An invalidated key is aggregated again."""
+    cache = CountCache(maxsize=10, ttl=60)
+    query = FakeQuery(3)
+
+    await cache.count("k", query)
+    query.total = 4
+    cache.invalidate("k")
+
+    assert await cache.count("k", query) == 4
+
+
+class CounterDB(FakeDB):
+    """Counter documents alongside an agents query answering count()."""
+
+    def __init__(self, counter: dict, query: FakeQuery) -> None:
+        super().__init__()
+        self.query = query
+        self.write(COUNTER, counter)
+
+    def collection(self, name: str):
+        if name == AGENTS:
+            return SimpleNamespace(where=lambda *args: self.query)
+        return super().collection(name)
+
+    def create_agent_after_next_read(self) -> None:
+        """Someone else creates an agent right after the next read."""
+
+        def create() -> None:
+            self.query.total += 1
+            self.write(COUNTER, {"agents": Increment(1)}, merge=True)
+
+        self.after_read = create
+
+
+async def test_unseeded_counter_is_seeded_with_the_real_count():
+    """A counter created by increments alone is not trusted until seeded."""
+    query = FakeQuery(3)
+    # One create since counters existed, on top of two older agents
+    db = CounterDB({"agents": 1}, query)
+
+    assert await read_agent_counter(db, "u1") is None
+    db.create_agent_after_next_read()
+    assert await seed_agent_counter(db, "u1") == 4
+    assert query.calls == 2
+    assert await read_agent_counter(db, "u1") == 4
+
+
+async def test_drifted_counter_is_not_trusted():
+    db = CounterDB({"agents": -1, "seeded": True}, FakeQuery(0))
+    assert await read_agent_counter(db, "u1") is None
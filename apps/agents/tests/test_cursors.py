@@ -0,0 +1,45 @@
+"""Tests for signed pagination cursors."""
+
+from datetime import datetime, timezone
+
+import pytest
+
+from app.core.cursors import _signing_key, decode_cursor, encode_cursor
+from app.core.exceptions import InvalidCursorError
+
+
+def test_round_trip():
+    """A cursor decodes to the position it was issued for."""
+    created_at = datetime(2026, 3, 1, 12, 30, 15, 123456, tzinfo=timezone.utc)
+    token = encode_cursor("agents:user-1:", created_at, "agent-9")
+
+    assert decode_cursor(token, "agents:user-1:") == (created_at, "agent-9")
+
+
+def test_tampered_cursor_is_rejected():
+    """Editing the payload invalidates the signature."""
+    token = encode_cursor("agents:user-1:", datetime(2026, 3, 1, tzinfo=timezone.utc), "agent-9")
+    forged = encode_cursor("agents:user-1:", datetime(2026, 3, 1, tzinfo=timezone.utc), "agent-1")
+    tampered = forged.split(".")[0] + "." + token.split(".")[1]
+
+    with pytest.raises(InvalidCursorError):
+        decode_cursor(tampered, "agents:user-1:")
+    with pytest.raises(InvalidCursorError):
+        decode_cursor("not-a-cursor", "agents:user-1:")
+
+
+def test_cursor_is_bound_to_its_query():
+    """A cursor issued for one user's listing is refused for another's."""
+    token = encode_cursor("agents:user-1:", datetime(2026, 3, 1, tzinfo=timezone.utc), "agent-9")
+
+    with pytest.raises(InvalidCursorError):
+        decode_cursor(token, "agents:user-2:")
+
+
+def test_signing_key_is_required_outside_development():
+    """Only development may fall back to a per-process key."""
+    assert _signing_key("shared", "production") == b"shared"
+    assert len(_signing_key("", "development")) == 32
+
+    with pytest.raises(RuntimeError):
+        _signing_key("", "production")
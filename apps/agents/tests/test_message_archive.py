@@ -0,0 +1,102 @@
+"""Tests for reading archived message segments."""
+
+from datetime import datetime, timedelta, timezone
+
+from app.services.chat_service import ChatService
+from app.services.message_archive import (
+    LocalArchiveStore,
+    MessageArchive,
+    decode_segment,
+    encode_segment,
+    message_archive,
+    segment_entry,
+)
+from tests.conftest import FakeMessageQuery, make_chat_service
+
+
+def make_messages(count: int) -> list[dict]:
+    start = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    return [
+        {
+            "id": f"m{i:03d}",
+            "session_id": "s1",
+            "content": f"message {i}",
+            "role": "user",
+            "created_at": start + timedelta(seconds=i),
+            "metadata": {},
+        }
+        for i in range(count)
+    ]
+
+
+async def archive_prefix(monkeypatch, tmp_path, messages: list[dict], segment: int) -> list[dict]:
+    """Write messages to segments of the given size; return the index."""
+    monkeypatch.setattr(message_archive, "_store", LocalArchiveStore(str(tmp_path)))
+    message_archive._segments.clear()
+    index = []
+    for i in range(0, len(messages), segment):
+        entry = segment_entry("s1", len(index), messages[i : i + segment])
+        await message_archive.store.put(entry["name"], encode_segment(messages[i : i + segment]))
+        index.append(entry)
+    return index
+
+
+def make_service(live: list[dict]) -> ChatService:
+    return make_chat_service(FakeMessageQuery(live))
+
+
+def test_segment_round_trip():
+    messages = make_messages(3)
+    assert decode_segment(encode_segment(messages)) == messages
+
+
+async def test_iter_messages_skips_segments_before_position(tmp_path):
+    archive = MessageArchive()
+    archive._store = LocalArchiveStore(str(tmp_path))
+    messages = make_messages(30)
+    index = []
+    for i in range(0, 30, 10):
+        entry = segment_entry("s1", len(index), messages[i : i + 10])
+        await archive.store.put(entry["name"], encode_segment(messages[i : i + 10]))
+        index.append(entry)
+
+    # Drop the first segment's blob; it must not be read
+    await archive.store.delete(index[0]["name"])
+    position = (messages[14]["created_at"], messages[14]["id"])
+    ids = [m["id"] async for m in archive.iter_messages(index, position, ascending=True)]
+    assert ids == [m["id"] for m in messages[15:]]
+
+
+async def test_page_back_from_live_into_archive(monkeypatch, tmp_path):
+    messages = make_messages(25)
+    index = await archive_prefix(monkeypatch, tmp_path, messages[:20], segment=8)
+    service = make_service(messages[20:])
+
+    seen: list[str] = []
+    before = None
+    while True:
+        page = service.message_page("s1", before=before, archive=index)
+        service.db.reset()
+        seen.extend([m.id async for m in service.iter_messages(page, 6)])
+        before = page.before_cursor
+        if before is None:
+            break
+
+    assert seen == [m["id"] for m in reversed(messages)]
+
+
+async def test_page_forward_from_archive_into_live(monkeypatch, tmp_path):
+    messages = make_messages(25)
+    index = await archive_prefix(monkeypatch, tmp_path, messages[:20], segment=8)
+    service = make_service(messages[20:])
+
+    start = service.message_page("s1", archive=index)
+    start.ascending, start.position = True, (messages[3]["created_at"], messages[3]["id"])
+    ids = [m.id async for m in service.iter_messages(start, 10)]
+    assert ids == [m["id"] for m in messages[4:14]]
+    assert start.has_more
+
+    page = service.message_page("s1", after=start.after_cursor, archive=index)
+    service.db.reset()
+    ids = [m.id async for m in service.iter_messages(page, 10)]
+    assert ids == [m["id"] for m in messages[14:24]]
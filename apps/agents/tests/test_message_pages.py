@@ -0,0 +1,58 @@
+"""Tests for cursor paging through session messages."""
+
+from datetime import datetime, timedelta, timezone
+
+from app.services.chat_service import ChatService, MessagePage
+from tests.conftest import FakeMessageQuery, make_chat_service
+
+
+def make_service(count: int) -> ChatService:
+    start = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    docs = [
+        {
+            "id": f"m{i:03d}",
+            "session_id": "s1",
+            "content": f"message {i}",
+            "role": "user",
+            "created_at": start + timedelta(seconds=i),
+        }
+        for i in range(count)
+    ]
+    return make_chat_service(FakeMessageQuery(docs))
+
+
+async def read(service: ChatService, page: MessagePage, limit: int) -> list[str]:
+    service.db.reset()
+    return [m.id async for m in service.iter_messages(page, limit)]
+
+
+async def test_page_back_through_history():
+    """before cursors walk from the newest page to the first message."""
+    service = make_service(7)
+
+    page = service.message_page("s1")
+    assert await read(service, page, 3) == ["m006", "m005", "m004"]
+
+    page = service.message_page("s1", before=page.before_cursor)
+    assert await read(service, page, 3) == ["m003", "m002", "m001"]
+
+    page = service.message_page("s1", before=page.before_cursor)
+    assert await read(service, page, 3) == ["m000"]
+    assert page.before_cursor is None
+
+
+async def test_after_cursor_fetches_newer_messages():
+    """after cursors page forward and stay usable once caught up."""
+    service = make_service(5)
+
+    page = service.message_page("s1")
+    await read(service, page, 2)
+    older = service.message_page("s1", before=page.before_cursor)
+    await read(service, older, 2)
+
+    newer = service.message_page("s1", after=older.after_cursor)
+    assert await read(service, newer, 10) == ["m003", "m004"]
+
+    caught_up = service.message_page("s1", after=newer.after_cursor)
+    assert await read(service, caught_up, 10) == []
+    assert caught_up.after_cursor == newer.after_cursor
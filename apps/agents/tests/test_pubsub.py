@@ -0,0 +1,56 @@
+"""Tests for the Redis event bus connections."""
+
+import asyncio
+
+from app.core import redis_client
+from app.core.config import settings
+from app.core.pubsub import RedisEventBus
+
+
+class FakePubSub:
+    async def psubscribe(self, pattern: str) -> None:
+        pass
+
+    async def listen(self):
+        await asyncio.Event().wait()
+        yield
+
+    async def aclose(self) -> None:
+        pass
+
+
+class FakeRedis:
+    def __init__(self) -> None:
+        self.pubsubs = 0
+
+    def pubsub(self) -> FakePubSub:
+        self.pubsubs += 1
+        return FakePubSub()
+
+
+async def test_listener_uses_the_subscriber_client():
+    publisher, subscriber = FakeRedis(), FakeRedis()
+    bus = RedisEventBus(publisher, subscriber=subscriber)
+
+    await bus.start()
+    await bus.stop()
+
+    assert subscriber.pubsubs == 1
+    assert publisher.pubsubs == 0
+
+
+async def test_subscriber_client_has_no_socket_timeout(monkeypatch):
+    monkeypatch.setattr(settings, "REDIS_URL", "redis://localhost:6379/0")
+    monkeypatch.setattr(redis_client, "_redis", None)
+    monkeypatch.setattr(redis_client, "_subscriber", None)
+
+    shared = redis_client.get_redis()
+    subscriber = redis_client.get_subscriber_redis()
+    assert shared is not None and subscriber is not None
+
+    # Blocking pub/sub reads must not time out between messages
+    assert subscriber.connection_pool.connection_kwargs["socket_timeout"] is None
+    assert shared.connection_pool.connection_kwargs["socket_timeout"] == (
+        settings.REDIS_SOCKET_TIMEOUT_SECONDS
+    )
+    await redis_client.close_redis()
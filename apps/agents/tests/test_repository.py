@@ -0,0 +1,94 @@
+"""Tests for declared query shapes and the generated index file."""
+
+import ast
+import json
+from pathlib import Path
+
+from app.core import repository
+
+APP_DIR = Path(__file__).resolve().parents[1] / "app"
+QUERY_METHODS = {"where", "order_by", "select"}
+
+
+def test_index_file_is_up_to_date():
+    """firestore.indexes.json matches the declared query shapes."""
+    assert repository.main(["--check"]) == 0
+
+
+def load_index_file() -> dict:
+    return json.loads(repository.INDEXES_FILE.read_text())
+
+
+def test_every_query_shape_has_an_index():
+    """Each shape is served by a composite index or by indexed single fields."""
+    index_file = load_index_file()
+    exempt = {(o["collectionGroup"], o["fieldPath"]) for o in index_file["fieldOverrides"]}
+
+    missing = []
+    for shape in repository.QUERY_SHAPES:
+        index = shape.composite_index()
+        if index is not None:
+            if index not in index_file["indexes"]:
+                missing.append(f"{shape.name}: no composite index {index['fields']}")
+            continue
+        fields = [*shape.equality, *(f for f, _ in shape.order_by)]
+        for field_path in fields:
+            if (shape.collection_group, field_path) in exempt:
+                missing.append(f"{shape.name}: {field_path} is exempt from indexing")
+
+    assert not missing, "Queries without a matching index:\n" + "\n".join(missing)
+
+
+def test_index_file_holds_nothing_unexpected():
+    """Entries for this service's collections all come from declarations."""
+    index_file = load_index_file()
+    declared = [shape.composite_index() for shape in repository.QUERY_SHAPES]
+    unindexed = set(repository.UNINDEXED_FIELDS)
+
+    for index in index_file["indexes"]:
+        if index["collectionGroup"] in repository.OWNED_COLLECTION_GROUPS:
+            assert index in declared, f"Undeclared index {index}"
+    for override in index_file["fieldOverrides"]:
+        if override["collectionGroup"] in repository.OWNED_COLLECTION_GROUPS:
+            assert (override["collectionGroup"], override["fieldPath"]) in unindexed
+
+
+def test_render_keeps_other_services_indexes():
+    """Indexes for collections this service does not own survive a rewrite."""
+    tasks = {
+        "collectionGroup": "tasks",
+        "queryScope": "COLLECTION",
+        "fields": [{"fieldPath": "projectId", "order": "ASCENDING"}],
+    }
+    stale = {"collectionGroup": repository.AGENTS, "queryScope": "COLLECTION", "fields": []}
+
+    rendered = repository.render_indexes({"indexes": [tasks, stale], "fieldOverrides": []})
+
+    assert tasks in rendered["indexes"]
+    assert stale not in rendered["indexes"]
+
+
+def test_queries_are_built_from_declared_shapes():
+    """Filters, orderings and projections are only written in the repository."""
+    offenders = []
+    for path in APP_DIR.rglob("*.py"):
+        if path.name == "repository.py":
+            continue
+        for node in ast.walk(ast.parse(path.read_text())):
+            if (
+                isinstance(node, ast.Call)
+                and isinstance(node.func, ast.Attribute)
+                and node.func.attr in QUERY_METHODS
+            ):
+                offenders.append(f"{path.relative_to(APP_DIR)}:{node.lineno} .{node.func.attr}()")
+
+    assert not offenders, "Undeclared query shapes:\n" + "\n".join(offenders)
+
+
+def test_composite_index_for_filtered_ordering():
+    """Equality filters plus a sort order need a composite index."""
+    index = repository.AGENTS_LIST[(True, False)].composite_index()
+
+    assert index is not None
+    assert [f["fieldPath"] for f in index["fields"]] == ["created_by", "created_at"]
+    assert repository.MESSAGES_NEWEST_FIRST.composite_index() is None
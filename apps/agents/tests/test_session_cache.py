@@ -0,0 +1,28 @@
+"""Tests for the session metadata cache."""
+
+from dataclasses import replace
+from datetime import datetime, timezone
+
+from app.core.pubsub import EventBus
+from app.services.session_cache import SessionCache, SessionMeta
+
+
+async def test_update_drops_copies_on_other_instances():
+    # One in-process bus reaches both caches, like Redis pub/sub across instances
+    bus = EventBus()
+    here = SessionCache(bus)
+    there = SessionCache(bus)
+    now = datetime.now(timezone.utc)
+    meta = SessionMeta(id="s1", user_id="u1", created_at=now, last_message_at=now)
+    await here.put(meta)
+    await there.put(meta)
+
+    changed = replace(meta, message_count=2)
+    await here.update(changed)
+    assert await here.get("s1") == changed
+    assert await there.get("s1") is None
+
+    await there.put(changed)
+    await here.invalidate("s1")
+    assert await here.get("s1") is None
+    assert await there.get("s1") is None
@@ -0,0 +1,65 @@
+"""Tests for background session deletion jobs."""
+
+from datetime import datetime, timezone
+
+from app.core.clients import ClientManager
+from app.core.pubsub import EventBus
+from app.services.conversation_buffer import conversation_buffer
+from app.services.message_archive import message_archive
+from app.services.session_cache import SessionMeta, session_cache
+from app.services.session_deletion import SessionDeleter
+from tests.conftest import FakeDB
+
+
+def make_deleter(monkeypatch, delete_tree) -> tuple[SessionDeleter, list]:
+    db = FakeDB()
+    monkeypatch.setattr(ClientManager, "firestore", property(lambda self: db))
+    archived: list = []
+
+    async def delete_archive(session_id: str) -> int:
+        archived.append(session_id)
+        return 0
+
+    monkeypatch.setattr(message_archive, "delete_session", delete_archive)
+    deleter = SessionDeleter(EventBus(), progress_interval=0.01)
+    monkeypatch.setattr(deleter, "_delete_tree", delete_tree)
+    return deleter, archived
+
+
+async def test_session_deletion_job_completes(monkeypatch):
+    def delete_tree(session_ids, progress):
+        for _ in range(3):
+            progress.on_result()
+        progress.sessions += len(session_ids)
+
+    deleter, archived = make_deleter(monkeypatch, delete_tree)
+    now = datetime.now(timezone.utc)
+    await session_cache.put(SessionMeta(id="s1", user_id="u1", created_at=now, last_message_at=now))
+    conversation_buffer.append("s1", [], message_count=0, new_session=True)
+
+    job = await deleter.delete_session("s1", requested_by="u1")
+    for task in list(deleter._tasks):
+        await task
+
+    stored = await deleter.get_job(job["id"])
+    assert stored["status"] == "done"
+    assert stored["sessions_deleted"] == 1
+    assert stored["documents_deleted"] == 3
+    assert archived == ["s1"]
+    assert await session_cache.get("s1") is None
+    assert conversation_buffer.read("s1", 10, 0) is None
+
+
+async def test_failed_deletion_keeps_archives(monkeypatch):
+    def delete_tree(session_ids, progress):
+        progress.failure = "permission denied"
+
+    deleter, archived = make_deleter(monkeypatch, delete_tree)
+    job = await deleter.delete_session("s2", requested_by="u1")
+    for task in list(deleter._tasks):
+        await task
+
+    stored = await deleter.get_job(job["id"])
+    assert stored["status"] == "failed"
+    assert stored["error"] == "permission denied"
+    assert archived == []
@@ -0,0 +1,153 @@
+"""Tests for bulk session export and import."""
+
+import json
+import uuid
+from datetime import datetime, timezone
+
+import pytest
+
+from app.core.clients import ClientManager
+from app.core.exceptions import ValidationError
+from app.core.repository import IMPORTS
+from app.services.records import decode_line, encode_line
+from app.services.session_transfer import SessionExporter, SessionImporter, id_ranges
+from tests.conftest import FakeDB, FakeSnapshot
+
+
+class FakeCollection:
+    """Sessions with message subcollections, supporting ID-range queries."""
+
+    def __init__(self, sessions: list[dict], messages: dict[str, list[dict]]) -> None:
+        self.sessions = sessions
+        self.messages = messages
+        self.session_id = None
+        self.start = None
+        self.end = None
+        self.queries = 0
+
+    def collection(self, name: str) -> "FakeCollection":
+        return self
+
+    def document(self, doc_id: str) -> "FakeCollection":
+        query = FakeCollection(self.sessions, self.messages)
+        query.session_id = doc_id
+        return query
+
+    def where(self, field: str, op: str, value: str) -> "FakeCollection":
+        return self
+
+    def order_by(self, field, direction: str) -> "FakeCollection":
+        return self
+
+    def start_at(self, fields: dict) -> "FakeCollection":
+        self.start = fields["__name__"]
+        return self
+
+    def end_before(self, fields: dict) -> "FakeCollection":
+        self.end = fields["__name__"]
+        return self
+
+    async def stream(self):
+        if self.session_id is None:
+            docs = self.sessions
+        else:
+            docs = [
+                m
+                for m in self.messages[self.session_id]
+                if (self.start is None or m["id"] >= self.start)
+                and (self.end is None or m["id"] < self.end)
+            ]
+        for doc in docs:
+            yield FakeSnapshot(doc)
+
+
+def test_id_ranges_cover_id_space():
+    ranges = id_ranges(8)
+    assert len(ranges) == 8
+    assert ranges[0][0] is None and ranges[-1][1] is None
+    for (_, end), (start, _) in zip(ranges, ranges[1:], strict=False):
+        assert end == start
+    assert id_ranges(1) == [(None, None)]
+
+
+def test_lines_round_trip_timestamps():
+    created_at = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    line = encode_line("message", {"id": "m1", "session_id": "s1", "created_at": created_at})
+    kind, data = decode_line(line, 1)
+    assert kind == "message"
+    assert data["created_at"] == created_at
+
+
+def test_decode_rejects_message_without_session():
+    with pytest.raises(ValidationError):
+        decode_line(json.dumps({"type": "message", "data": {"id": "m1"}}), 3)
+
+
+async def test_export_partitions_large_sessions():
+    messages = {
+        "small": [{"id": str(uuid.uuid4()), "session_id": "small"} for _ in range(3)],
+        "large": [{"id": str(uuid.uuid4()), "session_id": "large"} for _ in range(50)],
+    }
+    sessions = [
+        {"id": "small", "user_id": "u1", "message_count": 3},
+        {"id": "large", "user_id": "u1", "message_count": 50},
+    ]
+    exporter = SessionExporter.__new__(SessionExporter)
+    exporter.db = FakeCollection(sessions, messages)
+    exporter.concurrency = 4
+    exporter.partitions = 8
+    exporter.partition_threshold = 10
+
+    body = "".join([chunk async for chunk in exporter.export_user("u1")])
+    records = [json.loads(line) for line in body.splitlines()]
+
+    assert [r["data"]["id"] for r in records if r["type"] == "session"] == ["small", "large"]
+    exported = sorted(r["data"]["id"] for r in records if r["type"] == "message")
+    assert exported == sorted(m["id"] for ms in messages.values() for m in ms)
+
+
+class FakeBulkWriter:
+    def __init__(self) -> None:
+        self.written: list[str] = []
+        self.closed = False
+
+    def on_write_error(self, callback) -> None:
+        pass
+
+    def set(self, ref: str, data: dict) -> None:
+        self.written.append(ref)
+
+    def flush(self) -> None:
+        pass
+
+    def close(self) -> None:
+        self.closed = True
+
+
+class FakeSyncDB:
+    def __init__(self) -> None:
+        self.writer = FakeBulkWriter()
+
+    def bulk_writer(self, options) -> FakeBulkWriter:
+        return self.writer
+
+    def document(self, path: str) -> str:
+        return path
+
+
+async def test_import_writes_through_the_shared_sync_client(monkeypatch):
+    db, sync_db = FakeDB(), FakeSyncDB()
+    monkeypatch.setattr(ClientManager, "firestore", property(lambda self: db))
+    monkeypatch.setattr(ClientManager, "firestore_sync", property(lambda self: sync_db))
+    created_at = datetime(2026, 1, 1, tzinfo=timezone.utc)
+
+    async def lines():
+        yield encode_line("session", {"id": "s1", "user_id": "u1"}).encode()
+        yield encode_line("message", {"id": "m1", "session_id": "s1", "created_at": created_at}).encode()
+
+    result = await SessionImporter(chunk_size=10).import_lines("i1", lines())
+
+    assert sync_db.writer.written == ["agents-sessions/s1", "agents-sessions/s1/messages/m1"]
+    assert sync_db.writer.closed
+    assert result["sessions"] == 1 and result["messages"] == 1 and result["done"]
+    assert db.docs[f"{IMPORTS}/i1"]["committed_lines"] == 2
@@ -0,0 +1,71 @@
+"""Tests for SSE chat stream framing."""
+
+import asyncio
+import json
+
+import pytest
+
+from app.core.sse import DONE_FRAME, coalesce, content_frame, error_frame
+from app.models.message import ChatStreamChunk
+
+
+def sse(chunk: ChatStreamChunk) -> bytes:
+    return f"data: {chunk.model_dump_json()}\n\n".encode()
+
+
+@pytest.mark.parametrize(
+    "text",
+    ["", "plain", 'a"b\\c', "line\nbreak\ttab\r", "\x00\x01\x1f\x7f", "é 😀  ", "</script>"],
+)
+def test_content_frame_matches_model(text):
+    assert content_frame(text) == sse(ChatStreamChunk(content=text, done=False))
+
+
+def test_done_and_error_frames_match_model():
+    assert DONE_FRAME == sse(ChatStreamChunk(content="", done=True))
+    frame = error_frame("boom")
+    assert frame.startswith(b"data: ") and frame.endswith(b"\n\n")
+    assert json.loads(frame[6:]) == ChatStreamChunk(
+        content="Error: boom", done=True, metadata={"error": True}
+    ).model_dump()
+
+
+async def words(items, delay=0.0, log=None):
+    try:
+        for item in items:
+            if delay:
+                await asyncio.sleep(delay)
+            yield item
+    finally:
+        if log is not None:
+            log.append("closed")
+
+
+async def test_coalesce_flushes_on_size_and_sentences():
+    source = words(["Hi ", "there ", "you ", "all. ", "More ", "words ", "here ", "end"])
+    out = [chunk async for chunk in coalesce(source, max_bytes=10, max_latency=60)]
+    assert out == ["Hi ", "there you ", "all. ", "More words ", "here end"]
+
+
+async def test_coalesce_flushes_while_source_is_silent():
+    async def stalled():
+        yield "first "
+        yield "second "
+        await asyncio.sleep(0.2)
+        yield "third"
+
+    received = []
+    loop = asyncio.get_running_loop()
+    start = loop.time()
+    async for chunk in coalesce(stalled(), max_bytes=1000, max_latency=0.02):
+        received.append((chunk, loop.time() - start))
+    assert [chunk for chunk, _ in received] == ["first ", "second ", "third"]
+    assert received[1][1] < 0.15
+
+
+async def test_coalesce_closes_source_when_abandoned():
+    log: list = []
+    stream = coalesce(words(["a ", "b ", "c "], delay=0.01, log=log), 1000, 60)
+    assert await stream.__anext__() == "a "
+    await stream.aclose()
+    assert log == ["closed"]
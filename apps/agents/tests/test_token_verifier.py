@@ -0,0 +1,118 @@
+"""Tests for local Firebase ID token verification."""
+
+import datetime
+import time
+
+import httpx
+import pytest
+from cryptography import x509
+from cryptography.hazmat.primitives import hashes, serialization
+from cryptography.hazmat.primitives.asymmetric import rsa
+from cryptography.x509.oid import NameOID
+from jose import jwt
+
+from app.core.exceptions import TokenVerificationError
+from app.core.token_verifier import FirebaseTokenVerifier
+
+PROJECT_ID = "demo-project"
+
+
+def make_key_pair() -> tuple[str, str]:
+    """Create an RSA private key and matching self-signed certificate (PEM)."""
+    key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    name = x509.Name([x509.NameAttribute(NameOID.COMMON_NAME, "securetoken")])
+    now = datetime.datetime.now(datetime.timezone.utc)
+    cert = (
+        x509.CertificateBuilder()
+        .subject_name(name)
+        .issuer_name(name)
+        .public_key(key.public_key())
+        .serial_number(x509.random_serial_number())
+        .not_valid_before(now)
+        .not_valid_after(now + datetime.timedelta(days=1))
+        .sign(key, hashes.SHA256())
+    )
+    private_pem = key.private_bytes(
+        serialization.Encoding.PEM,
+        serialization.PrivateFormat.PKCS8,
+        serialization.NoEncryption(),
+    ).decode()
+    return private_pem, cert.public_bytes(serialization.Encoding.PEM).decode()
+
+
+class KeyServer:
+    """Local stand-in for Google's x509 certificate endpoint."""
+
+    def __init__(self) -> None:
+        self.certs: dict[str, str] = {}
+        self.requests = 0
+
+    def handler(self, request: httpx.Request) -> httpx.Response:
+        self.requests += 1
+        return httpx.Response(
+            200, json=self.certs, headers={"Cache-Control": "public, max-age=3600"}
+        )
+
+
+def sign(private_pem: str, kid: str, **overrides: object) -> str:
+    """Sign a Firebase-shaped ID token."""
+    now = int(time.time())
+    claims = {
+        "iss": f"https://securetoken.google.com/{PROJECT_ID}",
+        "aud": PROJECT_ID,
+        "sub": "user-123",
+        "auth_time": now,
+        "iat": now,
+        "exp": now + 3600,
+        "email": "dev@test.com",
+    }
+    claims.update(overrides)
+    return jwt.encode(claims, private_pem, algorithm="RS256", headers={"kid": kid})
+
+
+@pytest.fixture
+def key_server() -> KeyServer:
+    return KeyServer()
+
+
+@pytest.fixture
+def verifier(key_server: KeyServer, monkeypatch: pytest.MonkeyPatch) -> FirebaseTokenVerifier:
+    monkeypatch.delenv("FIREBASE_AUTH_EMULATOR_HOST", raising=False)
+    client = httpx.AsyncClient(transport=httpx.MockTransport(key_server.handler))
+    return FirebaseTokenVerifier(project_id=PROJECT_ID, http_client=client)
+
+
+async def test_verifies_token_locally(key_server: KeyServer, verifier: FirebaseTokenVerifier):
+    """A correctly signed token verifies with a single key fetch."""
+    private_pem, cert_pem = make_key_pair()
+    key_server.certs = {"k1": cert_pem}
+
+    assert await verifier.refresh_keys() == 3600
+    claims = await verifier.verify(sign(private_pem, "k1"))
+    await verifier.verify(sign(private_pem, "k1"))
+
+    assert claims["uid"] == "user-123"
+    assert key_server.requests == 1
+
+
+async def test_refreshes_on_unknown_key_id(key_server: KeyServer, verifier: FirebaseTokenVerifier):
+    """A rotated key is picked up without waiting for the refresh schedule."""
+    old_pem, old_cert = make_key_pair()
+    new_pem, new_cert = make_key_pair()
+    key_server.certs = {"old": old_cert}
+    await verifier.refresh_keys()
+
+    key_server.certs = {"old": old_cert, "new": new_cert}
+    claims = await verifier.verify(sign(new_pem, "new"))
+
+    assert claims["uid"] == "user-123"
+    assert key_server.requests == 2
+
+
+async def test_rejects_wrong_audience(key_server: KeyServer, verifier: FirebaseTokenVerifier):
+    """Tokens issued for another project are rejected."""
+    private_pem, cert_pem = make_key_pair()
+    key_server.certs = {"k1": cert_pem}
+
+    with pytest.raises(TokenVerificationError):
+        await verifier.verify(sign(private_pem, "k1", aud="other-project"))
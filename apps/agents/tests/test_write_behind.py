@@ -0,0 +1,111 @@
+"""Tests for the write-behind persistence queue."""
+
+from datetime import datetime
+
+import pytest
+from google.api_core.exceptions import NotFound
+
+from app.services import write_behind as write_behind_module
+from app.services.write_behind import WriteBehindQueue, WriteOp
+
+
+class FakeBatch:
+    """Records writes and commits them into FakeDB."""
+
+    def __init__(self, db: "FakeDB") -> None:
+        self.db = db
+        self.writes: list[tuple[str, dict, bool]] = []
+
+    def set(self, path: str, data: dict, merge: bool = False) -> None:
+        self.writes.append((path, data, False))
+
+    def update(self, path: str, data: dict) -> None:
+        self.writes.append((path, data, True))
+
+    async def commit(self) -> None:
+        if self.db.fail:
+            raise RuntimeError("unavailable")
+        for path, _, exists in self.writes:
+            if exists and path not in self.db.docs:
+                raise NotFound(f"No document to update: {path}")
+        self.db.commits += 1
+        for path, data, exists in self.writes:
+            self.db.docs[path] = {**self.db.docs[path], **data} if exists else data
+
+
+class FakeDB:
+    """Minimal async Firestore stand-in."""
+
+    def __init__(self) -> None:
+        self.docs: dict[str, dict] = {}
+        self.commits = 0
+        self.fail = False
+
+    def batch(self) -> FakeBatch:
+        return FakeBatch(self)
+
+    def document(self, path: str) -> str:
+        return path
+
+
+@pytest.fixture
+def fake_db(monkeypatch: pytest.MonkeyPatch) -> FakeDB:
+    db = FakeDB()
+
+    class FakeClients:
+        firestore = db
+
+    monkeypatch.setattr(write_behind_module, "clients", FakeClients())
+    return db
+
+
+async def test_spooled_writes_survive_restart(tmp_path, fake_db: FakeDB):
+    """Writes spooled by one queue are flushed by the next one on the same spool."""
+    spool = str(tmp_path / "spool.db")
+    created_at = datetime(2026, 1, 1, 12, 0, 0)
+
+    first = WriteBehindQueue(spool_path=spool)
+    await first.enqueue([WriteOp("agents-sessions/s1", {"created_at": created_at})])
+    await first.enqueue([WriteOp("agents-sessions/s1/messages/m1", {"content": "hi"})])
+    assert await first.pending() == 2
+
+    # Simulate a crash: the spool is reopened by a fresh queue
+    second = WriteBehindQueue(spool_path=spool)
+    await second._drain()
+
+    assert await second.pending() == 0
+    assert fake_db.commits == 1
+    assert fake_db.docs["agents-sessions/s1"]["created_at"] == created_at
+
+
+async def test_failed_flush_keeps_writes_spooled(tmp_path, fake_db: FakeDB):
+    """A failed commit leaves the group in the spool for retry."""
+    queue = WriteBehindQueue(spool_path=str(tmp_path / "spool.db"))
+    await queue.enqueue([WriteOp("agents-sessions/s1", {"n": 1})])
+    fake_db.fail = True
+
+    with pytest.raises(RuntimeError):
+        await queue._drain()
+
+    assert await queue.pending() == 1
+    fake_db.fail = False
+    await queue._drain()
+    assert await queue.pending() == 0
+
+
+async def test_update_after_delete_is_dead_lettered(tmp_path, fake_db: FakeDB):
+    """An update of a deleted document does not recreate it or block later groups."""
+    queue = WriteBehindQueue(spool_path=str(tmp_path / "spool.db"), max_attempts=2)
+    await queue.enqueue([WriteOp("agents-sessions/gone", {"n": 2}, exists=True)])
+    await queue.enqueue([WriteOp("agents-sessions/s2", {"n": 1})])
+
+    with pytest.raises(NotFound):
+        await queue._drain()
+    assert await queue.pending() == 2
+
+    await queue._drain()
+    metrics = await queue.metrics()
+    assert metrics["pending"] == 0
+    assert metrics["dead_letters"] == 1
+    assert "agents-sessions/gone" not in fake_db.docs
+    assert fake_db.docs["agents-sessions/s2"] == {"n": 1}